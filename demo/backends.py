@@ -0,0 +1,79 @@
+"""
+Time a set of operations with each registered big-integer backend
+(see mpmath.libmp.set_backend), at several precisions. Run with
+
+    python backends.py [maxdps]
+
+Other backends can be registered before the timings, for example
+with python-flint installed:
+
+    import flint
+    libmp.register_backend(libmp.Backend('flint', flint.fmpz))
+"""
+
+import sys
+import time
+
+from mpmath import mp, mpf, libmp
+
+TASKS = [
+    ("mul", "x*y"),
+    ("div", "x/y"),
+    ("sqrt", "mp.sqrt(x)"),
+    ("exp", "mp.exp(x)"),
+    ("log", "mp.log(x)"),
+    ("sin", "mp.sin(x)"),
+    ("atan", "mp.atan(x)"),
+    ("str", "str(x)"),
+]
+
+def timing(code, env, budget=0.2):
+    f = eval("lambda: " + code, env)
+    n = 1
+    while 1:
+        t0 = time.time()
+        for i in range(n):
+            f()
+        t = time.time() - t0
+        if t > budget:
+            return t / n
+        n *= 2
+
+def run(backend, dps):
+    mp.set_backend(backend)
+    mp.dps = dps
+    env = {'mp': mp, 'x': mp.pi/7, 'y': mp.e/3}
+    results = []
+    for name, code in TASKS:
+        if name in ("exp", "log", "sin", "atan"):
+            # Avoid measuring cached values only
+            libmp.cache.clear_caches()
+            libmp.libelefun.clear_constant_memos()
+        results.append(timing(code, env))
+    mp.dps = 15
+    return results
+
+def main(maxdps):
+    original = libmp.BACKEND
+    names = sorted(libmp.backends)
+    if 'sage' in names:
+        names = [original]
+    print("%-8s %8s " % ("backend", "dps") + \
+        " ".join("%10s" % name for (name, code) in TASKS))
+    dps = 100
+    try:
+        while dps <= maxdps:
+            for backend in names:
+                times = run(backend, dps)
+                print("%-8s %8i " % (backend, dps) + \
+                    " ".join("%10.2e" % t for t in times))
+            dps *= 10
+    finally:
+        mp.set_backend(original)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        maxdps = int(sys.argv[1])
+    else:
+        maxdps = 10000
+    main(maxdps)
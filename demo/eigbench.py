@@ -0,0 +1,117 @@
+"""
+Compare the fixed point QR algorithm used by mp.schur and mp.eig with the
+QR iteration in mpc arithmetic it replaces, on the Hessenberg forms of
+random real n x n matrices. Run with
+
+    python eigbench.py [maxn [dps]]
+
+The old iteration takes minutes already for n = 100 and more than an hour
+for n = 300; run with a small maxn first.
+"""
+
+import sys
+import time
+
+from mpmath import mp
+from mpmath.matrices import eigen
+
+def old_hessenberg_qr(ctx, A, Q):
+    n = A.rows
+    norm = 0
+    for x in range(n):
+        for y in range(min(x+2, n)):
+            norm += ctx.re(A[y,x]) ** 2 + ctx.im(A[y,x]) ** 2
+    norm = ctx.sqrt(norm) / n
+    if norm == 0:
+        return
+    n0 = 0
+    n1 = n
+    eps = ctx.eps / (100 * n)
+    maxits = ctx.dps * 4
+    its = 0
+    while 1:
+        k = n0
+        while k + 1 < n1:
+            s = abs(ctx.re(A[k,k])) + abs(ctx.im(A[k,k])) + abs(ctx.re(A[k+1,k+1])) + abs(ctx.im(A[k+1,k+1]))
+            if s < eps * norm:
+                s = norm
+            if abs(A[k+1,k]) < eps * s:
+                break
+            k += 1
+        if k + 1 < n1:
+            A[k+1,k] = 0
+            n0 = k + 1
+            its = 0
+            if n0 + 1 >= n1:
+                n0 = 0
+                n1 = k + 1
+                if n1 < 2:
+                    return
+        else:
+            if (its % 30) == 10:
+                shift = A[n1-1,n1-2]
+            elif (its % 30) == 20:
+                shift = abs(A[n1-1,n1-2])
+            elif (its % 30) == 29:
+                shift = norm
+            else:
+                t = A[n1-2,n1-2] + A[n1-1,n1-1]
+                s = (A[n1-1,n1-1] - A[n1-2,n1-2]) ** 2 + 4 * A[n1-1,n1-2] * A[n1-2,n1-1]
+                if ctx.re(s) > 0:
+                    s = ctx.sqrt(s)
+                else:
+                    s = ctx.sqrt(-s) * 1j
+                a = (t + s) / 2
+                b = (t - s) / 2
+                if abs(A[n1-1,n1-1] - a) > abs(A[n1-1,n1-1] - b):
+                    shift = b
+                else:
+                    shift = a
+            its += 1
+            eigen.qr_step(ctx, n0, n1, A, Q, shift)
+            if its > maxits:
+                raise RuntimeError("qr: failed to converge after %d steps" % its)
+
+def random_hessenberg(n):
+    A = mp.randmatrix(n)
+    T = mp.matrix(n, 1)
+    eigen.hessenberg_reduce_0(mp, A, T)
+    Q = A.copy()
+    eigen.hessenberg_reduce_1(mp, Q, T)
+    for x in range(n):
+        for y in range(x + 2, n):
+            A[y,x] = 0
+    return A, Q
+
+def timing(f, A, Q):
+    t0 = time.time()
+    f(mp, A, Q)
+    return time.time() - t0
+
+def compare(maxn, dps):
+    mp.dps = dps
+    print("%6s %10s %10s %10s %10s" % \
+        ("n", "old", "new", "new, no Q", "deviation"))
+    n = 50
+    while n <= maxn:
+        H, Q = random_hessenberg(n)
+        A1, Q1 = H.copy(), Q.copy()
+        A2, Q2 = H.copy(), Q.copy()
+        t1 = timing(old_hessenberg_qr, A1, Q1)
+        t2 = timing(eigen.hessenberg_qr, A2, Q2)
+        t3 = timing(eigen.hessenberg_qr, H.copy(), False)
+        E1 = [A1[i,i] for i in range(n)]
+        E2 = [A2[i,i] for i in range(n)]
+        dev = max(min(abs(x - y) for y in E1) for x in E2)
+        print("%6i %10.2f %10.2f %10.2f %10s" % (n, t1, t2, t3,
+            mp.nstr(dev, 3)))
+        n += 50
+
+if __name__ == "__main__":
+    maxn = 300
+    dps = 15
+    if len(sys.argv) > 1:
+        maxn = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        dps = int(sys.argv[2])
+    compare(maxn, dps)
@@ -0,0 +1,44 @@
+"""
+Measure the time taken by "import mpmath" in a fresh interpreter, and
+the time of the first call of a special function (which imports the
+module defining it). Run with
+
+    python importtime.py [repetitions]
+
+The median of the repetitions is printed. Byte-compiled files should
+exist (run the script once first) for the times to be meaningful.
+"""
+
+import sys
+import subprocess
+
+IMPORT = """
+import time
+t0 = time.time()
+import mpmath
+t1 = time.time()
+mpmath.besselj(1, 2)
+t2 = time.time()
+print("%f %f" % (t1-t0, t2-t1))
+"""
+
+def measure(repetitions):
+    imports = []
+    first_calls = []
+    for i in range(repetitions):
+        out = subprocess.check_output([sys.executable, "-c", IMPORT])
+        a, b = out.split()
+        imports.append(float(a))
+        first_calls.append(float(b))
+    imports.sort()
+    first_calls.sort()
+    return imports[repetitions//2], first_calls[repetitions//2]
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        repetitions = int(sys.argv[1])
+    else:
+        repetitions = 21
+    import_time, first_call_time = measure(repetitions)
+    print("import mpmath:        %.1f ms" % (import_time*1000))
+    print("first besselj(1, 2):  %.1f ms" % (first_call_time*1000))
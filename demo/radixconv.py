@@ -0,0 +1,64 @@
+"""
+Compare the divide-and-conquer radix conversion used by libmp with the
+conversion by recursive division and int() it replaces, for integers of
+increasing size, and time str() and mpf() of pi at high precision. Run
+with
+
+    python radixconv.py [maxdigits]
+
+The old conversions are quadratic; run with a small maxdigits first.
+"""
+
+import sys
+import time
+
+from mpmath import mp, mpf
+from mpmath.libmp import numeral, from_numeral, MPZ
+
+if hasattr(sys, "set_int_max_str_digits"):
+    sys.set_int_max_str_digits(0)
+
+def old_numeral(n, size):
+    if size < 250:
+        return str(n)
+    half = (size // 2) + (size & 1)
+    A, B = divmod(n, MPZ(10)**half)
+    return old_numeral(A, half) + old_numeral(B, half).rjust(half, "0")
+
+def old_from_numeral(s):
+    return MPZ(int(s))
+
+def timing(f, *args):
+    t0 = time.time()
+    f(*args)
+    return time.time() - t0
+
+def compare(maxdigits):
+    print("%10s %10s %10s %10s %10s" % \
+        ("digits", "old str", "new str", "old int", "new int"))
+    digits = 1000
+    while digits <= maxdigits:
+        n = MPZ(3)**int(digits / 0.47712125472)
+        s = numeral(n, 10, digits)
+        assert old_numeral(n, digits) == s
+        assert old_from_numeral(s) == from_numeral(s) == n
+        print("%10i %10.4f %10.4f %10.4f %10.4f" % (digits,
+            timing(old_numeral, n, digits), timing(numeral, n, 10, digits),
+            timing(old_from_numeral, s), timing(from_numeral, s)))
+        digits *= 10
+    mp.dps = maxdigits
+    x = +mp.pi
+    t0 = time.time()
+    s = str(x)
+    t1 = time.time()
+    y = mpf(s)
+    t2 = time.time()
+    mp.dps = 15
+    print("pi to %i digits: str %.4f, mpf %.4f" % (maxdigits, t1-t0, t2-t1))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        maxdigits = int(sys.argv[1])
+    else:
+        maxdigits = 100000
+    compare(maxdigits)
@@ -23,6 +23,8 @@
 from . import ctx_mp as _ctx_mp
 _ctx_mp._mpf_module.mpf = mp.mpf
 _ctx_mp._mpf_module.mpc = mp.mpc
+from .matrices import matrices as _matrices
+_matrices.matrix = mp.matrix
 
 make_mpf = mp.make_mpf
 make_mpc = mp.make_mpc
@@ -34,25 +36,17 @@
 autoprec = mp.autoprec
 maxcalls = mp.maxcalls
 memoize = mp.memoize
+parallel_map = mp.parallel_map
+ufunc = mp.ufunc
+cache_info = mp.cache_info
+clear_caches = mp.clear_caches
+set_cache_limit = mp.set_cache_limit
+stats = mp.stats
 
 mag = mp.mag
 
 bernfrac = mp.bernfrac
 
-qfrom = mp.qfrom
-mfrom = mp.mfrom
-kfrom = mp.kfrom
-taufrom = mp.taufrom
-qbarfrom = mp.qbarfrom
-ellipfun = mp.ellipfun
-jtheta = mp.jtheta
-kleinj = mp.kleinj
-
-qp = mp.qp
-qhyper = mp.qhyper
-qgamma = mp.qgamma
-qfac = mp.qfac
-
 nint_distance = mp.nint_distance
 
 plot = mp.plot
@@ -89,6 +83,8 @@
 
 nstr = mp.nstr
 nprint = mp.nprint
+digits_stream = mp.digits_stream
+set_backend = mp.set_backend
 chop = mp.chop
 
 fneg = mp.fneg
@@ -102,6 +98,8 @@
 quadgl = mp.quadgl
 quadts = mp.quadts
 quadosc = mp.quadosc
+save_nodes = mp.save_nodes
+load_nodes = mp.load_nodes
 
 invertlaplace = mp.invertlaplace
 invlaptalbot = mp.invlaptalbot
@@ -136,6 +134,8 @@
 chebyfit = mp.chebyfit
 limit = mp.limit
 
+mpfarray = mp.mpfarray
+
 matrix = mp.matrix
 eye = mp.eye
 diag = mp.diag
@@ -157,8 +157,15 @@
 qr_solve = mp.qr_solve
 cholesky = mp.cholesky
 cholesky_solve = mp.cholesky_solve
+lu_factor = mp.lu_factor
+cho_factor = mp.cho_factor
+qr_factor = mp.qr_factor
 det = mp.det
 cond = mp.cond
+spmatrix = mp.spmatrix
+cg = mp.cg
+bicgstab = mp.bicgstab
+gmres = mp.gmres
 hessenberg = mp.hessenberg
 schur = mp.schur
 eig = mp.eig
@@ -210,6 +217,8 @@
 
 fsum = mp.fsum
 fdot = mp.fdot
+fma = mp.fma
+fixed = mp.fixed
 
 sqrt = mp.sqrt
 cbrt = mp.cbrt
@@ -248,6 +257,11 @@
 sincpi = mp.sincpi
 cos_sin = mp.cos_sin
 cospi_sinpi = mp.cospi_sinpi
+exp_many = mp.exp_many
+log_many = mp.log_many
+cos_many = mp.cos_many
+sin_many = mp.sin_many
+cos_sin_many = mp.cos_sin_many
 fabs = mp.fabs
 re = mp.re
 im = mp.im
@@ -273,15 +287,10 @@
 fib = mp.fib
 fibonacci = mp.fibonacci
 lambertw = mp.lambertw
-zeta = mp.zeta
-altzeta = mp.altzeta
 gamma = mp.gamma
 rgamma = mp.rgamma
 factorial = mp.factorial
 fac = mp.fac
-fac2 = mp.fac2
-beta = mp.beta
-betainc = mp.betainc
 psi = mp.psi
 #psi0 = mp.psi0
 #psi1 = mp.psi1
@@ -295,121 +304,9 @@
 harmonic = mp.harmonic
 bernoulli = mp.bernoulli
 bernfrac = mp.bernfrac
-stieltjes = mp.stieltjes
-hurwitz = mp.hurwitz
-dirichlet = mp.dirichlet
-bernpoly = mp.bernpoly
-eulerpoly = mp.eulerpoly
-eulernum = mp.eulernum
-polylog = mp.polylog
-clsin = mp.clsin
-clcos = mp.clcos
-gammainc = mp.gammainc
-gammaprod = mp.gammaprod
-binomial = mp.binomial
-rf = mp.rf
-ff = mp.ff
-hyper = mp.hyper
-hyp0f1 = mp.hyp0f1
-hyp1f1 = mp.hyp1f1
-hyp1f2 = mp.hyp1f2
-hyp2f1 = mp.hyp2f1
-hyp2f2 = mp.hyp2f2
-hyp2f0 = mp.hyp2f0
-hyp2f3 = mp.hyp2f3
-hyp3f2 = mp.hyp3f2
-hyperu = mp.hyperu
-hypercomb = mp.hypercomb
-meijerg = mp.meijerg
-appellf1 = mp.appellf1
-appellf2 = mp.appellf2
-appellf3 = mp.appellf3
-appellf4 = mp.appellf4
-hyper2d = mp.hyper2d
-bihyper = mp.bihyper
-erf = mp.erf
-erfc = mp.erfc
-erfi = mp.erfi
-erfinv = mp.erfinv
-npdf = mp.npdf
-ncdf = mp.ncdf
-expint = mp.expint
-e1 = mp.e1
-ei = mp.ei
-li = mp.li
-ci = mp.ci
-si = mp.si
-chi = mp.chi
-shi = mp.shi
-fresnels = mp.fresnels
-fresnelc = mp.fresnelc
-airyai = mp.airyai
-airybi = mp.airybi
-airyaizero = mp.airyaizero
-airybizero = mp.airybizero
-scorergi = mp.scorergi
-scorerhi = mp.scorerhi
 ellipk = mp.ellipk
-ellipe = mp.ellipe
-ellipf = mp.ellipf
-ellippi = mp.ellippi
-elliprc = mp.elliprc
-elliprj = mp.elliprj
-elliprf = mp.elliprf
-elliprd = mp.elliprd
-elliprg = mp.elliprg
 agm = mp.agm
-jacobi = mp.jacobi
-chebyt = mp.chebyt
-chebyu = mp.chebyu
-legendre = mp.legendre
-legenp = mp.legenp
-legenq = mp.legenq
-hermite = mp.hermite
-pcfd = mp.pcfd
-pcfu = mp.pcfu
-pcfv = mp.pcfv
-pcfw = mp.pcfw
-gegenbauer = mp.gegenbauer
-laguerre = mp.laguerre
-spherharm = mp.spherharm
-besselj = mp.besselj
-j0 = mp.j0
-j1 = mp.j1
-besseli = mp.besseli
-bessely = mp.bessely
-besselk = mp.besselk
-besseljzero = mp.besseljzero
-besselyzero = mp.besselyzero
-hankel1 = mp.hankel1
-hankel2 = mp.hankel2
-struveh = mp.struveh
-struvel = mp.struvel
-angerj = mp.angerj
-webere = mp.webere
-lommels1 = mp.lommels1
-lommels2 = mp.lommels2
-whitm = mp.whitm
-whitw = mp.whitw
-ber = mp.ber
-bei = mp.bei
-ker = mp.ker
-kei = mp.kei
-coulombc = mp.coulombc
-coulombf = mp.coulombf
-coulombg = mp.coulombg
-barnesg = mp.barnesg
-superfac = mp.superfac
-hyperfac = mp.hyperfac
 loggamma = mp.loggamma
-siegeltheta = mp.siegeltheta
-siegelz = mp.siegelz
-grampoint = mp.grampoint
-zetazero = mp.zetazero
-riemannr = mp.riemannr
-primepi = mp.primepi
-primepi2 = mp.primepi2
-primezeta = mp.primezeta
 bell = mp.bell
 polyexp = mp.polyexp
 expm1 = mp.expm1
@@ -418,13 +315,42 @@
 unitroots = mp.unitroots
 cyclotomic = mp.cyclotomic
 mangoldt = mp.mangoldt
-secondzeta = mp.secondzeta
-nzeros = mp.nzeros
-backlunds = mp.backlunds
-lerchphi = mp.lerchphi
 stirling1 = mp.stirling1
 stirling2 = mp.stirling2
 
+# Special functions defined in the modules of mpmath.functions that are
+# imported on first use (see mpmath.functions.__init__) are looked up
+# here when first accessed. Internal helpers among them are only
+# available on the contexts.
+_internal = set(['loggamma_old', 'oldzetazero', 'square_exp_arg'])
+_lazy = None
+
+def _lazy_names():
+    global _lazy
+    if _lazy is None:
+        names = [name for name in mp.lazy_functions
+            if not (name.startswith('_') or name in _internal)]
+        names += [alias for (alias, name) in mp._aliases.items()
+            if name in mp.lazy_functions]
+        _lazy = frozenset(names)
+    return _lazy
+
+def __getattr__(name):
+    if name in _lazy_names():
+        value = getattr(mp, name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | _lazy_names())
+
+import sys as _sys
+if _sys.version_info < (3, 7):
+    # No module __getattr__ (PEP 562)
+    for _name in _lazy_names():
+        globals()[_name] = getattr(mp, _name)
+
 # be careful when changing this name, don't use test*!
 def runtests():
     """
@@ -446,6 +372,8 @@ def doctests(filter=[]):
             break
     import doctest
     globs = globals().copy()
+    for name in _lazy_names():
+        globs[name] = getattr(mp, name)
     for obj in globs: #sorted(globs.keys()):
         if filter:
             if not sum([pat in obj for pat in filter]):
@@ -457,5 +385,8 @@ def doctests(filter=[]):
         t2 = clock()
         print(round(t2-t1, 3))
 
+__all__ = [name for name in globals() if not name.startswith('_')] + \
+    sorted(_lazy_names())
+
 if __name__ == '__main__':
     doctests()
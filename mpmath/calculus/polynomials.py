@@ -1,4 +1,4 @@
-from ..libmp.backend import xrange
+from ..libmp.backend import xrange, int_types
 from .calculus import defun
 
 #----------------------------------------------------------------------------#
@@ -34,10 +34,23 @@ def polyval(ctx, coeffs, x, derivative=False):
         return ctx.zero
     p = ctx.convert(coeffs[0])
     q = ctx.zero
-    for c in coeffs[1:]:
-        if derivative:
-            q = p + x*q
-        p = c + x*p
+    numbers = (ctx.mpf, ctx.mpc, float, complex) + int_types
+    def isnumber(v):
+        return isinstance(v, numbers) or hasattr(v, '_mpf_') or \
+            hasattr(v, '_mpc_')
+    if isnumber(x) and all(isnumber(c) for c in coeffs):
+        # Each step is rounded once
+        fma = ctx.fma
+        for c in coeffs[1:]:
+            if derivative:
+                q = fma(x, q, p)
+            p = fma(x, p, c)
+    else:
+        # Other types of x, such as matrices
+        for c in coeffs[1:]:
+            if derivative:
+                q = p + x*q
+            p = c + x*p
     if derivative:
         return p, q
     else:
@@ -1,6 +1,44 @@
 import math
-
-from ..libmp.backend import xrange
+import struct
+from binascii import hexlify, unhexlify
+
+from ..libmp.backend import xrange, basestring, MPZ
+from ..libmp.libmpf import bitcount
+from ..libmp.cache import stats
+
+# Binary format of node files written by QuadratureRule.save_nodes.
+# After the magic string and the name of the rule, each table is
+# stored as (degree, prec, number of nodes) followed by the abscissas
+# and weights, each as (sign, exponent, mantissa length in bytes)
+# followed by the bytes of the mantissa.
+_NODES_MAGIC = b"MPMATHQN1"
+_TABLE_HEADER = struct.Struct(">III")
+_MPF_HEADER = struct.Struct(">BqI")
+
+def _write_mpf(fp, v):
+    sign, man, exp, bc = v
+    if man:
+        h = "%x" % man
+        if len(h) & 1:
+            h = "0" + h
+        data = unhexlify(h)
+    else:
+        data = b""
+    fp.write(_MPF_HEADER.pack(sign, exp, len(data)))
+    fp.write(data)
+
+def _read_exactly(fp, n):
+    data = fp.read(n)
+    if len(data) != n:
+        raise ValueError("truncated node file")
+    return data
+
+def _read_mpf(fp):
+    sign, exp, n = _MPF_HEADER.unpack(_read_exactly(fp, _MPF_HEADER.size))
+    if not n:
+        return (0, MPZ(0), 0, 0)
+    man = MPZ(int(hexlify(_read_exactly(fp, n)), 16))
+    return (sign, man, exp, bitcount(man))
 
 class QuadratureRule(object):
     """
@@ -32,6 +70,85 @@ def clear(self):
         self.transformed_cache = {}
         self.interval_count = {}
 
+    def save_nodes(self, file):
+        """
+        Write the cached nodes for the standard interval, for all
+        degrees and precisions computed so far, to *file* (a filename
+        or a file object opened in binary mode). The nodes can be read
+        back with :meth:`load_nodes`, for instance in another process,
+        to avoid recomputing them. :func:`~mpmath.save_nodes` does this
+        for the rules used by :func:`~mpmath.quad`::
+
+            >>> from mpmath import *
+            >>> import io
+            >>> mp.dps = 15
+            >>> rule = mp._gauss_legendre
+            >>> v = quad(exp, [0, 1], method='gauss-legendre')
+            >>> f = io.BytesIO()
+            >>> rule.save_nodes(f)
+            >>> rule.clear()
+            >>> f.seek(0)
+            0
+            >>> rule.load_nodes(f)
+            >>> quad(exp, [0, 1], method='gauss-legendre') == v
+            True
+
+        The file uses a compact binary format, storing the raw
+        mantissas and exponents of the nodes.
+        """
+        if isinstance(file, basestring):
+            fp = open(file, 'wb')
+            try:
+                self.save_nodes(fp)
+            finally:
+                fp.close()
+            return
+        name = self.__class__.__name__.encode('ascii')
+        file.write(_NODES_MAGIC)
+        file.write(struct.pack(">B", len(name)) + name)
+        tables = sorted(self.standard_cache.items())
+        file.write(struct.pack(">I", len(tables)))
+        for (degree, prec), nodes in tables:
+            file.write(_TABLE_HEADER.pack(degree, prec, len(nodes)))
+            for x, w in nodes:
+                _write_mpf(file, x._mpf_)
+                _write_mpf(file, w._mpf_)
+
+    def load_nodes(self, file):
+        """
+        Read nodes written by :meth:`save_nodes` from *file*
+        (a filename or a file object opened in binary mode) and add them
+        to the cache. Raises ValueError if the file is not a node file
+        for this quadrature rule.
+        """
+        if isinstance(file, basestring):
+            fp = open(file, 'rb')
+            try:
+                self.load_nodes(fp)
+            finally:
+                fp.close()
+            return
+        if file.read(len(_NODES_MAGIC)) != _NODES_MAGIC:
+            raise ValueError("not a quadrature node file")
+        n, = struct.unpack(">B", _read_exactly(file, 1))
+        name = _read_exactly(file, n).decode('ascii')
+        if name != self.__class__.__name__:
+            raise ValueError("node file is for %s, not %s" % \
+                (name, self.__class__.__name__))
+        make_mpf = self.ctx.make_mpf
+        tables = {}
+        count, = struct.unpack(">I", _read_exactly(file, 4))
+        for i in xrange(count):
+            degree, prec, n = _TABLE_HEADER.unpack(
+                _read_exactly(file, _TABLE_HEADER.size))
+            nodes = []
+            for j in xrange(n):
+                x = make_mpf(_read_mpf(file))
+                w = make_mpf(_read_mpf(file))
+                nodes.append((x, w))
+            tables[degree, prec] = nodes
+        self.standard_cache.update(tables)
+
     def calc_nodes(self, degree, prec, verbose=False):
         r"""
         Compute nodes for the standard interval `[-1, 1]`. Subclasses
@@ -53,6 +170,8 @@ def get_nodes(self, a, b, degree, prec, verbose=False):
         """
         key = (a, b, degree, prec)
         if key in self.transformed_cache:
+            if stats.enabled:
+                stats.hit(self.__class__.__name__ + '.get_nodes')
             return self.transformed_cache[key]
         orig = self.ctx.prec
         try:
@@ -60,9 +179,13 @@ def get_nodes(self, a, b, degree, prec, verbose=False):
             # Get nodes on standard interval
             if (degree, prec) in self.standard_cache:
                 nodes = self.standard_cache[degree, prec]
+                if stats.enabled:
+                    stats.hit(self.__class__.__name__ + '.get_nodes')
             else:
+                t0 = stats.start()
                 nodes = self.calc_nodes(degree, prec, verbose)
                 self.standard_cache[degree, prec] = nodes
+                stats.miss(self.__class__.__name__ + '.get_nodes', t0)
             # Transform to general interval
             nodes = self.transform_nodes(nodes, a, b, verbose)
             if key in self.interval_count:
@@ -458,6 +581,49 @@ def __init__(ctx, *args, **kwargs):
         ctx._gauss_legendre = GaussLegendre(ctx)
         ctx._tanh_sinh = TanhSinh(ctx)
 
+    def _quadrature_rule(ctx, method):
+        if method == 'tanh-sinh':
+            return ctx._tanh_sinh
+        if method == 'gauss-legendre':
+            return ctx._gauss_legendre
+        raise ValueError("unknown quadrature rule: %s" % method)
+
+    def save_nodes(ctx, file, method='tanh-sinh'):
+        """
+        Writes the nodes and weights that :func:`~mpmath.quad` has
+        computed so far with the quadrature rule *method*
+        (``'tanh-sinh'`` or ``'gauss-legendre'``) to *file*, a filename
+        or a file object opened in binary mode. Computing nodes is the
+        most expensive part of a high-precision integration, so a
+        program can save them once and read them back with
+        :func:`~mpmath.load_nodes`, for instance in another process::
+
+            >>> from mpmath import *
+            >>> import io
+            >>> mp.dps = 50
+            >>> v = quad(exp, [0, 1])
+            >>> f = io.BytesIO()
+            >>> save_nodes(f)
+            >>> f.seek(0)
+            0
+            >>> load_nodes(f)
+            >>> quad(exp, [0, 1]) == v
+            True
+
+        The file stores the raw mantissas and exponents of the nodes for
+        all degrees and precisions in the cache.
+        """
+        ctx._quadrature_rule(method).save_nodes(file)
+
+    def load_nodes(ctx, file, method='tanh-sinh'):
+        """
+        Reads nodes written by :func:`~mpmath.save_nodes` from *file*
+        (a filename or a file object opened in binary mode) into the
+        cache of the quadrature rule *method*. Raises ``ValueError`` if
+        the file was not written for this rule.
+        """
+        ctx._quadrature_rule(method).load_nodes(file)
+
     def quad(ctx, f, *points, **kwargs):
         r"""
         Computes a single, double or triple integral over a given
@@ -722,12 +888,7 @@ def quad(ctx, f, *points, **kwargs):
         """
         rule = kwargs.get('method', 'tanh-sinh')
         if type(rule) is str:
-            if rule == 'tanh-sinh':
-                rule = ctx._tanh_sinh
-            elif rule == 'gauss-legendre':
-                rule = ctx._gauss_legendre
-            else:
-                raise ValueError("unknown quadrature rule: %s" % rule)
+            rule = ctx._quadrature_rule(rule)
         else:
             rule = rule(ctx)
         verbose = kwargs.get('verbose')
@@ -13,6 +13,7 @@
 from .matrices.calculus import MatrixCalculusMethods
 from .matrices.linalg import LinearAlgebraMethods
 from .matrices.eigen import Eigen
+from .matrices.sparse import SparseMethods
 from .identification import IdentificationMethods
 from .visualization import VisualizationMethods
 
@@ -30,6 +31,7 @@ class StandardBaseContext(Context,
     MatrixMethods,
     MatrixCalculusMethods,
     LinearAlgebraMethods,
+    SparseMethods,
     Eigen,
     IdentificationMethods,
     OptimizationMethods,
@@ -48,9 +50,14 @@ def __init__(ctx):
         LaplaceTransformInversionMethods.__init__(ctx)
         CalculusMethods.__init__(ctx)
         MatrixMethods.__init__(ctx)
+        SparseMethods.__init__(ctx)
 
     def _init_aliases(ctx):
         for alias, value in ctx._aliases.items():
+            # Aliases of functions that have not been imported yet are
+            # set on first use (see SpecialFunctions.__getattr__)
+            if value in ctx.lazy_functions and not hasattr(type(ctx), value):
+                continue
             try:
                 setattr(ctx, alias, getattr(ctx, value))
             except AttributeError:
@@ -113,6 +120,9 @@ def fdot(ctx, xs, ys=None, conjugate=False):
         else:
             return sum((x*y for (x,y) in xs), ctx.zero)
 
+    def fma(ctx, x, y, z):
+        return ctx.convert(x)*ctx.convert(y) + ctx.convert(z)
+
     def fprod(ctx, args):
         prod = ctx.one
         for arg in args:
@@ -35,8 +35,13 @@
     mpf_glaisher, mpf_twinprime, mpf_mertens,
     int_types)
 
+from .libmp import cache
+
 from . import function_docs
 from . import rational
+from .mparray import ArrayMethods
+from .parallel import ParallelMethods
+from .ufuncs import UfuncMethods
 
 new = object.__new__
 
@@ -53,7 +58,12 @@
 
 from .ctx_mp_python import _mpf, _mpc, mpnumeric
 
-class MPContext(BaseMPContext, StandardBaseContext):
+def _summator_size(f):
+    # A generated summator is a function; most of its memory is the code
+    return cache.sizeof(f) + cache.sizeof(f.__code__.co_code)
+
+class MPContext(BaseMPContext, StandardBaseContext, ArrayMethods,
+    ParallelMethods, UfuncMethods):
     """
     Context for multiprecision arithmetic with a global precision.
     """
@@ -66,24 +76,24 @@ def __init__(ctx):
         ctx._mpq = rational.mpq
         ctx.default()
         StandardBaseContext.__init__(ctx)
+        ArrayMethods.__init__(ctx)
 
         ctx.mpq = rational.mpq
         ctx.init_builtins()
 
-        ctx.hyp_summators = {}
+        ctx.hyp_summators = cache.LRUCache('hyp_summators',
+            sizeof=_summator_size)
 
         ctx._init_aliases()
 
         # XXX: automate
         try:
             ctx.bernoulli.im_func.func_doc = function_docs.bernoulli
-            ctx.primepi.im_func.func_doc = function_docs.primepi
             ctx.psi.im_func.func_doc = function_docs.psi
             ctx.atan2.im_func.func_doc = function_docs.atan2
         except AttributeError:
             # python 3
             ctx.bernoulli.__func__.func_doc = function_docs.bernoulli
-            ctx.primepi.__func__.func_doc = function_docs.primepi
             ctx.psi.__func__.func_doc = function_docs.psi
             ctx.atan2.__func__.func_doc = function_docs.atan2
 
@@ -294,6 +304,168 @@ def cospi_sinpi(ctx, x, **kwargs):
         else:
             return ctx.cos(x, **kwargs), ctx.sin(x, **kwargs)
 
+    def _map_many(ctx, xs, mpf_many, f, kwargs, negative=True):
+        prec, rounding = ctx._parse_prec(kwargs)
+        xs = [ctx.convert(x) for x in xs]
+        # Real arguments are evaluated in one batch; everything else
+        # (complex numbers, and negative numbers if the result may be
+        # complex) is passed to the ordinary function
+        batch = []
+        for i, x in enumerate(xs):
+            if hasattr(x, '_mpf_') and (negative or not x._mpf_[0]):
+                batch.append(i)
+        values = mpf_many([xs[i]._mpf_ for i in batch], prec, rounding)
+        result = [None] * len(xs)
+        for i, v in zip(batch, values):
+            if len(v) == 2:
+                result[i] = ctx.make_mpf(v[0]), ctx.make_mpf(v[1])
+            else:
+                result[i] = ctx.make_mpf(v)
+        for i, x in enumerate(xs):
+            if result[i] is None:
+                result[i] = f(x, **kwargs)
+        return result
+
+    def exp_many(ctx, xs, **kwargs):
+        """
+        Evaluates the exponential function at each point in the
+        sequence *xs*, returning a list. The result is the same as
+        ``[exp(x) for x in xs]``, but the setup work that depends
+        only on the precision is done once for the whole sequence,
+        which is faster when evaluating at many points::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = True
+            >>> exp_many([0, 1, -2.5, 3+4j])
+            [1.0, 2.71828182845905, 0.0820849986238988, (-13.1287830814622 - 15.200784463068j)]
+
+        The functions :func:`~mpmath.log_many`, :func:`~mpmath.cos_many`,
+        :func:`~mpmath.sin_many` and :func:`~mpmath.cos_sin_many` work
+        the same way. All accept the keyword arguments *prec*, *dps*
+        and *rounding*.
+        """
+        return ctx._map_many(xs, libmp.mpf_exp_many, ctx.exp, kwargs)
+
+    def log_many(ctx, xs, **kwargs):
+        """
+        Returns ``[ln(x) for x in xs]``. See :func:`~mpmath.exp_many`.
+        """
+        return ctx._map_many(xs, libmp.mpf_log_many, ctx.ln, kwargs, False)
+
+    def cos_sin_many(ctx, xs, **kwargs):
+        """
+        Returns ``[cos_sin(x) for x in xs]``. See :func:`~mpmath.exp_many`.
+        """
+        return ctx._map_many(xs, libmp.mpf_cos_sin_many, ctx.cos_sin, kwargs)
+
+    def cos_many(ctx, xs, **kwargs):
+        """
+        Returns ``[cos(x) for x in xs]``. See :func:`~mpmath.exp_many`.
+        """
+        f = lambda xs, prec, rnd: libmp.mpf_cos_sin_many(xs, prec, rnd, 1)
+        return ctx._map_many(xs, f, ctx.cos, kwargs)
+
+    def sin_many(ctx, xs, **kwargs):
+        """
+        Returns ``[sin(x) for x in xs]``. See :func:`~mpmath.exp_many`.
+        """
+        f = lambda xs, prec, rnd: libmp.mpf_cos_sin_many(xs, prec, rnd, 2)
+        return ctx._map_many(xs, f, ctx.sin, kwargs)
+
+    def cache_info(ctx):
+        """
+        Returns a dict with statistics for each of the caches of
+        precomputed data (Taylor series coefficients, Bernoulli numbers,
+        generated hypergeometric series code, etc.) used internally.
+        For each cache, the number of entries, the estimated size in
+        bytes, the size budget (``None`` if unbounded) and the number of
+        entries evicted so far are given::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = False
+            >>> info = cache_info()
+            >>> sorted(info['bernoulli_cache'])
+            ['entries', 'evictions', 'maxsize', 'size']
+
+        The caches are unbounded by default. See
+        :func:`~mpmath.set_cache_limit` and :func:`~mpmath.clear_caches`.
+        """
+        info = cache.cache_info()
+        info['hyp_summators'] = ctx.hyp_summators.info()
+        return info
+
+    def clear_caches(ctx):
+        """
+        Empties all caches listed by :func:`~mpmath.cache_info`, freeing
+        the memory used. This does not change any results; the cached
+        data is recomputed when needed.
+        """
+        cache.clear_caches()
+        ctx.hyp_summators.clear()
+
+    def set_cache_limit(ctx, maxsize, name=None):
+        """
+        Sets the size budget, in bytes, of the cache *name* listed by
+        :func:`~mpmath.cache_info`, or of each cache if no name is given.
+        When a cache exceeds its budget, the least recently used
+        entries are evicted. Passing ``maxsize=None`` removes the limit.
+
+        A limit is useful in long-running processes that evaluate
+        functions at many different arguments or precisions::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = True
+            >>> set_cache_limit(10**4, 'log_taylor_cache')
+            >>> for n in range(2, 200):
+            ...     _ = log(n)
+            ...
+            >>> cache_info()['log_taylor_cache']['size'] <= 10**4
+            True
+            >>> set_cache_limit(None)
+
+        A single entry larger than the budget is kept until another
+        entry is added to the same cache.
+        """
+        if name == 'hyp_summators' or name is None:
+            ctx.hyp_summators.maxsize = maxsize
+            if maxsize is not None:
+                ctx.hyp_summators.shrink(maxsize)
+        if name != 'hyp_summators':
+            cache.set_cache_limit(maxsize, name)
+
+    def stats(ctx, enable=None, reset=False):
+        """
+        Returns counters for the cached computations done internally
+        (quadrature nodes, Bernoulli numbers, gamma function and
+        logarithm coefficients, and generated hypergeometric series
+        code), useful for spotting repeated recomputation, e.g. due to
+        precision changes. For each cached function, the result gives
+        the number of cache hits, the number of misses (values
+        computed), and the total time in seconds spent computing.
+
+        Counting is disabled by default, as it adds some overhead.
+        It is turned on with ``enable=True`` and off with
+        ``enable=False``. With ``reset=True``, the counters are
+        cleared after being returned::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = True
+            >>> clear_caches()
+            >>> _ = stats(enable=True, reset=True)
+            >>> _ = bernoulli(10), bernoulli(10)
+            >>> s = stats(enable=False, reset=True)
+            >>> s['mpf_bernoulli']['hits'], s['mpf_bernoulli']['misses']
+            (1, 1)
+
+        See also :func:`~mpmath.cache_info`.
+        """
+        report = cache.stats.report()
+        if enable is not None:
+            cache.stats.enabled = bool(enable)
+        if reset:
+            cache.stats.reset()
+        return report
+
     def clone(ctx):
         """
         Create a copy of the context, with the same working precision.
@@ -454,6 +626,57 @@ def workdps(ctx, n, normalize_output=False):
         """
         return PrecisionManager(ctx, None, lambda d: n, normalize_output)
 
+    def fixed(ctx, prec=None):
+        r"""
+        Returns a context for computing with fixed-point numbers of
+        *prec* bits after the binary point (by default, the working
+        precision plus 20 guard bits). A fixed-point number is stored
+        as a single integer mantissa, with an exponent shared by all
+        numbers of the context, so arithmetic avoids the normalization
+        of floating-point numbers. This is useful to speed up loops such
+        as Horner evaluation and recurrences over numbers of bounded
+        magnitude::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = True
+            >>> with mp.fixed(80) as F:
+            ...     x = F(1)/3
+            ...     s = F.zero
+            ...     for c in [1, -2, 3, 4]:
+            ...         s = s*x + c
+            ...     print(s)
+            ...     print(F.mpf(s))
+            ...
+            4.8148148148148148148148
+            4.81481481481481
+            >>> polyval([1, -2, 3, 4], mpf(1)/3)
+            4.81481481481481
+
+        The numbers support ``+``, ``-``, ``*``, ``/``, shifts and
+        comparisons, with each other, integers and mpf values, and can
+        be passed to any mpmath function (they are converted exactly).
+        Sums, differences and products with integers are exact; products
+        and quotients of two fixed-point numbers are truncated. The
+        error can be bounded explicitly in terms of ``F.eps`` (the
+        unit in the last place, `2^{-prec}`)::
+
+            >>> with mp.fixed(60) as F:
+            ...     x = F(2)/3
+            ...     y = x*x*x
+            ...     print(F.eps)
+            ...     print(abs(y - F(8)/27) <= 3*F.eps)
+            ...
+            8.6736173798840355e-19
+            True
+
+        Use :func:`~mpmath.workprec` to compute with floating-point
+        numbers at a given precision instead.
+        """
+        from .fixedpoint import FixedContext
+        if prec is None:
+            prec = ctx.prec + 20
+        return FixedContext(ctx, prec)
+
     def autoprec(ctx, f, maxprec=None, catch=(), verbose=False):
         r"""
         Return a wrapped copy of *f* that repeatedly evaluates *f*
@@ -611,10 +834,69 @@ def nstr(ctx, x, n=6, **kwargs):
             return "(" + mpc_to_str(x._mpc_, n, **kwargs)  + ")"
         if isinstance(x, basestring):
             return repr(x)
-        if isinstance(x, ctx.matrix):
+        if isinstance(x, (ctx.matrix, ctx.spmatrix)):
             return x.__nstr__(n, **kwargs)
         return str(x)
 
+    def digits_stream(ctx, constant, base=10, chunk=10000, limit=None):
+        """
+        Generates the digits of a constant in the given *base* (2 to 36)
+        incrementally, without fixing the number of digits in advance.
+        The first string generated is the integer part; each following
+        string holds *chunk* digits of the fractional part. If *limit*
+        is given, *limit* fractional digits are generated in total;
+        otherwise the generator runs forever.
+
+        The *constant* can be ``pi``, ``e`` or ``ln2`` (the constants or
+        their names), or ``'sqrt2'``::
+
+            >>> from mpmath import *
+            >>> list(digits_stream(pi, chunk=10, limit=25))
+            ['3', '1415926535', '8979323846', '26433']
+            >>> list(digits_stream('sqrt2', base=2, chunk=8, limit=16))
+            ['1', '01101010', '00001001']
+
+        The constant is computed at increasing precisions, reusing the
+        binary splitting state, and the digits are converted to the
+        output base chunk by chunk. The digit strings can therefore be
+        written to a file without storing all of them in memory, which
+        is useful for generating millions of digits::
+
+            f = open("pi.txt", "w")
+            for s in digits_stream(pi, limit=10**6):
+                f.write(s)
+
+        The working precision is not used. All digits generated are
+        correct (the expansion is truncated, not rounded).
+        """
+        names = {mpf_pi: 'pi', mpf_e: 'e', mpf_ln2: 'ln2'}
+        if isinstance(constant, basestring):
+            name = {'log2': 'ln2'}.get(constant, constant)
+        else:
+            name = names.get(getattr(constant, 'func', None))
+        if name not in libmp.constant_steps:
+            raise ValueError("digits_stream() does not support %r" % (constant,))
+        return libmp.constant_digits(name, base, chunk, limit)
+
+    def set_backend(ctx, name):
+        """
+        Selects the big-integer backend used for all subsequent
+        computations, by name. The available backends are the keys of
+        ``libmp.backends``: ``'python'`` (Python integers), ``'gmpy'``
+        if gmpy is installed, and any backend added with
+        ``libmp.register_backend()``. The name of the current backend
+        is ``libmp.BACKEND``::
+
+            >>> from mpmath import *
+            >>> libmp.BACKEND in libmp.backends
+            True
+            >>> mp.set_backend(libmp.BACKEND)
+
+        The backend is global, not specific to the context; see
+        :func:`mpmath.libmp.set_backend` for details.
+        """
+        libmp.set_backend(name)
+
     def _convert_fallback(ctx, x, strings):
         if strings and isinstance(x, basestring):
             if 'j' in x.lower():
@@ -671,9 +953,17 @@ def hypsum(ctx, p, q, flags, coeffs, z, accurate_small=True, **kwargs):
             key = p, q, flags, 'C'
             v = z._mpc_
         if key not in ctx.hyp_summators:
+            t0 = cache.stats.start()
             ctx.hyp_summators[key] = libmp.make_hyp_summator(key)[1]
+            cache.stats.miss('make_hyp_summator', t0)
+        elif cache.stats.enabled:
+            cache.stats.hit('make_hyp_summator')
         summator = ctx.hyp_summators[key]
         prec = ctx.prec
+        # Rational series at very high precision
+        if prec >= libmp.HYP_BS_PREC and key[3] == 'R' and \
+            not [f for f in flags if f not in 'ZQ']:
+            summator = libmp.make_hyp_summator_bs(key, summator)
         maxprec = kwargs.get('maxprec', ctx._default_hyper_maxprec(prec))
         extraprec = 50
         epsshift = 25
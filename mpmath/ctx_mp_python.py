@@ -12,7 +12,7 @@
     mpf_div, mpf_rdiv_int, mpf_pow_int, mpf_mod,
     mpf_eq, mpf_cmp, mpf_lt, mpf_gt, mpf_le, mpf_ge,
     mpf_hash, mpf_rand,
-    mpf_sum,
+    mpf_sum, mpf_dot, mpf_fma,
     bitcount, to_fixed,
     mpc_to_str,
     mpc_to_complex, mpc_hash, mpc_pos, mpc_is_nonzero, mpc_neg, mpc_conjugate,
@@ -27,6 +27,13 @@
 
 from . import rational
 from . import function_docs
+from .ufuncs import apply_ufunc
+
+import threading
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
 
 new = object.__new__
 
@@ -225,6 +232,9 @@ def sqrt(s):
     def ae(s, t, rel_eps=None, abs_eps=None):
         return s.context.almosteq(s, t, rel_eps, abs_eps)
 
+    def __array_ufunc__(s, ufunc, method, *inputs, **kwargs):
+        return apply_ufunc(s.context, ufunc, method, inputs, kwargs)
+
     def to_fixed(self, prec):
         return to_fixed(self._mpf_, prec)
 
@@ -397,6 +407,9 @@ def __str__(s):
     def __complex__(s):
         return mpc_to_complex(s._mpc_, rnd=s.context._prec_rounding[1])
 
+    def __array_ufunc__(s, ufunc, method, *inputs, **kwargs):
+        return apply_ufunc(s.context, ufunc, method, inputs, kwargs)
+
     def __pos__(s):
         cls, new, (prec, rounding) = s._ctxdata
         v = new(cls)
@@ -578,6 +591,65 @@ def ae(s, t, rel_eps=None, abs_eps=None):
 complex_types = (complex, _mpc)
 
 
+class _LocalPrecRounding(list):
+    """
+    Replacement for the [prec, rounding] list of a context that keeps
+    the values (and the decimal precision) in storage local to the
+    current thread and, where contextvars is available, to the current
+    asyncio task. Unpacking and indexing work as for an ordinary list.
+    """
+
+    def __init__(self, prec, rounding, dps):
+        list.__init__(self, [prec, rounding])
+        default = (prec, rounding, dps)
+        if contextvars is not None:
+            var = contextvars.ContextVar('mpmath_precision', default=default)
+            self._get = var.get
+            self._set = var.set
+        else:
+            local = threading.local()
+            def get():
+                try:
+                    return local.state
+                except AttributeError:
+                    return default
+            def set(state):
+                local.state = state
+            self._get = get
+            self._set = set
+
+    def __iter__(self):
+        return iter(self._get()[:2])
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        return self._get()[:2][i]
+
+    def __setitem__(self, i, value):
+        state = list(self._get())
+        state[i] = value
+        self._set(tuple(state))
+
+    def __repr__(self):
+        return repr(list(self))
+
+def _get_local_prec(ctx): return ctx._prec_rounding._get()[0]
+def _get_local_dps(ctx): return ctx._prec_rounding._get()[2]
+def _set_local_prec(ctx, n): ctx._prec_rounding[0] = n
+def _set_local_dps(ctx, n): ctx._prec_rounding[2] = n
+
+class _LocalPrecisionContext(object):
+    """
+    Mixin overriding the precision attributes of a context so that
+    they are read from a _LocalPrecRounding instance.
+    """
+    _prec = property(_get_local_prec, _set_local_prec)
+    _dps = property(_get_local_dps, _set_local_dps)
+
+_local_context_classes = {}
+
 class PythonMPContext(object):
 
     def __init__(ctx):
@@ -618,6 +690,45 @@ def _set_dps(ctx, n):
     prec = property(lambda ctx: ctx._prec, _set_prec)
     dps = property(lambda ctx: ctx._dps, _set_dps)
 
+    def _get_threadlocal(ctx):
+        return isinstance(ctx, _LocalPrecisionContext)
+
+    def _set_threadlocal(ctx, enable):
+        enable = bool(enable)
+        if enable == ctx.threadlocal:
+            return
+        prec, rounding = ctx._prec_rounding
+        dps = ctx._dps
+        cls = ctx.__class__
+        if enable:
+            if cls not in _local_context_classes:
+                _local_context_classes[cls] = type(cls.__name__,
+                    (_LocalPrecisionContext, cls), {})
+            ctx.__class__ = _local_context_classes[cls]
+            ctx._prec_rounding = _LocalPrecRounding(prec, rounding, dps)
+        else:
+            ctx.__class__ = cls.__bases__[1]
+            ctx._prec_rounding = [prec, rounding]
+            ctx._prec = prec
+            ctx._dps = dps
+        for tp in [ctx.mpf, ctx.mpc, ctx.constant]:
+            tp._ctxdata[2] = ctx._prec_rounding
+
+    threadlocal = property(_get_threadlocal, _set_threadlocal, doc="""
+        Whether the working precision and rounding mode are local to
+        each thread. This is off by default.
+
+        After setting ``mp.threadlocal = True``, changes to ``mp.prec``
+        or ``mp.dps`` (including those made by :func:`~mpmath.workprec`,
+        :func:`~mpmath.workdps`, etc.) only affect the thread that makes
+        them, and with Python 3.7 or later also only the current asyncio
+        task. New threads and tasks start with the precision that was
+        in effect when thread-local mode was enabled. Other settings,
+        such as ``mp.pretty``, remain shared.
+
+        Thread-local precision makes most operations slightly slower.
+        """)
+
     def convert(ctx, x, strings=True):
         """
         Converts *x* to an ``mpf`` or ``mpc``. If *x* is of type ``mpf``,
@@ -936,18 +1047,27 @@ def fdot(ctx, A, B=None, conjugate=False):
         if B is not None:
             A = zip(A, B)
         prec, rnd = ctx._prec_rounding
-        real = []
-        imag = []
+        # The products are accumulated exactly by mpf_dot
+        real_a = []
+        real_b = []
+        imag_a = []
+        imag_b = []
         other = 0
         hasattr_ = hasattr
-        types = (ctx.mpf, ctx.mpc)
+        mpf = ctx.mpf
+        types = (mpf, ctx.mpc)
         for a, b in A:
+            if type(a) is mpf and type(b) is mpf:
+                real_a.append(a._mpf_)
+                real_b.append(b._mpf_)
+                continue
             if type(a) not in types: a = ctx.convert(a)
             if type(b) not in types: b = ctx.convert(b)
             a_real = hasattr_(a, "_mpf_")
             b_real = hasattr_(b, "_mpf_")
             if a_real and b_real:
-                real.append(mpf_mul(a._mpf_, b._mpf_))
+                real_a.append(a._mpf_)
+                real_b.append(b._mpf_)
                 continue
             a_complex = hasattr_(a, "_mpc_")
             b_complex = hasattr_(b, "_mpc_")
@@ -956,31 +1076,35 @@ def fdot(ctx, A, B=None, conjugate=False):
                 bre, bim = b._mpc_
                 if conjugate:
                     bim = mpf_neg(bim)
-                real.append(mpf_mul(aval, bre))
-                imag.append(mpf_mul(aval, bim))
+                real_a.append(aval)
+                real_b.append(bre)
+                imag_a.append(aval)
+                imag_b.append(bim)
             elif b_real and a_complex:
                 are, aim = a._mpc_
                 bval = b._mpf_
-                real.append(mpf_mul(are, bval))
-                imag.append(mpf_mul(aim, bval))
+                real_a.append(are)
+                real_b.append(bval)
+                imag_a.append(aim)
+                imag_b.append(bval)
             elif a_complex and b_complex:
                 #re, im = mpc_mul(a._mpc_, b._mpc_, prec+20)
                 are, aim = a._mpc_
                 bre, bim = b._mpc_
                 if conjugate:
                     bim = mpf_neg(bim)
-                real.append(mpf_mul(are, bre))
-                real.append(mpf_neg(mpf_mul(aim, bim)))
-                imag.append(mpf_mul(are, bim))
-                imag.append(mpf_mul(aim, bre))
+                real_a += [are, aim]
+                real_b += [bre, mpf_neg(bim)]
+                imag_a += [are, aim]
+                imag_b += [bim, bre]
             else:
                 if conjugate:
                     other += a*ctx.conj(b)
                 else:
                     other += a*b
-        s = mpf_sum(real, prec, rnd)
-        if imag:
-            s = ctx.make_mpc((s, mpf_sum(imag, prec, rnd)))
+        s = mpf_dot(real_a, real_b, prec, rnd)
+        if imag_a:
+            s = ctx.make_mpc((s, mpf_dot(imag_a, imag_b, prec, rnd)))
         else:
             s = ctx.make_mpf(s)
         if other is 0:
@@ -988,6 +1112,39 @@ def fdot(ctx, A, B=None, conjugate=False):
         else:
             return s + other
 
+    def fma(ctx, x, y, z):
+        r"""
+        Computes `x y + z` with a single rounding: the product is
+        not rounded before the addition.
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = False
+            >>> x = mpf(1) + eps
+            >>> fma(x, x, -(x*x))
+            mpf('4.9303806576313238e-32')
+            >>> x*x - x*x
+            mpf('0.0')
+            >>> fma(2, 3j, 1)
+            mpc(real='1.0', imag='6.0')
+
+        """
+        mpf = ctx.mpf
+        if type(x) is mpf and type(y) is mpf and type(z) is mpf:
+            return ctx.make_mpf(mpf_fma(x._mpf_, y._mpf_, z._mpf_,
+                *ctx._prec_rounding))
+        prec, rnd = ctx._prec_rounding
+        x = ctx.convert(x)
+        y = ctx.convert(y)
+        z = ctx.convert(z)
+        if hasattr(x, '_mpf_') and hasattr(y, '_mpf_') and hasattr(z, '_mpf_'):
+            return ctx.make_mpf(mpf_fma(x._mpf_, y._mpf_, z._mpf_, prec, rnd))
+        xre, xim = getattr(x, '_mpc_', None) or (x._mpf_, fzero)
+        yre, yim = getattr(y, '_mpc_', None) or (y._mpf_, fzero)
+        zre, zim = getattr(z, '_mpc_', None) or (z._mpf_, fzero)
+        re = mpf_dot([xre, xim, zre], [yre, mpf_neg(yim), fone], prec, rnd)
+        im = mpf_dot([xre, xim, zim], [yim, yre, fone], prec, rnd)
+        return ctx.make_mpc((re, im))
+
     def _wrap_libmp_function(ctx, mpf_f, mpc_f=None, mpi_f=None, doc="<no doc>"):
         """
         Given a low-level mpf_ function, and optionally similar functions
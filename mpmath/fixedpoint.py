@@ -0,0 +1,233 @@
+"""
+Fixed-point numbers for fast loops at a fixed precision (see
+MPContext.fixed).
+"""
+
+import operator
+
+from .libmp import (MPZ, int_types, from_man_exp, to_fixed, mpf_hash,
+    prec_to_dps, to_str, finf, fninf, fnan, mpf_eq, mpf_lt, mpf_le,
+    mpf_gt, mpf_ge)
+
+new = object.__new__
+
+def _mpf_ne(s, t):
+    return not mpf_eq(s, t)
+
+class mpfixed(object):
+    """
+    A real fixed-point number man * 2**(-prec). The precision prec
+    is shared by all numbers of a type created by FixedContext.
+    Addition, subtraction and multiplication by integers are exact;
+    multiplication and division of two fixed-point numbers truncate
+    the result (rounding toward -inf) to prec bits.
+    """
+
+    __slots__ = ["man"]
+
+    _prec = None
+    _context = None
+
+    def __new__(cls, x=0):
+        v = new(cls)
+        v.man = cls._context.to_man(x)
+        return v
+
+    @classmethod
+    def _new(cls, man):
+        v = new(cls)
+        v.man = man
+        return v
+
+    @property
+    def _mpf_(s):
+        return from_man_exp(s.man, -s._prec)
+
+    def __repr__(s):
+        return "%s('%s')" % (type(s).__name__, s)
+
+    def __str__(s):
+        return to_str(s._mpf_, prec_to_dps(s._prec))
+
+    def __float__(s):
+        return float(s._context.ctx.make_mpf(s._mpf_))
+
+    def __int__(s):
+        # Truncate toward zero, like int(float)
+        if s.man < 0:
+            return -((-s.man) >> s._prec)
+        return s.man >> s._prec
+
+    def __nonzero__(s):
+        return bool(s.man)
+
+    __bool__ = __nonzero__
+
+    def __hash__(s):
+        return mpf_hash(s._mpf_)
+
+    def _coerce(s, t):
+        # Mantissa of t at the same precision, or None
+        if type(t) is type(s):
+            return t.man
+        try:
+            return s._context.to_man(t)
+        except TypeError:
+            return None
+
+    def _cmp(s, t, op, mpf_op):
+        # Compares exactly; only two numbers of the same type are
+        # compared by their mantissas
+        if type(t) is type(s):
+            return op(s.man, t.man)
+        if type(t) in int_types:
+            return op(s.man, MPZ(t) << s._prec)
+        try:
+            t = s._context.ctx.convert(t)
+        except TypeError:
+            return NotImplemented
+        if not hasattr(t, '_mpf_'):
+            return NotImplemented
+        return mpf_op(s._mpf_, t._mpf_)
+
+    def __eq__(s, t): return s._cmp(t, operator.eq, mpf_eq)
+    def __ne__(s, t): return s._cmp(t, operator.ne, _mpf_ne)
+    def __lt__(s, t): return s._cmp(t, operator.lt, mpf_lt)
+    def __le__(s, t): return s._cmp(t, operator.le, mpf_le)
+    def __gt__(s, t): return s._cmp(t, operator.gt, mpf_gt)
+    def __ge__(s, t): return s._cmp(t, operator.ge, mpf_ge)
+
+    def __pos__(s):
+        return s
+
+    def __neg__(s):
+        return s._new(-s.man)
+
+    def __abs__(s):
+        if s.man < 0:
+            return s._new(-s.man)
+        return s
+
+    def __add__(s, t):
+        if type(t) is type(s):
+            return s._new(s.man + t.man)
+        t = s._coerce(t)
+        if t is None:
+            return NotImplemented
+        return s._new(s.man + t)
+
+    __radd__ = __add__
+
+    def __sub__(s, t):
+        if type(t) is type(s):
+            return s._new(s.man - t.man)
+        t = s._coerce(t)
+        if t is None:
+            return NotImplemented
+        return s._new(s.man - t)
+
+    def __rsub__(s, t):
+        t = s._coerce(t)
+        if t is None:
+            return NotImplemented
+        return s._new(t - s.man)
+
+    def __mul__(s, t):
+        ttype = type(t)
+        if ttype is type(s):
+            return s._new((s.man * t.man) >> s._prec)
+        if ttype in int_types:
+            return s._new(s.man * t)
+        t = s._coerce(t)
+        if t is None:
+            return NotImplemented
+        return s._new((s.man * t) >> s._prec)
+
+    __rmul__ = __mul__
+
+    def __div__(s, t):
+        ttype = type(t)
+        if ttype in int_types:
+            return s._new(s.man // t)
+        t = s._coerce(t)
+        if t is None:
+            return NotImplemented
+        return s._new((s.man << s._prec) // t)
+
+    def __rdiv__(s, t):
+        t = s._coerce(t)
+        if t is None:
+            return NotImplemented
+        return s._new((t << s._prec) // s.man)
+
+    __truediv__ = __div__
+    __rtruediv__ = __rdiv__
+
+    def __lshift__(s, n):
+        return s._new(s.man << n)
+
+    def __rshift__(s, n):
+        return s._new(s.man >> n)
+
+
+class FixedContext(object):
+    """
+    Creates fixed-point numbers with a given precision; returned by
+    MPContext.fixed().
+    """
+
+    def __init__(s, ctx, prec):
+        s.ctx = ctx
+        s.prec = prec
+        s.mpfixed = type('mpfixed', (mpfixed,),
+            {'_prec': prec, '_context': s, '__slots__': []})
+        s.zero = s.mpfixed._new(MPZ(0))
+        s.one = s.mpfixed._new(MPZ(1) << prec)
+        s.eps = s.mpfixed._new(MPZ(1))
+
+    def __repr__(s):
+        return "<fixed-point context, prec=%i>" % s.prec
+
+    def __enter__(s):
+        return s
+
+    def __exit__(s, exc_type, exc_val, exc_tb):
+        return False
+
+    def to_man(s, x):
+        """
+        Returns the mantissa of x converted to a fixed-point number
+        (truncated toward -inf). Raises ValueError if x is an infinity
+        or nan.
+        """
+        if type(x) is s.mpfixed:
+            return x.man
+        if type(x) in int_types:
+            return MPZ(x) << s.prec
+        if not hasattr(x, '_mpf_'):
+            x = s.ctx.convert(x)
+            if not hasattr(x, '_mpf_'):
+                raise TypeError("fixed-point numbers must be real")
+        x = x._mpf_
+        if x in (finf, fninf, fnan):
+            raise ValueError("fixed-point numbers must be finite")
+        return to_fixed(x, s.prec)
+
+    def __call__(s, x):
+        """
+        Converts x to a fixed-point number.
+        """
+        return s.mpfixed._new(s.to_man(x))
+
+    def from_man(s, man):
+        """
+        Returns the fixed-point number man * 2**(-prec).
+        """
+        return s.mpfixed._new(man)
+
+    def mpf(s, x):
+        """
+        Converts the fixed-point number x to an mpf, rounded to the
+        working precision of the context.
+        """
+        return +s.ctx.make_mpf(x._mpf_)
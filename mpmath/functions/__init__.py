@@ -1,13 +1,68 @@
 from . import functions
-# Hack to update methods
-from . import factorials
-from . import hypergeometric
-from . import expintegrals
-from . import bessel
-from . import orthogonal
-from . import theta
-from . import elliptic
-from . import zeta
 from . import rszeta
-from . import zetazeros
-from . import qfunctions
+
+# The remaining modules are imported when one of the functions they
+# define is first accessed on a context (see SpecialFunctions.__getattr__),
+# which saves time on "import mpmath". This table must list every
+# function defined with defun, defun_wrapped or defun_static in each
+# module.
+_lazy_modules = {
+    'factorials': (
+        'gammaprod', 'beta', 'binomial', 'rf', 'ff', 'fac2', 'barnesg',
+        'superfac', 'hyperfac', 'loggamma_old'
+    ),
+    'hypergeometric': (
+        'hypercomb', 'hyper', 'hyp0f1', 'hyp1f1', 'hyp1f2', 'hyp2f1',
+        'hyp2f2', 'hyp2f3', 'hyp2f0', 'hyp3f2', '_hyp1f0', '_hyp0f1',
+        '_hyp1f1', '_hyp2f1', '_hypq1fq', '_hyp_borel', '_hyp2f2',
+        '_hyp1f2', '_hyp2f3', '_hyp2f0', 'meijerg', 'appellf1',
+        'appellf2', 'appellf3', 'appellf4', 'hyper2d', 'bihyper'
+    ),
+    'expintegrals': (
+        '_erf_complex', '_erfc_complex', 'erf', 'erfc', 'square_exp_arg',
+        'erfi', 'erfinv', 'npdf', 'ncdf', 'betainc', 'gammainc',
+        '_lower_gamma', '_upper_gamma', '_gamma3', 'expint', 'li', 'ei',
+        '_ei_generic', 'e1', 'ci', '_ci_generic', 'si', '_si_generic',
+        'chi', 'shi', 'fresnels', 'fresnelc'
+    ),
+    'bessel': (
+        'j0', 'j1', 'besselj', 'besseli', 'bessely', 'besselk', 'hankel1',
+        'hankel2', 'whitm', 'whitw', 'hyperu', 'struveh', 'struvel',
+        'angerj', 'webere', 'lommels1', 'lommels2', 'ber', 'bei', 'ker',
+        'kei', 'airyai', 'airybi', 'airyaizero', 'airybizero', 'scorergi',
+        'scorerhi', 'coulombc', 'coulombf', '_coulomb_chi', 'coulombg',
+        'besseljzero', 'besselyzero'
+    ),
+    'orthogonal': (
+        'hermite', 'pcfd', 'pcfu', 'pcfv', 'pcfw', 'gegenbauer', 'jacobi',
+        'laguerre', 'legendre', 'legenp', 'legenq', 'chebyt', 'chebyu',
+        'spherharm'
+    ),
+    'theta': (
+        '_jacobi_theta2', '_djacobi_theta2', '_jacobi_theta3',
+        '_djacobi_theta3', '_jacobi_theta2a', '_jacobi_theta3a',
+        '_djacobi_theta2a', '_djacobi_theta3a', 'jtheta', '_djtheta'
+    ),
+    'elliptic': (
+        'qfrom', 'qbarfrom', 'taufrom', 'kfrom', 'mfrom', 'ellipfun',
+        'kleinj', 'elliprf', 'elliprc', 'elliprj', 'elliprd', 'elliprg',
+        'ellipf', 'ellipe', 'ellippi'
+    ),
+    'zeta': (
+        'stieltjes', 'siegeltheta', 'grampoint', 'siegelz', 'oldzetazero',
+        'riemannr', 'primepi', 'primepi2', 'primezeta', 'bernpoly',
+        'eulerpoly', 'eulernum', 'polylog', 'clsin', 'clcos', 'altzeta',
+        '_altzeta_generic', 'zeta', '_hurwitz', '_zetasum', 'dirichlet',
+        'secondzeta', 'lerchphi'
+    ),
+    'zetazeros': (
+        'zetazero', 'nzeros', 'backlunds'
+    ),
+    'qfunctions': (
+        'qp', 'qgamma', 'qfac', 'qhyper'
+    ),
+}
+
+for _module, _names in _lazy_modules.items():
+    for _name in _names:
+        functions.SpecialFunctions.lazy_functions[_name] = _module
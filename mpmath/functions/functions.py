@@ -1,4 +1,7 @@
+import importlib
+
 from ..libmp.backend import xrange
+from .. import function_docs
 
 class SpecialFunctions(object):
     """
@@ -10,6 +13,13 @@ class SpecialFunctions(object):
     """
     defined_functions = {}
 
+    # Functions defined in modules that are imported on first use,
+    # mapping the name of each function to the module (filled in by
+    # mpmath.functions), and the context classes to which imported
+    # functions must be added
+    lazy_functions = {}
+    context_classes = set()
+
     # The series for the Jacobi theta functions converge for |q| < 1;
     # in the current implementation they throw a ValueError for
     # abs(q) > THETA_Q_LIM
@@ -17,9 +27,9 @@ class SpecialFunctions(object):
 
     def __init__(self):
         cls = self.__class__
-        for name in cls.defined_functions:
-            f, wrap = cls.defined_functions[name]
-            cls._wrap_specfun(name, f, wrap)
+        cls._wrapped_functions = set()
+        cls._wrap_defined_functions()
+        SpecialFunctions.context_classes.add(cls)
 
         self.mpq_1 = self._mpq((1,1))
         self.mpq_0 = self._mpq((0,1))
@@ -55,7 +65,29 @@ def __init__(self):
             'factorial' : 'fac',
         })
 
-        self.zetazero_memoized = self.memoize(self.zetazero)
+        # zetazero is not imported until needed
+        self.zetazero_memoized = self.memoize(lambda n: self.zetazero(n))
+
+    def __getattr__(self, name):
+        # Only called if the attribute does not exist
+        if name in SpecialFunctions.lazy_functions:
+            load_functions(SpecialFunctions.lazy_functions[name])
+            return getattr(self, name)
+        if name in self.__dict__.get('_aliases', ()):
+            value = getattr(self, self._aliases[name])
+            setattr(self, name, value)
+            return value
+        raise AttributeError("%r object has no attribute %r" % \
+            (self.__class__.__name__, name))
+
+    @classmethod
+    def _wrap_defined_functions(cls):
+        wrapped = cls._wrapped_functions
+        for name in cls.defined_functions:
+            if name not in wrapped:
+                f, wrap = cls.defined_functions[name]
+                cls._wrap_specfun(name, f, wrap)
+                wrapped.add(name)
 
     # Default -- do nothing
     @classmethod
@@ -85,8 +117,18 @@ def defun(f):
     SpecialFunctions.defined_functions[f.__name__] = f, False
 
 def defun_static(f):
+    f.__doc__ = function_docs.__dict__.get(f.__name__, f.__doc__)
     setattr(SpecialFunctions, f.__name__, f)
 
+def load_functions(module):
+    """
+    Import the module mpmath.functions.<module> and add the functions
+    it defines to all contexts.
+    """
+    importlib.import_module("." + module, __package__)
+    for cls in SpecialFunctions.context_classes:
+        cls._wrap_defined_functions()
+
 @defun_wrapped
 def cot(ctx, z): return ctx.one / ctx.tan(z)
 
@@ -340,7 +340,7 @@ def findpoly(ctx, x, n=1, **kwargs):
     ``polyroots``::
 
         >>> nprint(polyval(findpoly(phi, 2), phi), 1)
-        -2.0e-16
+        -1.0e-16
         >>> for r in polyroots(findpoly(phi, 2)):
         ...     print(r)
         ...
@@ -8,10 +8,12 @@
   from_float, from_npfloat, from_Decimal, to_float, from_rational, to_rational, to_fixed,
   mpf_rand, mpf_eq, mpf_hash, mpf_cmp, mpf_lt, mpf_le, mpf_gt, mpf_ge,
   mpf_pos, mpf_neg, mpf_abs, mpf_sign, mpf_add, mpf_sub, mpf_sum,
+  mpf_dot, mpf_fma,
   mpf_mul, mpf_mul_int, mpf_shift, mpf_frexp,
   mpf_div, mpf_rdiv_int, mpf_mod, mpf_pow_int,
   mpf_perturb,
   to_digits_exp, to_str, str_to_man_exp, from_str, from_bstr, to_bstr,
+  mpf_recip_newton,
   mpf_sqrt, mpf_hypot)
 
 from .libmpc import (mpc_one, mpc_zero, mpc_two, mpc_half,
@@ -35,9 +37,12 @@
   mpf_log, mpf_log_hypot, mpf_exp, mpf_cos_sin, mpf_cos, mpf_sin, mpf_tan,
   mpf_cos_sin_pi, mpf_cos_pi, mpf_sin_pi, mpf_cosh_sinh,
   mpf_cosh, mpf_sinh, mpf_tanh, mpf_atan, mpf_atan2, mpf_asin,
-  mpf_acos, mpf_asinh, mpf_acosh, mpf_atanh, mpf_fibonacci)
+  mpf_acos, mpf_asinh, mpf_acosh, mpf_atanh, mpf_fibonacci,
+  mpf_exp_many, mpf_log_many, mpf_cos_sin_many,
+  constant_steps, constant_digits)
 
 from .libhyper import (NoConvergence, make_hyp_summator,
+  make_hyp_summator_bs, hyp_bs, hyp_bs_terms, HYP_BS_PREC,
   mpf_erf, mpf_erfc, mpf_ei, mpc_ei, mpf_e1, mpc_e1, mpf_expint,
   mpf_ci_si, mpf_ci, mpf_si, mpc_ci, mpc_si, mpf_besseljn,
   mpc_besseljn, mpf_agm, mpf_agm1, mpc_agm, mpc_agm1,
@@ -69,10 +74,11 @@
   mpi_gamma, mpci_gamma, mpi_loggamma, mpci_loggamma,
   mpi_rgamma, mpci_rgamma, mpi_factorial, mpci_factorial)
 
-from .libintmath import (trailing, bitcount, numeral, bin_to_radix,
+from .libintmath import (trailing, bitcount, numeral, numeral_chunks,
+  bin_to_radix, radix_power, from_numeral,
   isqrt, isqrt_small, isqrt_fast, sqrt_fixed, sqrtrem, ifib, ifac,
   list_primes, isprime, moebius, gcd, eulernum, stirling1, stirling2)
 
 from .backend import (gmpy, sage, BACKEND, STRICT, MPZ, MPZ_TYPE,
   MPZ_ZERO, MPZ_ONE, MPZ_TWO, MPZ_THREE, MPZ_FIVE, int_types,
-  HASH_MODULUS, HASH_BITS)
+  HASH_MODULUS, HASH_BITS, Backend, backends, register_backend, set_backend)
@@ -51,6 +51,117 @@
     HASH_MODULUS = None
     HASH_BITS = None
 
+class Backend(object):
+    """
+    A big-integer backend. MPZ is the constructor of the integer type
+    used for mantissas and fixed-point numbers; it must accept a Python
+    integer, or a string and a base like int(), and the resulting type
+    must support the arithmetic and bitwise operators of Python integers
+    (mixed with Python integers).
+
+    Faster implementations of the integer kernels can be given as
+    keyword arguments:
+
+        bitcount(n)       bit size of the nonnegative integer n
+        trailing(n)       number of trailing zero bits of abs(n)
+        isqrt(n)          integer square root of n; isqrt_small and
+                          isqrt_fast default to the same function
+        sqrtrem(n)        integer square root and remainder of n
+        numeral(n, base=10, size=0, digits=stddigits)
+                          string of digits of the integer n
+        ifac(n)           factorial of n
+        mpf_mul(s, t, prec=0, rnd=round_fast)
+        mpf_mul_int(s, n, prec, rnd=round_fast)
+                          product of raw mpfs, or of a raw mpf by an integer
+        normalize(sign, man, exp, bc, prec, rnd)
+                          rounding of a raw mpf; normalize1 (for odd
+                          mantissas) defaults to the same function
+        from_man_exp(man, exp, prec=None, rnd=round_fast)
+                          raw mpf from a mantissa and an exponent
+
+    Kernels that are not given default to the implementations in libmp
+    used with Python integers. For example, a backend using the fmpz
+    type of python-flint could be registered and selected with
+
+        import flint
+        register_backend(Backend('flint', flint.fmpz,
+            isqrt=lambda n: flint.fmpz(n).isqrt()))
+        set_backend('flint')
+    """
+
+    kernel_names = ('bitcount', 'trailing', 'isqrt', 'isqrt_small',
+        'isqrt_fast', 'sqrtrem', 'numeral', 'ifac', 'mpf_mul', 'mpf_mul_int',
+        'normalize', 'normalize1', 'from_man_exp')
+
+    # Kernels defaulting to another kernel of the same backend
+    kernel_defaults = {'isqrt_small':'isqrt', 'isqrt_fast':'isqrt',
+        'normalize1':'normalize'}
+
+    # Global names in libmp bound to each kernel, if not the kernel name
+    kernel_globals = {'normalize':('normalize', '_normalize'),
+        'normalize1':('normalize1', '_normalize1')}
+
+    def __init__(self, name, MPZ, **kernels):
+        for k in kernels:
+            if k not in self.kernel_names:
+                raise ValueError("unknown kernel: %s" % k)
+        self.name = name
+        self.MPZ = MPZ
+        self.MPZ_TYPE = type(MPZ(0))
+        self.MPZ_ZERO = MPZ(0)
+        self.MPZ_ONE = MPZ(1)
+        self.MPZ_TWO = MPZ(2)
+        self.MPZ_THREE = MPZ(3)
+        self.MPZ_FIVE = MPZ(5)
+        if self.MPZ_TYPE in python_int_types:
+            self.int_types = python_int_types
+        else:
+            self.int_types = python_int_types + (self.MPZ_TYPE,)
+        self.kernels = kernels
+
+    def __repr__(self):
+        return "<Backend %r>" % self.name
+
+    def kernel(self, name):
+        """Return the implementation of the kernel with the given name."""
+        if name in self.kernels:
+            return self.kernels[name]
+        if self.kernel_defaults.get(name) in self.kernels:
+            return self.kernels[self.kernel_defaults[name]]
+        return python_kernels[name]
+
+    def bindings(self):
+        """Return a dict of the global names in libmp that depend on the
+        backend and their values for this backend."""
+        d = {'BACKEND':self.name, 'int_types':self.int_types}
+        for name in ('MPZ', 'MPZ_TYPE', 'MPZ_ZERO', 'MPZ_ONE', 'MPZ_TWO',
+            'MPZ_THREE', 'MPZ_FIVE'):
+            d[name] = getattr(self, name)
+        for name in self.kernel_names:
+            for g in self.kernel_globals.get(name, (name,)):
+                d[g] = self.kernel(name)
+        return d
+
+# name -> Backend
+backends = {}
+
+# Default kernels, registered by the modules implementing them
+python_kernels = {}
+
+def register_backend(backend):
+    """
+    Add a Backend to the registry, making it available to set_backend().
+    """
+    backends[backend.name] = backend
+    return backend
+
+try:
+    python_int_types = (int, long)
+except NameError:
+    python_int_types = (int,)
+
+register_backend(Backend('python', MPZ))
+
 if 'MPMATH_NOGMPY' not in os.environ:
     try:
         try:
@@ -61,8 +172,8 @@
             except ImportError:
                 raise ImportError
         if gmpy.version() >= '1.03':
+            register_backend(Backend('gmpy', gmpy.mpz))
             BACKEND = 'gmpy'
-            MPZ = gmpy.mpz
     except:
         pass
 
@@ -72,8 +183,8 @@
         import sage.libs.mpmath.utils as _sage_utils
         sage = sage.all
         sage_utils = _sage_utils
+        register_backend(Backend('sage', sage.Integer))
         BACKEND = 'sage'
-        MPZ = sage.Integer
     except:
         pass
 
@@ -82,20 +193,75 @@
 else:
     STRICT = False
 
-MPZ_TYPE = type(MPZ(0))
-MPZ_ZERO = MPZ(0)
-MPZ_ONE = MPZ(1)
-MPZ_TWO = MPZ(2)
-MPZ_THREE = MPZ(3)
-MPZ_FIVE = MPZ(5)
+_backend = backends[BACKEND]
+MPZ = _backend.MPZ
+MPZ_TYPE = _backend.MPZ_TYPE
+MPZ_ZERO = _backend.MPZ_ZERO
+MPZ_ONE = _backend.MPZ_ONE
+MPZ_TWO = _backend.MPZ_TWO
+MPZ_THREE = _backend.MPZ_THREE
+MPZ_FIVE = _backend.MPZ_FIVE
+int_types = _backend.int_types
 
-try:
-    if BACKEND == 'python':
-        int_types = (int, long)
-    else:
-        int_types = (int, long, MPZ_TYPE)
-except NameError:
-    if BACKEND == 'python':
-        int_types = (int,)
-    else:
-        int_types = (int, MPZ_TYPE)
+def kernel(name):
+    """Return the implementation of a kernel in the current backend."""
+    return backends[BACKEND].kernel(name)
+
+# Raw mpf constants in libmpf, whose mantissas have the MPZ type
+mpf_constant_names = ('fzero', 'fnzero', 'fone', 'fnone', 'ftwo', 'ften',
+    'fhalf', 'fnan', 'finf', 'fninf')
+
+def set_backend(name):
+    """
+    Select the registered backend with the given name for all subsequent
+    computations.
+
+    The backend-dependent globals of the mpmath modules (MPZ, the
+    kernels, constants, and so on) are rebound, and the caches of
+    precomputed values are cleared. Numbers created before the switch
+    keep their integer type; they can be mixed with new numbers provided
+    that the two types interoperate (as Python integers and gmpy
+    integers do). Tuning parameters chosen at import time are not
+    changed.
+
+    The sage backend, which also replaces the context implementation,
+    cannot be selected or deselected.
+    """
+    if name not in backends:
+        raise ValueError("unknown backend: %s" % name)
+    old = backends[BACKEND]
+    new = backends[name]
+    if new is old:
+        return
+    if 'sage' in (old.name, new.name):
+        raise ValueError("cannot switch to or from the sage backend")
+    from . import libmpf, libelefun, cache
+    old_values = old.bindings()
+    new_values = new.bindings()
+    for c in mpf_constant_names:
+        t = getattr(libmpf, c)
+        old_values[c] = t
+        new_values[c] = (t[0], new.MPZ(t[1]), t[2], t[3])
+    root = __name__.split('.')[0]
+    for module in list(sys.modules.values()):
+        modname = getattr(module, '__name__', None) or ''
+        if modname != root and not modname.startswith(root + '.'):
+            continue
+        d = module.__dict__
+        for key, value in old_values.items():
+            if key in d and d[key] is value:
+                d[key] = new_values[key]
+        # Results of mixed operations with Python integers have the
+        # type of the other operand, so other precomputed values must
+        # be converted when leaving a non-Python integer type
+        if old.MPZ_TYPE not in python_int_types:
+            for key, value in list(d.items()):
+                if type(value) is old.MPZ_TYPE:
+                    d[key] = new.MPZ(value)
+                elif type(value) is tuple and len(value) == 4 and \
+                    type(value[1]) is old.MPZ_TYPE:
+                    d[key] = (value[0], new.MPZ(value[1]), value[2], value[3])
+    for n in libmpf.int_cache:
+        libmpf.int_cache[n] = libmpf.from_man_exp(n, 0)
+    cache.clear_caches()
+    libelefun.clear_constant_memos()
@@ -0,0 +1,247 @@
+"""
+Registry of the module-level caches used by libmp.
+
+Caches of precomputed values (Taylor coefficients, Bernoulli numbers,
+and so on) grow as new precisions and arguments are used. By default
+they are unbounded. Each cache can be given a size budget in bytes,
+in which case the least recently used entries are evicted when the
+budget is exceeded.
+
+Sizes are estimates of the memory used by the cached values (mostly
+mantissas of fixed-point and mpf numbers), computed when an entry is
+stored.
+"""
+
+import sys
+from collections import OrderedDict
+
+try:
+    from time import perf_counter as clock
+except ImportError:
+    from time import time as clock
+
+if not hasattr(OrderedDict, 'move_to_end'):
+    # Python 2
+    class OrderedDict(OrderedDict):
+        def move_to_end(self, key):
+            self[key] = self.pop(key)
+
+from .backend import MPZ_TYPE
+
+# name -> cache
+caches = {}
+
+def register(cache):
+    """
+    Add a cache to the registry. A cache must have a name attribute
+    and the methods info() and clear(), and a writable maxsize
+    attribute (a size budget in bytes, or None if unbounded).
+    """
+    caches[cache.name] = cache
+    return cache
+
+def sizeof(x):
+    """
+    Estimate the memory in bytes used by x, including the contents
+    of tuples, lists and dicts.
+    """
+    t = type(x)
+    if t is tuple or t is list:
+        return sys.getsizeof(x) + sum([sizeof(y) for y in x])
+    if t is dict:
+        return sys.getsizeof(x) + \
+            sum([sizeof(k) + sizeof(v) for (k, v) in x.items()])
+    try:
+        return sys.getsizeof(x)
+    except TypeError:
+        # Old gmpy versions do not support __sizeof__
+        if t is MPZ_TYPE:
+            return 24 + x.bit_length()//8
+        return 64
+
+class LRUCache(dict):
+    """
+    Dictionary with an optional size budget in bytes and least recently
+    used eviction. Reading an entry with [] or get() counts as a use.
+
+    An entry that is larger than the whole budget is still stored,
+    but it is evicted as soon as any other entry is added.
+
+    Reads are plain dict lookups as long as the cache is unbounded;
+    setting maxsize switches the instance to a subclass that also
+    records recency on reads.
+    """
+
+    def __init__(self, name, maxsize=None, sizeof=sizeof):
+        dict.__init__(self)
+        self.name = name
+        self.sizeof = sizeof
+        self.size = 0
+        self.evictions = 0
+        # key -> size, ordered from least to most recently used
+        self._sizes = OrderedDict()
+        self.maxsize = maxsize
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        self._maxsize = maxsize
+        if maxsize is None:
+            self.__class__ = LRUCache
+        else:
+            self.__class__ = _BoundedLRUCache
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(value)
+        dict.__setitem__(self, key, value)
+        # Reinserting moves the key to the end
+        self.size += size - self._sizes.pop(key, 0)
+        self._sizes[key] = size
+        if self._maxsize is not None and self.size > self._maxsize:
+            self.shrink(self._maxsize, key)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.size -= self._sizes.pop(key)
+
+    def pop(self, key, *default):
+        if key in self:
+            value = dict.__getitem__(self, key)
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def clear(self):
+        dict.clear(self)
+        self._sizes.clear()
+        self.size = 0
+
+    def shrink(self, maxsize, keep=None):
+        """
+        Evict least recently used entries (except the key keep) until
+        the total size is at most maxsize.
+        """
+        sizes = self._sizes
+        while self.size > maxsize and sizes:
+            key, size = sizes.popitem(last=False)
+            if key == keep:
+                # Put it back as the most recently used entry
+                sizes[key] = size
+                if len(sizes) == 1:
+                    break
+                continue
+            dict.pop(self, key, None)
+            self.size -= size
+            self.evictions += 1
+
+    def info(self):
+        return {'entries': len(self), 'size': self.size,
+            'maxsize': self._maxsize, 'evictions': self.evictions}
+
+class _BoundedLRUCache(LRUCache):
+    """
+    LRUCache with a size budget, which records the use of an entry on
+    every read.
+    """
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        try:
+            self._sizes.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread since the lookup
+            pass
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            try:
+                return self[key]
+            except KeyError:
+                pass
+        return default
+
+def new_cache(name, maxsize=None, sizeof=sizeof):
+    """
+    Create and register an LRUCache.
+    """
+    return register(LRUCache(name, maxsize, sizeof))
+
+def cache_info():
+    """
+    Return a dict with statistics for each registered cache: the
+    number of entries, the estimated size in bytes, the budget and
+    the number of evictions so far.
+    """
+    return dict((name, cache.info()) for (name, cache) in caches.items())
+
+def clear_caches():
+    """
+    Empty all registered caches.
+    """
+    for cache in caches.values():
+        cache.clear()
+
+def set_cache_limit(maxsize, name=None):
+    """
+    Set the size budget in bytes (None for unbounded) of the cache
+    with the given name, or of all registered caches if name is None.
+    Caches exceeding the new budget are shrunk immediately.
+    """
+    if name is None:
+        targets = list(caches.values())
+    else:
+        targets = [caches[name]]
+    for cache in targets:
+        cache.maxsize = maxsize
+        if maxsize is not None and isinstance(cache, LRUCache):
+            cache.shrink(maxsize)
+
+class Stats(object):
+    """
+    Optional instrumentation of cached computations: for each name,
+    the number of cache hits, the number of misses (values computed)
+    and the total time spent computing. Disabled by default; call
+    sites check the enabled attribute before recording hits, and
+    obtain a start time from start(), which is None when disabled:
+
+        t0 = stats.start()
+        value = compute()
+        stats.miss(name, t0)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+
+    def counter(self, name):
+        c = self.counters.get(name)
+        if c is None:
+            c = self.counters[name] = [0, 0, 0.0]
+        return c
+
+    def hit(self, name):
+        self.counter(name)[0] += 1
+
+    def start(self):
+        if self.enabled:
+            return clock()
+        return None
+
+    def miss(self, name, t0):
+        if t0 is not None:
+            c = self.counter(name)
+            c[1] += 1
+            c[2] += clock() - t0
+
+    def reset(self):
+        self.counters.clear()
+
+    def report(self):
+        return dict((name, {'hits': c[0], 'misses': c[1], 'time': c[2]})
+            for (name, c) in self.counters.items())
+
+stats = Stats()
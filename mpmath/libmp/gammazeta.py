@@ -20,6 +20,7 @@
 from .backend import MPZ, MPZ_ZERO, MPZ_ONE, MPZ_THREE, gmpy
 
 from .libintmath import list_primes, ifac, ifac2, moebius
+from .cache import caches, register, new_cache, sizeof, stats
 
 from .libmpf import (\
     round_floor, round_ceiling, round_down, round_up,
@@ -388,7 +389,7 @@ def I(n):
 numerator and denominator.
 """
 
-bernoulli_cache = {}
+bernoulli_cache = new_cache('bernoulli_cache')
 f3 = from_int(3)
 f6 = from_int(6)
 
@@ -427,6 +428,8 @@ def mpf_bernoulli(n, prec, rnd=None):
     if cached:
         numbers, state = cached
         if n in numbers:
+            if stats.enabled:
+                stats.hit('mpf_bernoulli')
             if not rnd:
                 return numbers[n]
             return mpf_pos(numbers[n], prec, rnd)
@@ -439,6 +442,7 @@ def mpf_bernoulli(n, prec, rnd=None):
         numbers = {0:fone}
         m, bin, bin1 = state = [2, MPZ(10), MPZ_ONE]
         bernoulli_cache[wp] = (numbers, state)
+    t0 = stats.start()
     while m <= n:
         #print m
         case = m % 6
@@ -472,6 +476,9 @@ def mpf_bernoulli(n, prec, rnd=None):
         if m > 6:
             bin1 = bin1 * ((2+m)*(3+m)) // ((m-7)*(m-6))
         state[:] = [m, bin, bin1]
+    # Store again to update the size of the entry
+    bernoulli_cache[wp] = (numbers, state)
+    stats.miss('mpf_bernoulli', t0)
     return numbers[n]
 
 def mpf_bernoulli_huge(n, prec, rnd=None):
@@ -607,7 +614,7 @@ def bernfrac(n):
 functions", SIAM Journal on Numerical Analysis 31 (1994), no. 3, 931-944.
 """
 
-spouge_cache = {}
+spouge_cache = new_cache('spouge_cache')
 
 def calc_spouge_coefficients(a, prec):
     wp = prec + int(a*1.4)
@@ -632,15 +639,21 @@ def calc_spouge_coefficients(a, prec):
 def get_spouge_coefficients(prec):
     # This exact precision has been used before
     if prec in spouge_cache:
+        if stats.enabled:
+            stats.hit('get_spouge_coefficients')
         return spouge_cache[prec]
     for p in spouge_cache:
         if 0.8 <= prec/float(p) < 1:
+            if stats.enabled:
+                stats.hit('get_spouge_coefficients')
             return spouge_cache[p]
+    t0 = stats.start()
     # Here we estimate the value of a based on Spouge's inequality for
     # the relative error
     a = max(3, int(0.38*prec))  # 0.38 = log(2)/log(2*pi), ~= 1.26*n
     coefs = calc_spouge_coefficients(a, prec)
     spouge_cache[prec] = (prec, a, coefs)
+    stats.miss('get_spouge_coefficients', t0)
     return spouge_cache[prec]
 
 def spouge_sum_real(x, prec, a, c):
@@ -1107,7 +1120,7 @@ def mpc_psi(m, z, prec, rnd=round_fast):
 http://en.wikipedia.org/wiki/Dirichlet_eta_function
 """
 
-borwein_cache = {}
+borwein_cache = new_cache('borwein_cache')
 
 def borwein_coefficients(n):
     if n in borwein_cache:
@@ -1124,7 +1137,7 @@ def borwein_coefficients(n):
     return ds
 
 ZETA_INT_CACHE_MAX_PREC = 1000
-zeta_int_cache = {}
+zeta_int_cache = new_cache('zeta_int_cache')
 
 def mpf_zeta_int(s, prec, rnd=round_fast):
     """
@@ -1383,6 +1396,29 @@ def pow_fixed(x, n, wp):
 primes_cache = []
 mult_cache = []
 
+class SieveCache(object):
+    """
+    Registry entry for the prime sieve used by the zeta sum code. If
+    the budget is exceeded, a new sieve is not cached.
+    """
+    name = 'sieve_cache'
+    maxsize = None
+
+    def size(self):
+        return sizeof(sieve_cache) + sizeof(primes_cache) + sizeof(mult_cache)
+
+    def info(self):
+        return {'entries': len(sieve_cache), 'size': self.size(),
+            'maxsize': self.maxsize, 'evictions': 0}
+
+    def clear(self):
+        global sieve_cache, primes_cache, mult_cache
+        sieve_cache = []
+        primes_cache = []
+        mult_cache = []
+
+register(SieveCache())
+
 def primesieve(n):
     global sieve_cache, primes_cache, mult_cache
     if n < len(sieve_cache):
@@ -1405,9 +1441,11 @@ def primesieve(n):
                 n //= p
                 m += 1
             mult[i] = m
-    sieve_cache = sieve
-    primes_cache = primes
-    mult_cache = mult
+    maxsize = caches['sieve_cache'].maxsize
+    if maxsize is None or sizeof(sieve)+sizeof(primes)+sizeof(mult) <= maxsize:
+        sieve_cache = sieve
+        primes_cache = primes
+        mult_cache = mult
     return sieve, primes, mult
 
 def zetasum_sieved(critical_line, sre, sim, a, n, wp):
@@ -1587,8 +1625,8 @@ def mpc_zetasum(s, a, n, derivatives, reflect, prec):
 
 SMALL_FACTORIAL_CACHE_SIZE = 150
 
-gamma_taylor_cache = {}
-gamma_stirling_cache = {}
+gamma_taylor_cache = new_cache('gamma_taylor_cache')
+gamma_stirling_cache = new_cache('gamma_stirling_cache')
 
 small_factorial_cache = [from_int(ifac(n)) for \
     n in range(SMALL_FACTORIAL_CACHE_SIZE+1)]
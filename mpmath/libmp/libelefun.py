@@ -10,6 +10,9 @@
 """
 
 import math
+import os
+import mmap
+from binascii import hexlify, unhexlify
 from bisect import bisect
 
 from .backend import xrange
@@ -30,7 +33,8 @@
     isqrt_fast
 )
 
-from .libintmath import ifib
+from .libintmath import ifib, numeral, numeral_chunks
+from .cache import new_cache, stats
 
 
 #-------------------------------------------------------------------------------
@@ -53,21 +57,21 @@
 else:
     COS_SIN_CACHE_PREC = 200
 COS_SIN_CACHE_STEP = 8
-cos_sin_cache = {}
+cos_sin_cache = new_cache('cos_sin_cache')
 
 # Number of integer logarithms to cache (for zeta sums)
 MAX_LOG_INT_CACHE = 2000
-log_int_cache = {}
+log_int_cache = new_cache('log_int_cache')
 
 LOG_TAYLOR_PREC = 2500  # Use Taylor series with caching up to this prec
 LOG_TAYLOR_SHIFT = 9    # Cache log values in steps of size 2^-N
-log_taylor_cache = {}
+log_taylor_cache = new_cache('log_taylor_cache')
 # prec/size ratio of x for fastest convergence in AGM formula
 LOG_AGM_MAG_PREC_RATIO = 20
 
 ATAN_TAYLOR_PREC = 3000  # Same as for log
 ATAN_TAYLOR_SHIFT = 7   # steps of size 2^-N
-atan_taylor_cache = {}
+atan_taylor_cache = new_cache('atan_taylor_cache')
 
 
 # ~= next power of two + 20
@@ -82,22 +86,126 @@
 #                                                                            #
 #----------------------------------------------------------------------------#
 
+# Optional persistent cache of constants. If the environment variable
+# MPMATH_CONSTANT_CACHE names a directory, values of constants computed
+# to at least CONSTANT_CACHE_MIN_PREC bits are stored there, and
+# later requests (also from other processes) are served from the
+# stored files. Both settings can be changed at runtime.
+CONSTANT_CACHE_DIR = os.environ.get('MPMATH_CONSTANT_CACHE')
+CONSTANT_CACHE_MIN_PREC = 10000
+
+def constant_cache_load(name, prec, wanted):
+    """
+    Look up the fixed-point value of the constant called name in the
+    persistent cache. The value is returned with the largest precision
+    p <= wanted that can be obtained from the cache, and at least prec.
+    Returns (p, value) on success and None if no suitable entry exists.
+
+    Each entry is a file holding a fixed-point value as a big-endian
+    binary integer. A value with lower precision is obtained by
+    truncation, reading only a prefix of the memory-mapped file.
+    """
+    directory = CONSTANT_CACHE_DIR
+    try:
+        files = os.listdir(directory)
+    except (OSError, TypeError):
+        return None
+    best = None
+    for filename in files:
+        head, sep, tail = filename.rpartition('-')
+        if head == name and tail.endswith('.bin'):
+            try:
+                p = int(tail[:-4])
+            except ValueError:
+                continue
+            if p >= prec and (best is None or p < best):
+                best = p
+    if best is None:
+        return None
+    p = min(best, wanted)
+    shift = best - p
+    try:
+        fp = open(os.path.join(directory, "%s-%i.bin" % (name, best)), 'rb')
+        try:
+            size = os.fstat(fp.fileno()).st_size
+            nbytes = size - (shift >> 3)
+            if nbytes <= 0:
+                return None
+            m = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                data = m[:nbytes]
+            finally:
+                m.close()
+        finally:
+            fp.close()
+    except (OSError, IOError, ValueError):
+        return None
+    return p, MPZ(hexlify(data).decode('ascii'), 16) >> (shift & 7)
+
+def constant_cache_store(name, prec, value):
+    """
+    Store the fixed-point value of a constant in the persistent cache,
+    if enabled. Failure to write is silently ignored.
+    """
+    directory = CONSTANT_CACHE_DIR
+    if not directory or prec < CONSTANT_CACHE_MIN_PREC or value < 0:
+        return
+    h = "%x" % value
+    if len(h) & 1:
+        h = "0" + h
+    path = os.path.join(directory, "%s-%i.bin" % (name, prec))
+    # Write to a temporary file first so that other processes
+    # never see a partially written entry
+    tmp = "%s.%i.tmp" % (path, os.getpid())
+    try:
+        fp = open(tmp, 'wb')
+        try:
+            fp.write(unhexlify(h))
+        finally:
+            fp.close()
+        os.rename(tmp, path)
+    except (OSError, IOError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+# Functions decorated with constant_memo
+constant_memos = []
+
+def clear_constant_memos():
+    """Forget the values of constants cached in memory."""
+    for f in constant_memos:
+        f.memo_prec = -1
+        f.memo_val = None
+
 def constant_memo(f):
     """
     Decorator for caching computed values of mathematical
     constants. This decorator should be applied to a
     function taking a single argument prec as input and
     returning a fixed-point value with the given precision.
+
+    Values are cached in memory, and optionally also on disk
+    (see CONSTANT_CACHE_DIR).
     """
     f.memo_prec = -1
     f.memo_val = None
+    constant_memos.append(f)
     def g(prec, **kwargs):
         memo_prec = f.memo_prec
         if prec <= memo_prec:
             return f.memo_val >> (memo_prec-prec)
         newprec = int(prec*1.05+10)
+        if CONSTANT_CACHE_DIR and newprec >= CONSTANT_CACHE_MIN_PREC:
+            cached = constant_cache_load(f.__name__, prec, newprec)
+            if cached is not None:
+                f.memo_prec, f.memo_val = cached
+                return f.memo_val >> (f.memo_prec-prec)
         f.memo_val = f(newprec, **kwargs)
         f.memo_prec = newprec
+        if CONSTANT_CACHE_DIR:
+            constant_cache_store(f.__name__, newprec, f.memo_val)
         return f.memo_val >> (newprec-prec)
     g.__name__ = f.__name__
     g.__doc__ = f.__doc__
@@ -309,6 +417,163 @@ def sqrtpi_fixed(prec):
 mpf_ln_sqrt2pi   = def_mpf_constant(ln_sqrt2pi_fixed)
 
 
+#----------------------------------------------------------------------------#
+#                                                                            #
+#                       Streaming digits of constants                        #
+#                                                                            #
+#----------------------------------------------------------------------------#
+
+"""
+To generate digits of a constant without a precision given in advance,
+the constant is computed at increasing precisions. The functions below
+return a fixed-point value like pi_fixed, e_fixed, etc. together with
+the state of the binary splitting; passing the state back at a higher
+precision only sums the terms that were not included before. The
+values are not memoized.
+"""
+
+def pi_fixed_step(prec, state=None):
+    """
+    Returns (floor(pi * 2**prec), state), where state is the binary
+    splitting state for the Chudnovsky series.
+    """
+    N = int(prec/3.3219280948/14.181647462 + 2)
+    if state is None:
+        g, p, q = bs_chudnovsky(0, N, 0, False)
+    else:
+        N0, g, p, q = state
+        if N > N0:
+            g2, p2, q2 = bs_chudnovsky(N0, N, 0, False)
+            p, g, q = p*p2, g*g2, q*p2 + q2*g
+        else:
+            N = N0
+    sqrtC = isqrt_fast(CHUD_C<<(2*prec))
+    v = p*CHUD_C*sqrtC//((q+CHUD_A*p)*CHUD_D)
+    return v, (N, g, p, q)
+
+def e_fixed_step(prec, state=None):
+    """
+    Returns (floor(e * 2**prec), state), where state is the binary
+    splitting state for the Taylor series.
+    """
+    N = int(1.1*prec/math.log(prec) + 20)
+    if state is None:
+        p, q = bspe(0, N)
+    else:
+        N0, p, q = state
+        if N > N0:
+            p2, q2 = bspe(N0, N)
+            p, q = p*q2 + p2, q*q2
+        else:
+            N = N0
+    return ((p+q)<<prec)//q, (N, p, q)
+
+def ln2_fixed_step(prec, state=None):
+    """
+    Returns (floor(ln(2) * 2**prec), state), where state holds the
+    binary splitting state for each term of the Machin-type formula
+    used by ln2_fixed.
+    """
+    coefs = [(18, 26), (-2, 4801), (8, 8749)]
+    wp = prec + 10
+    s = MPZ_ZERO
+    new_state = []
+    for i, (c, a) in enumerate(coefs):
+        a = MPZ(a)
+        N = int(0.35 * wp/math.log(a) + 20)
+        if state is None:
+            p, q, r = bsp_acot(a, 0, N, True)
+        else:
+            N0, p, q, r = state[i]
+            if N > N0:
+                p2, q2, r2 = bsp_acot(a, N0, N, True)
+                p, q, r = q2*p + r*p2, q*q2, r*r2
+            else:
+                N = N0
+        new_state.append((N, p, q, r))
+        s += c * (((p+q)<<wp)//(q*a))
+    return s >> 10, new_state
+
+def sqrt2_fixed_step(prec, state=None):
+    """
+    Returns (floor(sqrt(2) * 2**prec), None).
+    """
+    return isqrt_fast(MPZ_TWO<<(2*prec)), None
+
+constant_steps = {
+    'pi' : pi_fixed_step,
+    'e' : e_fixed_step,
+    'ln2' : ln2_fixed_step,
+    'sqrt2' : sqrt2_fixed_step,
+}
+
+def constant_digits(name, base=10, chunk=10000, limit=None):
+    """
+    Generate the digits of the constant name (one of the keys of
+    constant_steps) in the given base. The first string generated is
+    the integer part; each following string holds chunk digits of the
+    fractional part. If limit is given, exactly limit fractional
+    digits are generated; otherwise the generator does not terminate.
+
+    The constant is computed at doubling precisions, reusing the
+    binary splitting state. At each precision, the digits that are
+    determined by the value are converted from the fractional part
+    that remains after the digits generated so far, using
+    numeral_chunks. The memory used is therefore dominated by the
+    binary values (proportional to the number of digits generated),
+    not by the digit strings.
+    """
+    step = constant_steps[name]
+    base = int(base)
+    chunk = int(chunk)
+    if base < 2 or base > 36 or chunk < 1:
+        raise ValueError("need 2 <= base <= 36 and chunk >= 1")
+    # Bits per digit, and a bound for the error of each value in
+    # units of 2**(-prec)
+    bpd = math.log(base, 2)
+    err = MPZ_ONE << 8
+    prec = int((chunk+10)*bpd) + 64
+    if limit is not None:
+        prec = min(prec, int((limit+10)*bpd) + 64)
+    v, state = step(prec)
+    yield numeral(v >> prec, base)
+    emitted = 0
+    buf = ""
+    while 1:
+        # Fractional parts of c * base**emitted for both bounds of c
+        mask = (MPZ_ONE << prec) - 1
+        bpow = MPZ(base)**emitted
+        lo = (v - err) * bpow
+        hi = (v + err) * bpow
+        m = int((prec - 10)/bpd) - emitted
+        if limit is not None:
+            m = min(m, limit - emitted)
+        if m > 0 and (lo >> prec) == (hi >> prec):
+            # The next m digits, less any that are not determined
+            bpow = MPZ(base)**m
+            lo = ((lo & mask) * bpow) >> prec
+            hi = ((hi & mask) * bpow) >> prec
+            while lo != hi:
+                lo //= base
+                hi //= base
+                m -= 1
+            for s in numeral_chunks(lo, base, m, chunk):
+                buf += s
+                if len(buf) >= chunk:
+                    yield buf[:chunk]
+                    buf = buf[chunk:]
+            emitted += m
+        if emitted == limit:
+            break
+        newprec = 2*prec
+        if limit is not None:
+            newprec = min(newprec, int((limit+10)*bpd) + 64)
+        prec = max(newprec, prec + 64)
+        v, state = step(prec, state)
+    if buf:
+        yield buf
+
+
 #----------------------------------------------------------------------------#
 #                                                                            #
 #                                    Powers                                  #
@@ -641,10 +906,14 @@ def log_taylor_cached(x, prec):
     dprec = cached_prec - prec
     if (n, cached_prec) in log_taylor_cache:
         a, log_a = log_taylor_cache[n, cached_prec]
+        if stats.enabled:
+            stats.hit('log_taylor_cached')
     else:
+        t0 = stats.start()
         a = n << (cached_prec - LOG_TAYLOR_SHIFT)
         log_a = log_taylor(a, cached_prec, 8)
         log_taylor_cache[n, cached_prec] = (a, log_a)
+        stats.miss('log_taylor_cached', t0)
     a >>= dprec
     log_a >>= dprec
     u = ((x - a) << prec) // a
@@ -1386,6 +1655,146 @@ def mpf_sinh(x, prec, rnd=round_fast): return mpf_cosh_sinh(x, prec, rnd)[1]
 def mpf_tanh(x, prec, rnd=round_fast): return mpf_cosh_sinh(x, prec, rnd, tanh=1)
 
 
+#-------------------------------------------------------------------------------
+# Batched evaluation
+#-------------------------------------------------------------------------------
+
+# The following functions evaluate a function at many points with the
+# same precision. They return the same values as the corresponding
+# single-argument functions, but compute the working precision and the
+# needed constants (ln2, pi) once for the whole batch. Special values
+# and unusual arguments are delegated to the single-argument versions.
+
+def mpf_exp_many(xs, prec, rnd=round_fast):
+    """
+    Return [mpf_exp(x, prec, rnd) for x in xs].
+    """
+    xs = list(xs)
+    wp = prec + 14
+    # Precompute log(2) to the highest precision needed for argument
+    # reduction; smaller precisions are then obtained by shifting
+    maxmag = 1
+    for sign, man, exp, bc in xs:
+        if man and bc+exp > maxmag and not (prec > 600 and exp >= 0):
+            maxmag = bc+exp
+    ln2prec = wp + maxmag
+    if maxmag > 1:
+        ln2 = ln2_fixed(ln2prec)
+    v = []
+    append = v.append
+    for x in xs:
+        sign, man, exp, bc = x
+        if (not man) or (prec > 600 and exp >= 0):
+            append(mpf_exp(x, prec, rnd))
+            continue
+        mag = bc + exp
+        if mag < -wp:
+            append(mpf_perturb(fone, sign, prec, rnd))
+            continue
+        if sign:
+            man = -man
+        if mag > 1:
+            wpmod = wp + mag
+            offset = exp + wpmod
+            if offset >= 0:
+                t = man << offset
+            else:
+                t = man >> (-offset)
+            n, t = divmod(t, ln2 >> (ln2prec-wpmod))
+            n = int(n)
+            t >>= mag
+        else:
+            offset = exp + wp
+            if offset >= 0:
+                t = man << offset
+            else:
+                t = man >> (-offset)
+            n = 0
+        append(from_man_exp(exp_basecase(t, wp), n-wp, prec, rnd))
+    return v
+
+def mpf_log_many(xs, prec, rnd=round_fast):
+    """
+    Return [mpf_log(x, prec, rnd) for x in xs]. Raises ComplexResult
+    if any x is negative.
+    """
+    wp = prec + 20
+    if wp > LOG_TAYLOR_PREC:
+        return [mpf_log(x, prec, rnd) for x in xs]
+    ln2 = ln2_fixed(wp)
+    v = []
+    append = v.append
+    for x in xs:
+        sign, man, exp, bc = x
+        if (not man) or sign or man == 1:
+            append(mpf_log(x, prec, rnd))
+            continue
+        mag = exp+bc
+        if mag > 10000 or mag < -10000:
+            append(mpf_log(x, prec, rnd))
+            continue
+        if -1 <= mag <= 1:
+            # Close to 1; compensate for cancellation as in mpf_log
+            if mag == 0:
+                tman = (MPZ_ONE<<bc) - man
+            else:
+                tman = man - (MPZ_ONE<<(bc-1))
+            cancellation = bc - bitcount(tman)
+            xwp = wp + cancellation
+            if cancellation > wp or xwp > LOG_TAYLOR_PREC:
+                append(mpf_log(x, prec, rnd))
+                continue
+            m = log_taylor_cached(lshift(man, xwp-bc), xwp)
+            if mag:
+                m += mag*ln2_fixed(xwp)
+            append(from_man_exp(m, -xwp, prec, rnd))
+        else:
+            m = log_taylor_cached(lshift(man, wp-bc), wp)
+            append(from_man_exp(m + mag*ln2, -wp, prec, rnd))
+    return v
+
+def mpf_cos_sin_many(xs, prec, rnd=round_fast, which=0):
+    """
+    Return [mpf_cos_sin(x, prec, rnd, which) for x in xs], where
+    which is 0 (both cos and sin), 1 (cos) or 2 (sin).
+    """
+    xs = list(xs)
+    wp = prec + 10
+    # Make sure pi is cached to the highest precision that can be
+    # needed by mod_pi2 (barring large cancellations), so that each
+    # reduction only needs to shift the cached value
+    maxmag = 0
+    for sign, man, exp, bc in xs:
+        if man and bc+exp > maxmag:
+            maxmag = bc+exp
+    if maxmag:
+        pi_fixed(wp + maxmag + 20)
+    v = []
+    append = v.append
+    for x in xs:
+        sign, man, exp, bc = x
+        mag = bc + exp
+        if (not man) or mag < -wp:
+            append(mpf_cos_sin(x, prec, rnd, which))
+            continue
+        t, n, xwp = mod_pi2(man, exp, mag, wp)
+        c, s = cos_sin_basecase(t, xwp)
+        m = n & 3
+        if   m == 1: c, s = -s, c
+        elif m == 2: c, s = -c, -s
+        elif m == 3: c, s = s, -c
+        if sign:
+            s = -s
+        if which == 0:
+            append((from_man_exp(c, -xwp, prec, rnd),
+                from_man_exp(s, -xwp, prec, rnd)))
+        elif which == 1:
+            append(from_man_exp(c, -xwp, prec, rnd))
+        else:
+            append(from_man_exp(s, -xwp, prec, rnd))
+    return v
+
+
 # Low-overhead fixed-point versions
 
 def cos_sin_fixed(x, prec, pi2=None):
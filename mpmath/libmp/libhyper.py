@@ -323,6 +323,175 @@ def _hypsum(coeffs, z, prec, wp, epsshift, magnitude_check, **kwargs):
         return "(none)", _hypsum
 
 
+#-----------------------------------------------------------------------#
+#                                                                       #
+#        Binary splitting for hypergeometric series with rational       #
+#                              parameters                               #
+#                                                                       #
+#-----------------------------------------------------------------------#
+
+"""
+When all parameters of a hypergeometric series are rational and z is
+an exact binary number, the partial sums are rational numbers, and
+binary splitting (as in bs_chudnovsky and bspe in libelefun) computes
+a partial sum of N terms as a single fraction T/Q using a balanced
+product tree. This takes O(M(n) log(n)^2) time at n-bit precision
+instead of the O(n^2) time of term-by-term summation in fixed point,
+and is faster at very high precision. The products grow with the size
+of the mantissa of z, so this only pays off when z has a short
+mantissa (e.g. z = 3/4 or -x^2 for a small dyadic x).
+
+Parameters are given as pairs of integers (p, q) representing p/q, and
+z as a raw mpf value.
+"""
+
+# Precision (in bits) above which hypsum uses binary splitting, when
+# possible
+HYP_BS_PREC = 3000
+
+# Binary splitting is used only if the mantissa of z has at most
+# wp/HYP_BS_ZBITS bits
+HYP_BS_ZBITS = 256
+
+def hyp_bs_terms(a_s, b_s, z, wp, maxterms, magnitude_check=None):
+    """
+    Returns the number of terms N of the series for
+    pFq(a_s; b_s; z) such that the remaining terms (and hence the
+    truncation error) are bounded by 2^(-wp), or None if the series
+    does not converge fast enough to need fewer than maxterms terms,
+    or if the mantissa of z is too long for binary splitting to be
+    faster than fixed-point summation. Raises ZeroDivisionError if a term has a pole. Indices in
+    magnitude_check (near-poles) are always included in the sum.
+    """
+    zsign, zman, zexp, zbc = z
+    if not zman:
+        return 1
+    if zbc * HYP_BS_ZBITS > wp:
+        return None
+    lz = zexp + math.log(zman, 2)
+    # A nonpositive integer upper parameter terminates the series
+    nterm = None
+    for (p, q) in a_s:
+        if p <= 0 and not p % q:
+            n = -p//q + 1
+            if nterm is None or n < nterm:
+                nterm = n
+    if nterm is None:
+        if len(a_s) > len(b_s) + 1 or (len(a_s) > len(b_s) and lz >= 0):
+            return None
+    # Float approximations, for estimating term magnitudes
+    try:
+        af = [float(p)/q for (p, q) in a_s]
+        bf = [float(p)/q for (p, q) in b_s]
+    except OverflowError:
+        return None
+    kmin = int(max([abs(x) for x in af + bf] + [0])) + 2
+    if magnitude_check:
+        kmin = max(kmin, max(magnitude_check) + 2)
+    # Tail bound for series with p = q+1, whose term ratio tends to |z|
+    lim = 0.0
+    if len(a_s) > len(b_s):
+        lim = 2.0 ** min(lz, 1)
+    log2 = math.log
+    L = 0.0
+    k = 0
+    while k < maxterms:
+        if k + 1 == nterm:
+            return nterm
+        for (p, q) in b_s:
+            if p + k*q == 0:
+                raise ZeroDivisionError
+        lr = lz - log2(k+1, 2)
+        for x in af:
+            lr += log2(abs(x+k), 2)
+        for x in bf:
+            lr -= log2(abs(x+k), 2)
+        # L = log2 of the magnitude of term k+1
+        L += lr
+        k += 1
+        if k > kmin:
+            r = max(2.0 ** min(lr, 1), lim)
+            if r < 1 and L - log2(1 - r, 2) < -wp:
+                return k + 1
+    return None
+
+def hyp_bs(a_s, b_s, z, N):
+    """
+    Returns integers T, Q such that T/Q is the sum of the first N terms
+    of the series for pFq(a_s; b_s; z), using binary splitting.
+    """
+    zsign, zman, zexp, zbc = z
+    if zsign:
+        zman = -zman
+    # Term ratio t(k+1)/t(k) = P(k)/Q(k) with P and Q integer
+    # polynomials; the denominators of the rational parameters
+    # are absorbed in the constant factors
+    pc = zman
+    qc = MPZ_ONE
+    for (p, q) in a_s:
+        qc *= q
+    for (p, q) in b_s:
+        pc *= q
+    if zexp >= 0:
+        pc <<= zexp
+        zshift = 0
+    else:
+        zshift = -zexp
+    def bs(a, b, need_p):
+        if b - a == 1:
+            P = pc
+            Q = qc * (a+1)
+            for (p, q) in a_s:
+                P *= p + a*q
+            for (p, q) in b_s:
+                Q *= p + a*q
+            Q <<= zshift
+            return P, Q, Q
+        m = (a+b)//2
+        P1, Q1, T1 = bs(a, m, True)
+        P2, Q2, T2 = bs(m, b, need_p)
+        if need_p:
+            return P1*P2, Q1*Q2, T1*Q2 + P1*T2
+        return None, Q1*Q2, T1*Q2 + P1*T2
+    P, Q, T = bs(0, N, False)
+    return T, Q
+
+def make_hyp_summator_bs(key, fallback):
+    """
+    Returns a function with the same interface as the summation
+    functions generated by make_hyp_summator, which sums the series by
+    binary splitting. The parameter types must be 'Z' or 'Q' and z must
+    be real. If binary splitting cannot be used (e.g. because the
+    series converges too slowly), the function fallback is called.
+    """
+    p, q, param_types, ztype = key
+    def _hypsum(coeffs, z, prec, wp, epsshift, magnitude_check, **kwargs):
+        params = []
+        for flag, c in zip(param_types, coeffs):
+            if flag == 'Z':
+                params.append((int(c), 1))
+            else:
+                params.append(c._mpq_)
+        a_s = params[:p]
+        b_s = params[p:]
+        maxterms = kwargs.get('maxterms', wp*100)
+        N = hyp_bs_terms(a_s, b_s, z, wp-epsshift, maxterms, magnitude_check)
+        if N is None:
+            return fallback(coeffs, z, prec, wp, epsshift, magnitude_check,
+                **kwargs)
+        # The sum is exact apart from the truncation, so any jumps in
+        # magnitude are included accurately
+        for n in magnitude_check:
+            magnitude_check[n] = wp
+        T, Q = hyp_bs(a_s, b_s, z, N)
+        s = from_rational(T, Q, prec, round_nearest)
+        if T:
+            magn = s[2]+s[3]
+        else:
+            magn = -wp+1
+        return s, False, magn
+    return _hypsum
+
 #-----------------------------------------------------------------------#
 #                                                                       #
 #                              Error functions                          #
@@ -355,18 +524,27 @@ def mpf_erf(x, prec, rnd=round_fast):
         # TODO: interval rounding
         return mpf_div(x, c, prec, rnd)
     wp = prec + abs(size) + 25
-    # Taylor series for erf, fixed-point summation
     t = abs(to_fixed(x, wp))
-    t2 = (t*t) >> wp
-    s, term, k = t, 12345, 1
-    while term:
-        t = ((t * t2) >> wp) // k
-        term = t // (2*k+1)
-        if k & 1:
-            s -= term
-        else:
-            s += term
-        k += 1
+    N = None
+    if prec >= HYP_BS_PREC:
+        z = mpf_neg(mpf_mul(x, x))
+        N = hyp_bs_terms([(1,2)], [(3,2)], z, wp, 100*wp)
+    if N:
+        # erf(x) = 2x/sqrt(pi) * 1F1(1/2; 3/2; -x^2), by binary splitting
+        T, Q = hyp_bs([(1,2)], [(3,2)], z, N)
+        s = (t * T) // Q
+    else:
+        # Taylor series for erf, fixed-point summation
+        t2 = (t*t) >> wp
+        s, term, k = t, 12345, 1
+        while term:
+            t = ((t * t2) >> wp) // k
+            term = t // (2*k+1)
+            if k & 1:
+                s -= term
+            else:
+                s += term
+            k += 1
     s = (s << (wp+1)) // sqrt_fixed(pi_fixed(wp), wp)
     if sign:
         s = -s
@@ -922,17 +1100,27 @@ def mpf_besseljn(n, x, prec, rounding=round_fast):
     wp = prec + 20 + n*bitcount(n)
     if mag < 0:
         wp -= n * mag
+    N = None
+    if prec >= HYP_BS_PREC:
+        # -x^2/4, exactly
+        z = mpf_shift(mpf_neg(mpf_mul(x, x)), -2)
+        N = hyp_bs_terms([], [(n+1,1)], z, wp, 100*wp)
     x = to_fixed(x, wp)
     x2 = (x**2) >> wp
     if not n:
         s = t = MPZ_ONE << wp
     else:
         s = t = (x**n // ifac(n)) >> ((n-1)*wp + n)
-    k = 1
-    while t:
-        t = ((t * x2) // (-4*k*(k+n))) >> wp
-        s += t
-        k += 1
+    if N:
+        # J_n(x) = (x/2)^n / n! * 0F1(; n+1; -x^2/4), by binary splitting
+        T, Q = hyp_bs([], [(n+1,1)], z, N)
+        s = (t * T) // Q
+    else:
+        k = 1
+        while t:
+            t = ((t * x2) // (-4*k*(k+n))) >> wp
+            s += t
+            k += 1
     if negate:
         s = -s
     return from_man_exp(s, -wp, prec, rounding)
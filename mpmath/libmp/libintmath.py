@@ -11,6 +11,8 @@
 
 from .backend import xrange
 from .backend import BACKEND, gmpy, sage, sage_utils, MPZ, MPZ_ONE, MPZ_ZERO
+from .backend import backends, python_kernels, kernel
+from .cache import new_cache
 
 def giant_steps(start, target, n=2):
     """
@@ -65,16 +67,16 @@ def python_trailing(n):
         t += 1
     return t
 
-if BACKEND == 'gmpy':
+if 'gmpy' in backends:
     if gmpy.version() >= '2':
         def gmpy_trailing(n):
             """Count the number of trailing zero bits in abs(n) using gmpy."""
-            if n: return MPZ(n).bit_scan1()
+            if n: return gmpy.mpz(n).bit_scan1()
             else: return 0
     else:
         def gmpy_trailing(n):
             """Count the number of trailing zero bits in abs(n) using gmpy."""
-            if n: return MPZ(n).scan1()
+            if n: return gmpy.mpz(n).scan1()
             else: return 0
 
 # Small powers of 2
@@ -90,7 +92,7 @@ def python_bitcount(n):
 
 def gmpy_bitcount(n):
     """Calculate bit size of the nonnegative integer n."""
-    if n: return MPZ(n).numdigits(2)
+    if n: return gmpy.mpz(n).numdigits(2)
     else: return 0
 
 #def sage_bitcount(n):
@@ -100,19 +102,23 @@ def gmpy_bitcount(n):
 def sage_trailing(n):
     return MPZ(n).trailing_zero_bits()
 
-if BACKEND == 'gmpy':
-    bitcount = gmpy_bitcount
-    trailing = gmpy_trailing
-elif BACKEND == 'sage':
+python_kernels['bitcount'] = python_bitcount
+python_kernels['trailing'] = python_trailing
+
+if 'gmpy' in backends:
+    if 'bit_length' in dir(gmpy):
+        backends['gmpy'].kernels['bitcount'] = gmpy.bit_length
+    else:
+        backends['gmpy'].kernels['bitcount'] = gmpy_bitcount
+    backends['gmpy'].kernels['trailing'] = gmpy_trailing
+
+if 'sage' in backends:
     sage_bitcount = sage_utils.bitcount
-    bitcount = sage_bitcount
-    trailing = sage_trailing
-else:
-    bitcount = python_bitcount
-    trailing = python_trailing
+    backends['sage'].kernels['bitcount'] = sage_bitcount
+    backends['sage'].kernels['trailing'] = sage_trailing
 
-if BACKEND == 'gmpy' and 'bit_length' in dir(gmpy):
-    bitcount = gmpy.bit_length
+bitcount = kernel('bitcount')
+trailing = kernel('trailing')
 
 # Used to avoid slow function calls as far as possible
 trailtable = [trailing(n) for n in range(256)]
@@ -120,10 +126,23 @@ def sage_trailing(n):
 
 # TODO: speed up for bases 2, 4, 8, 16, ...
 
+# Powers base**n used as split points by the radix conversions. A number
+# with a given number of digits is always split at the same points, so
+# converting many numbers of the same size reuses the powers.
+radix_power_cache = new_cache('radix_power_cache')
+
+def radix_power(base, n):
+    """Return base**n, cached."""
+    key = base, n
+    if key in radix_power_cache:
+        return radix_power_cache[key]
+    p = radix_power_cache[key] = MPZ(base)**n
+    return p
+
 def bin_to_radix(x, xbits, base, bdigits):
     """Changes radix of a fixed-point number; i.e., converts
     x * 2**xbits to floor(x * 10**bdigits)."""
-    return x * (MPZ(base)**bdigits) >> xbits
+    return x * radix_power(base, bdigits) >> xbits
 
 stddigits = '0123456789abcdefghijklmnopqrstuvwxyz'
 
@@ -153,13 +172,77 @@ def numeral_python(n, base=10, size=0, digits=stddigits):
     # Fast enough to do directly
     if size < 250:
         return small_numeral(n, base, digits)
+    # Division is quadratic, so the recursion below is too; for
+    # decimal output, decimal multiplication is asymptotically faster
+    if base == 10 and size > DECIMAL_NUMERAL_SIZE and decimal_module():
+        return numeral_decimal(n)
     # Divide in half
     half = (size // 2) + (size & 1)
-    A, B = divmod(n, base**half)
+    A, B = divmod(n, radix_power(base, half))
     ad = numeral(A, base, half, digits)
     bd = numeral(B, base, half, digits).rjust(half, "0")
     return ad + bd
 
+# Size in digits above which numeral_python uses numeral_decimal
+DECIMAL_NUMERAL_SIZE = 3000
+
+_decimal = []
+
+def decimal_module():
+    """Return the C implementation of the decimal module, or None if it
+    is not available (the pure Python implementation is too slow to
+    be of use for radix conversion)."""
+    if not _decimal:
+        try:
+            import _decimal as decimal
+        except ImportError:
+            decimal = None
+        _decimal.append(decimal)
+    return _decimal[0]
+
+def numeral_decimal(n):
+    """Represent the positive integer n as a string of decimal digits.
+    n is split recursively in binary and the halves are recombined
+    as decimal numbers, using the subquadratic multiplication of the
+    C decimal module; finally the decimal number is printed, which
+    takes linear time."""
+    decimal = decimal_module()
+    D = decimal.Decimal
+    def power(w):
+        key = 'decimal', w
+        if key in radix_power_cache:
+            return radix_power_cache[key]
+        p = radix_power_cache[key] = D(2)**w
+        return p
+    def convert(n, w):
+        if w <= 1024:
+            return D(int(n))
+        w2 = w >> 1
+        hi = n >> w2
+        lo = n - (hi << w2)
+        return convert(lo, w2) + convert(hi, w-w2) * power(w2)
+    ctx = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX,
+        Emin=decimal.MIN_EMIN, traps=[decimal.Inexact])
+    with decimal.localcontext(ctx):
+        return str(convert(n, bitcount(n)))
+
+def from_numeral(s, base=10):
+    """Parse a string of digits in the given base (with an optional
+    sign) as an integer. Long strings are split in half recursively and
+    the halves combined with a multiplication, which is subquadratic,
+    whereas int() is quadratic (and limited to 4300 decimal digits
+    by default in recent versions of Python)."""
+    if len(s) <= 2000:
+        return MPZ(int(s, base))
+    s = s.replace("_", "")
+    if s[0] in "+-":
+        if s[0] == "-":
+            return -from_numeral(s[1:], base)
+        s = s[1:]
+    half = len(s) // 2
+    return from_numeral(s[:-half], base) * radix_power(base, half) + \
+        from_numeral(s[-half:], base)
+
 def numeral_gmpy(n, base=10, size=0, digits=stddigits):
     """Represent the integer n as a string of digits in the given base.
     Recursive division is used to make this function about 3x faster
@@ -177,15 +260,40 @@ def numeral_gmpy(n, base=10, size=0, digits=stddigits):
         return gmpy.digits(n, base)
     # Divide in half
     half = (size // 2) + (size & 1)
-    A, B = divmod(n, MPZ(base)**half)
+    A, B = divmod(n, radix_power(base, half))
     ad = numeral(A, base, half, digits)
     bd = numeral(B, base, half, digits).rjust(half, "0")
     return ad + bd
 
-if BACKEND == "gmpy":
-    numeral = numeral_gmpy
-else:
-    numeral = numeral_python
+python_kernels['numeral'] = numeral_python
+
+if 'gmpy' in backends:
+    backends['gmpy'].kernels['numeral'] = numeral_gmpy
+
+numeral = kernel('numeral')
+
+def numeral_chunks(n, base, size, chunk, digits=stddigits, powers=None):
+    """Generate the digits of the integer 0 <= n < base**size, padded
+    with zeros to size digits, as strings of chunk digits (the last
+    string may be shorter). The number is split recursively, so only
+    one chunk of digits exists as a string at any time. Powers of the
+    base can be cached between calls by passing a dict as powers."""
+    if size <= chunk:
+        if size > 0:
+            yield numeral(n, base, size, digits).rjust(size, "0")
+        return
+    if powers is None:
+        powers = {}
+    # The high part gets a whole number of chunks
+    nchunks = (size + chunk - 1) // chunk
+    low = size - ((nchunks + 1) // 2) * chunk
+    if low not in powers:
+        powers[low] = MPZ(base)**low
+    high, n = divmod(n, powers[low])
+    for s in numeral_chunks(high, base, size-low, chunk, digits, powers):
+        yield s
+    for s in numeral_chunks(n, base, low, chunk, digits, powers):
+        yield s
 
 _1_800 = 1<<800
 _1_600 = 1<<600
@@ -297,22 +405,28 @@ def sqrt_fixed(x, prec):
 
 sqrt_fixed2 = sqrt_fixed
 
-if BACKEND == 'gmpy':
+python_kernels['isqrt_small'] = isqrt_small_python
+python_kernels['isqrt_fast'] = isqrt_fast_python
+python_kernels['isqrt'] = isqrt_python
+python_kernels['sqrtrem'] = sqrtrem_python
+
+if 'gmpy' in backends:
     if gmpy.version() >= '2':
-        isqrt_small = isqrt_fast = isqrt = gmpy.isqrt
-        sqrtrem = gmpy.isqrt_rem
+        backends['gmpy'].kernels['isqrt'] = gmpy.isqrt
+        backends['gmpy'].kernels['sqrtrem'] = gmpy.isqrt_rem
     else:
-        isqrt_small = isqrt_fast = isqrt = gmpy.sqrt
-        sqrtrem = gmpy.sqrtrem
-elif BACKEND == 'sage':
-    isqrt_small = isqrt_fast = isqrt = \
-        getattr(sage_utils, "isqrt", lambda n: MPZ(n).isqrt())
-    sqrtrem = lambda n: MPZ(n).sqrtrem()
-else:
-    isqrt_small = isqrt_small_python
-    isqrt_fast = isqrt_fast_python
-    isqrt = isqrt_python
-    sqrtrem = sqrtrem_python
+        backends['gmpy'].kernels['isqrt'] = gmpy.sqrt
+        backends['gmpy'].kernels['sqrtrem'] = gmpy.sqrtrem
+
+if 'sage' in backends:
+    backends['sage'].kernels['isqrt'] = \
+        getattr(sage_utils, "isqrt", lambda n: sage.Integer(n).isqrt())
+    backends['sage'].kernels['sqrtrem'] = lambda n: sage.Integer(n).sqrtrem()
+
+isqrt_small = kernel('isqrt_small')
+isqrt_fast = kernel('isqrt_fast')
+isqrt = kernel('isqrt')
+sqrtrem = kernel('sqrtrem')
 
 
 def ifib(n, _cache={}):
@@ -373,10 +487,17 @@ def ifac2(n, memo_pair=[{0:1}, {1:1}]):
             memo[k] = p
     return p
 
-if BACKEND == 'gmpy':
-    ifac = gmpy.fac
-elif BACKEND == 'sage':
-    ifac = lambda n: int(sage.factorial(n))
+python_kernels['ifac'] = ifac
+
+if 'gmpy' in backends:
+    backends['gmpy'].kernels['ifac'] = gmpy.fac
+
+if 'sage' in backends:
+    backends['sage'].kernels['ifac'] = lambda n: int(sage.factorial(n))
+
+ifac = kernel('ifac')
+
+if BACKEND == 'sage':
     ifib = sage.fibonacci
 
 def list_primes(n):
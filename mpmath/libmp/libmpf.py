@@ -15,12 +15,13 @@
 getrandbits = None
 
 from .backend import (MPZ, MPZ_TYPE, MPZ_ZERO, MPZ_ONE, MPZ_TWO, MPZ_FIVE,
-    BACKEND, STRICT, HASH_MODULUS, HASH_BITS, gmpy, sage, sage_utils)
+    BACKEND, STRICT, HASH_MODULUS, HASH_BITS, gmpy, sage, sage_utils,
+    backends, python_kernels, kernel)
 
 from .libintmath import (giant_steps,
     trailtable, bctable, lshift, rshift, bitcount, trailing,
     sqrt_fixed, numeral, isqrt, isqrt_fast, sqrtrem,
-    bin_to_radix)
+    bin_to_radix, from_numeral)
 
 # We don't pickle tuples directly for the following reasons:
 #   1: pickle uses str() for ints, which is inefficient when they are large
@@ -270,12 +271,17 @@ def strict_normalize1(sign, man, exp, bc, prec, rnd):
     assert (not man) or (man & 1)
     return _normalize1(sign, man, exp, bc, prec, rnd)
 
-if BACKEND == 'gmpy' and '_mpmath_normalize' in dir(gmpy):
-    _normalize = gmpy._mpmath_normalize
-    _normalize1 = gmpy._mpmath_normalize
+python_kernels['normalize'] = _normalize
+python_kernels['normalize1'] = _normalize1
 
-if BACKEND == 'sage':
-    _normalize = _normalize1 = sage_utils.normalize
+if 'gmpy' in backends and '_mpmath_normalize' in dir(gmpy):
+    backends['gmpy'].kernels['normalize'] = gmpy._mpmath_normalize
+
+if 'sage' in backends:
+    backends['sage'].kernels['normalize'] = sage_utils.normalize
+
+_normalize = kernel('normalize')
+_normalize1 = kernel('normalize1')
 
 if STRICT:
     normalize = strict_normalize
@@ -321,11 +327,15 @@ def from_man_exp(man, exp, prec=None, rnd=round_fast):
 
 int_cache = dict((n, from_man_exp(n, 0)) for n in range(-10, 257))
 
-if BACKEND == 'gmpy' and '_mpmath_create' in dir(gmpy):
-    from_man_exp = gmpy._mpmath_create
+python_kernels['from_man_exp'] = from_man_exp
 
-if BACKEND == 'sage':
-    from_man_exp = sage_utils.from_man_exp
+if 'gmpy' in backends and '_mpmath_create' in dir(gmpy):
+    backends['gmpy'].kernels['from_man_exp'] = gmpy._mpmath_create
+
+if 'sage' in backends:
+    backends['sage'].kernels['from_man_exp'] = sage_utils.from_man_exp
+
+from_man_exp = kernel('from_man_exp')
 
 def from_int(n, prec=0, rnd=round_fast):
     """Create a raw mpf from an integer. If no precision is specified,
@@ -799,45 +809,57 @@ def mpf_sub(s, t, prec=0, rnd=round_fast):
     simply a wrapper of mpf_add that changes the sign of t."""
     return mpf_add(s, t, prec, rnd, 1)
 
+def _mpf_accumulate(terms, prec):
+    """
+    Add up a list of (man, exp, bc) terms with signed mantissas,
+    returning the sum as a (man, exp) pair. With prec > 0, a term
+    lying more than 2*prec bits below the running sum is dropped
+    (and the sum is discarded if a term lies that far above it);
+    with prec=0 all terms are added exactly.
+    """
+    man = 0
+    exp = 0
+    max_extra_prec = prec*2
+    for tman, texp, tbc in terms:
+        if not man:
+            man, exp = tman, texp
+            continue
+        delta = texp - exp
+        if texp >= exp:
+            # term much larger than existing sum?
+            if max_extra_prec and \
+                delta-bitcount(abs(man)) > max_extra_prec:
+                man = tman
+                exp = texp
+            else:
+                man += (tman << delta)
+        else:
+            delta = -delta
+            # term much smaller than existing sum?
+            if not max_extra_prec or delta-tbc <= max_extra_prec:
+                man = (man << delta) + tman
+                exp = texp
+    return man, exp
+
 def mpf_sum(xs, prec=0, rnd=round_fast, absolute=False):
     """
     Sum a list of mpf values efficiently and accurately
     (typically no temporary roundoff occurs). If prec=0,
-    the final result will not be rounded either.
+    the terms are added exactly and the result is not rounded.
 
     There may be roundoff error or cancellation if extremely
     large exponent differences occur.
 
     With absolute=True, sums the absolute values.
     """
-    man = 0
-    exp = 0
-    max_extra_prec = prec*2 or 1000000  # XXX
+    terms = []
     special = None
     for x in xs:
         xsign, xman, xexp, xbc = x
         if xman:
             if xsign and not absolute:
                 xman = -xman
-            delta = xexp - exp
-            if xexp >= exp:
-                # x much larger than existing sum?
-                # first: quick test
-                if (delta > max_extra_prec) and \
-                    ((not man) or delta-bitcount(abs(man)) > max_extra_prec):
-                    man = xman
-                    exp = xexp
-                else:
-                    man += (xman << delta)
-            else:
-                delta = -delta
-                # x much smaller than existing sum?
-                if delta-xbc > max_extra_prec:
-                    if not man:
-                        man, exp = xman, xexp
-                else:
-                    man = (man << delta) + xman
-                    exp = xexp
+            terms.append((xman, xexp, xbc))
         elif xexp:
             if absolute:
                 x = mpf_abs(x)
@@ -845,8 +867,38 @@ def mpf_sum(xs, prec=0, rnd=round_fast, absolute=False):
     # Will be inf or nan
     if special:
         return special
+    man, exp = _mpf_accumulate(terms, prec)
+    return from_man_exp(man, exp, prec, rnd)
+
+def mpf_dot(xs, ys, prec=0, rnd=round_fast):
+    """
+    Compute the dot product of the sequences of raw mpfs xs and ys.
+    The products are accumulated as in mpf_sum, without creating
+    intermediate mpfs, and the result is rounded once. If prec=0,
+    the products are added exactly and the result is not rounded.
+    """
+    terms = []
+    special = None
+    for x, y in zip(xs, ys):
+        xsign, xman, xexp, xbc = x
+        ysign, yman, yexp, ybc = y
+        if xman and yman:
+            tman = xman*yman
+            if xsign ^ ysign:
+                tman = -tman
+            terms.append((tman, xexp+yexp, xbc+ybc))
+        elif (xexp and not xman) or (yexp and not yman):
+            special = mpf_add(special or fzero, mpf_mul(x, y), 1)
+    # Will be inf or nan
+    if special:
+        return special
+    man, exp = _mpf_accumulate(terms, prec)
     return from_man_exp(man, exp, prec, rnd)
 
+def mpf_fma(s, t, u, prec=0, rnd=round_fast):
+    """Compute s*t + u with a single rounding."""
+    return mpf_add(mpf_mul(s, t), u, prec, rnd)
+
 def gmpy_mpf_mul(s, t, prec=0, rnd=round_fast):
     """Multiply two raw mpfs"""
     ssign, sman, sexp, sbc = s
@@ -923,12 +975,15 @@ def python_mpf_mul_int(s, n, prec, rnd=round_fast):
     return normalize(sign, man, exp, bc, prec, rnd)
 
 
-if BACKEND == 'gmpy':
-    mpf_mul = gmpy_mpf_mul
-    mpf_mul_int = gmpy_mpf_mul_int
-else:
-    mpf_mul = python_mpf_mul
-    mpf_mul_int = python_mpf_mul_int
+python_kernels['mpf_mul'] = python_mpf_mul
+python_kernels['mpf_mul_int'] = python_mpf_mul_int
+
+if 'gmpy' in backends:
+    backends['gmpy'].kernels['mpf_mul'] = gmpy_mpf_mul
+    backends['gmpy'].kernels['mpf_mul_int'] = gmpy_mpf_mul_int
+
+mpf_mul = kernel('mpf_mul')
+mpf_mul_int = kernel('mpf_mul_int')
 
 def mpf_shift(s, n):
     """Quickly multiply the raw mpf s by 2**n without rounding."""
@@ -1287,6 +1342,23 @@ def to_str(s, dps, strip_zeros=True, min_fixed=None, max_fixed=None,
     if exponent >= 0: return sign + digits + "e+" + str(exponent)
     if exponent < 0: return sign + digits + "e" + str(exponent)
 
+# Precision above which mpf_recip_newton is faster than division. Python
+# integer division is quadratic, while gmpy's is not.
+if BACKEND == 'python':
+    NEWTON_DIV_PREC = 100000
+else:
+    NEWTON_DIV_PREC = 10**9
+
+def mpf_recip_newton(t, prec):
+    """Compute 1/t to about prec bits (with a few ulps error) using
+    Newton iteration, which only requires multiplications."""
+    wp = giant_steps(60, prec+10)
+    y = mpf_div(fone, t, wp[0])
+    for p in wp[1:]:
+        e = mpf_sub(fone, mpf_mul(mpf_pos(t, p+10), y, p+10), p)
+        y = mpf_add(y, mpf_mul(y, e, p), p)
+    return mpf_pos(y, prec)
+
 def str_to_man_exp(x, base=10):
     """Helper function for from_str."""
     x = x.lower().rstrip('l')
@@ -1305,7 +1377,7 @@ def str_to_man_exp(x, base=10):
         a, b = parts[0], parts[1].rstrip('0')
         exp -= len(b)
         x = a + b
-    x = MPZ(int(x, base))
+    x = from_numeral(x, base)
     return x, exp
 
 special_str = {'inf':finf, '+inf':finf, '-inf':fninf, 'nan':fnan}
@@ -1334,7 +1406,11 @@ def from_str(x, prec, rnd=round_fast):
     # note no factors of 5
     if abs(exp) > 400:
         s = from_int(man, prec+10)
-        s = mpf_mul(s, mpf_pow_int(ften, exp, prec+10), prec, rnd)
+        if exp < 0 and prec > NEWTON_DIV_PREC:
+            t = mpf_pow_int(ften, -exp, prec+20)
+            s = mpf_mul(s, mpf_recip_newton(t, prec+10), prec, rnd)
+        else:
+            s = mpf_mul(s, mpf_pow_int(ften, exp, prec+10), prec, rnd)
     else:
         if exp >= 0:
             s = from_int(man * 10**exp, prec, rnd)
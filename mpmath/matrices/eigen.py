@@ -29,11 +29,19 @@
   hessenberg_reduce_1 : auxiliary routine to hessenberg_reduce_0
   qr_step : a single implicitly shifted QR step for an upper Hessenberg matrix
   hessenberg_qr : Schur decomposition of an upper Hessenberg matrix
+  hessenberg_qr_fixed : hessenberg_qr in fixed point arithmetic (mp only)
   eig_tr_r : right eigenvectors of an upper triangular matrix
   eig_tr_l : left  eigenvectors of an upper triangular matrix
+  krylov_operator : products with a dense or sparse matrix, or its inverse
+  krylov_random : a random starting vector for a Krylov basis
+  krylov_orthogonalize : Gram-Schmidt orthogonalization against a Krylov basis
+  krylov_extend : extension of a Krylov basis by one vector
+  schur_swap : swaps two adjacent eigenvalues in a Schur form
+  krylov_schur : a few eigenvalues of an operator by the Krylov-Schur method
 """
 
 from ..libmp.backend import xrange
+from ..libmp import isqrt, to_fixed, from_man_exp
 
 class Eigen(object):
     pass
@@ -74,6 +82,8 @@ def hessenberg_reduce_0(ctx, A, T):
 
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
     if n <= 2: return
 
     for i in xrange(n-1, 1, -1):
@@ -82,7 +92,7 @@ def hessenberg_reduce_0(ctx, A, T):
 
         scale = 0
         for k in xrange(0, i):
-            scale += abs(ctx.re(A[i,k])) + abs(ctx.im(A[i,k]))
+            scale += abs(ctx.re(a[i][k])) + abs(ctx.im(a[i][k]))
 
         scale_inv = 0
         if scale != 0:
@@ -91,58 +101,58 @@ def hessenberg_reduce_0(ctx, A, T):
         if scale == 0 or ctx.isinf(scale_inv):
             # sadly there are floating point numbers not equal to zero whose reciprocal is infinity
             T[i] = 0
-            A[i,i-1] = 0
+            a[i][i-1] = ctx.zero
             continue
 
         # calculate parameters for housholder transformation
 
         H = 0
         for k in xrange(0, i):
-            A[i,k] *= scale_inv
-            rr = ctx.re(A[i,k])
-            ii = ctx.im(A[i,k])
+            a[i][k] *= scale_inv
+            rr = ctx.re(a[i][k])
+            ii = ctx.im(a[i][k])
             H += rr * rr + ii * ii
 
-        F = A[i,i-1]
+        F = a[i][i-1]
         f = abs(F)
         G = ctx.sqrt(H)
-        A[i,i-1] = - G * scale
+        a[i][i-1] = - G * scale
 
         if f == 0:
             T[i] = G
         else:
             ff = F / f
             T[i] = F + G * ff
-            A[i,i-1] *= ff
+            a[i][i-1] *= ff
 
         H += G * f
         H = 1 / ctx.sqrt(H)
 
         T[i] *= H
         for k in xrange(0, i - 1):
-            A[i,k] *= H
+            a[i][k] *= H
 
         for j in xrange(0, i):
             # apply housholder transformation (from right)
 
-            G = ctx.conj(T[i]) * A[j,i-1]
+            G = ctx.conj(T[i]) * a[j][i-1]
             for k in xrange(0, i-1):
-                G += ctx.conj(A[i,k]) * A[j,k]
+                G += ctx.conj(a[i][k]) * a[j][k]
 
-            A[j,i-1] -= G * T[i]
+            a[j][i-1] -= G * T[i]
             for k in xrange(0, i-1):
-                A[j,k] -= G * A[i,k]
+                a[j][k] -= G * a[i][k]
 
         for j in xrange(0, n):
             # apply housholder transformation (from left)
 
-            G = T[i] * A[i-1,j]
+            G = T[i] * a[i-1][j]
             for k in xrange(0, i-1):
-                G += A[i,k] * A[k,j]
+                G += a[i][k] * a[k][j]
 
-            A[i-1,j] -= G * ctx.conj(T[i])
+            a[i-1][j] -= G * ctx.conj(T[i])
             for k in xrange(0, i-1):
-                A[k,j] -= G * ctx.conj(A[i,k])
+                a[k][j] -= G * ctx.conj(a[i][k])
 
 
 
@@ -158,29 +168,31 @@ def hessenberg_reduce_1(ctx, A, T):
     """
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
 
     if n == 1:
-        A[0,0] = 1
+        a[0][0] = ctx.one
         return
 
-    A[0,0] = A[1,1] = 1
-    A[0,1] = A[1,0] = 0
+    a[0][0] = a[1][1] = ctx.one
+    a[0][1] = a[1][0] = ctx.zero
 
     for i in xrange(2, n):
         if T[i] != 0:
 
             for j in xrange(0, i):
-                G = T[i] * A[i-1,j]
+                G = T[i] * a[i-1][j]
                 for k in xrange(0, i-1):
-                    G += A[i,k] * A[k,j]
+                    G += a[i][k] * a[k][j]
 
-                A[i-1,j] -= G * ctx.conj(T[i])
+                a[i-1][j] -= G * ctx.conj(T[i])
                 for k in xrange(0, i-1):
-                    A[k,j] -= G * ctx.conj(A[i,k])
+                    a[k][j] -= G * ctx.conj(a[i][k])
 
-        A[i,i] = 1
+        a[i][i] = ctx.one
         for j in xrange(0, i):
-            A[j,i] = A[i,j] = 0
+            a[j][i] = a[i][j] = ctx.zero
 
 
 
@@ -288,12 +300,17 @@ def qr_step(ctx, n0, n1, A, Q, shift):
     # the matrix on the left is our Givens rotation.
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
+    if not isinstance(Q, bool):
+        q = Q._dense_rows()
+        Q._LU = None
 
     # first step
 
     # calculate givens rotation
-    c = A[n0  ,n0] - shift
-    s = A[n0+1,n0]
+    c = a[n0][n0] - shift
+    s = a[n0+1][n0]
 
     v = ctx.hypot(ctx.hypot(ctx.re(c), ctx.im(c)), ctx.hypot(ctx.re(s), ctx.im(s)))
 
@@ -310,73 +327,400 @@ def qr_step(ctx, n0, n1, A, Q, shift):
 
     for k in xrange(n0, n):
         # apply givens rotation from the left
-        x = A[n0  ,k]
-        y = A[n0+1,k]
-        A[n0  ,k] = cc * x + cs * y
-        A[n0+1,k] = c * y - s * x
+        x = a[n0][k]
+        y = a[n0+1][k]
+        a[n0][k] = cc * x + cs * y
+        a[n0+1][k] = c * y - s * x
 
     for k in xrange(min(n1, n0+3)):
         # apply givens rotation from the right
-        x = A[k,n0  ]
-        y = A[k,n0+1]
-        A[k,n0  ] = c * x + s * y
-        A[k,n0+1] = cc * y - cs * x
+        x = a[k][n0]
+        y = a[k][n0+1]
+        a[k][n0] = c * x + s * y
+        a[k][n0+1] = cc * y - cs * x
 
     if not isinstance(Q, bool):
         for k in xrange(n):
             # eigenvectors
-            x = Q[k,n0  ]
-            y = Q[k,n0+1]
-            Q[k,n0  ] = c * x + s * y
-            Q[k,n0+1] = cc * y - cs * x
+            x = q[k][n0]
+            y = q[k][n0+1]
+            q[k][n0] = c * x + s * y
+            q[k][n0+1] = cc * y - cs * x
 
     # chase the bulge
 
     for j in xrange(n0, n1 - 2):
         # calculate givens rotation
 
-        c = A[j+1,j]
-        s = A[j+2,j]
+        c = a[j+1][j]
+        s = a[j+2][j]
 
         v = ctx.hypot(ctx.hypot(ctx.re(c), ctx.im(c)), ctx.hypot(ctx.re(s), ctx.im(s)))
 
         if v == 0:
-            A[j+1,j] = 0
+            a[j+1][j] = ctx.zero
             v = 1
             c = 1
             s = 0
         else:
-            A[j+1,j] = v
+            a[j+1][j] = v
             c /= v
             s /= v
 
-        A[j+2,j] = 0
+        a[j+2][j] = ctx.zero
 
         cc = ctx.conj(c)
         cs = ctx.conj(s)
 
         for k in xrange(j+1, n):
             # apply givens rotation from the left
-            x = A[j+1,k]
-            y = A[j+2,k]
-            A[j+1,k] = cc * x + cs * y
-            A[j+2,k] = c * y - s * x
+            x = a[j+1][k]
+            y = a[j+2][k]
+            a[j+1][k] = cc * x + cs * y
+            a[j+2][k] = c * y - s * x
 
         for k in xrange(0, min(n1, j+4)):
             # apply givens rotation from the right
-            x = A[k,j+1]
-            y = A[k,j+2]
-            A[k,j+1] = c * x + s * y
-            A[k,j+2] = cc * y - cs * x
+            x = a[k][j+1]
+            y = a[k][j+2]
+            a[k][j+1] = c * x + s * y
+            a[k][j+2] = cc * y - cs * x
 
         if not isinstance(Q, bool):
             for k in xrange(0, n):
                 # eigenvectors
-                x = Q[k,j+1]
-                y = Q[k,j+2]
-                Q[k,j+1] = c * x + s * y
-                Q[k,j+2] = cc * y - cs * x
+                x = q[k][j+1]
+                y = q[k][j+2]
+                q[k][j+1] = c * x + s * y
+                q[k][j+2] = cc * y - cs * x
+
+
+
+##########################################################################
+#
+# Fixed point version of the QR algorithm.
+#
+# For the mp context hessenberg_qr works on big integers instead of mpf
+# values: the real and imaginary parts of the matrix entries are stored as
+# integers x which stand for the values x * 2**(e-wp), where 2**e is the
+# scale of the matrix. This avoids most of the overhead of mpf and mpc
+# arithmetic. wp is chosen so large that the rounding errors of the fixed
+# point arithmetic stay far below the deflation criterion.
+#
+##########################################################################
+
+def fixed_rotation(fr, fi, gr, gi, wp):
+    """
+    Computes a Givens rotation with real cosine for the complex fixed point
+    numbers f = fr + i fi and g = gr + i gi:
+
+        [ c   s~] [f]   [r]
+        [-s   c ] [g] = [0]
+
+    return value: (c, sr, si, rr, ri), where s = sr + i si and r = rr + i ri
+    """
+
+    f2 = fr * fr + fi * fi
+    g2 = gr * gr + gi * gi
+
+    if g2 == 0:
+        return 1 << wp, 0, 0, fr, fi
+
+    if f2 == 0:
+        return 0, 1 << wp, 0, gr, gi
+
+    v = isqrt(f2 + g2)
+    af = isqrt(f2)
+    d = af * v
+
+    c = (af << wp) // v
+    sr = ((gr * fr + gi * fi) << wp) // d
+    si = ((gi * fr - gr * fi) << wp) // d
+
+    return c, sr, si, fr * v // af, fi * v // af
+
+
+def fixed_rot_rows(xr, xi, yr, yi, k0, k1, c, sr, si, wp):
+    """
+    Applies the Givens rotation (c, s) of fixed_rotation from the left to
+    the two rows x and y, given by their real and imaginary parts, for the
+    columns k0 <= k < k1.
+    """
+
+    for k in xrange(k0, k1):
+        a = xr[k]
+        b = xi[k]
+        d = yr[k]
+        e = yi[k]
+        xr[k] = (c * a + sr * d + si * e) >> wp
+        xi[k] = (c * b + sr * e - si * d) >> wp
+        yr[k] = (c * d - sr * a + si * b) >> wp
+        yi[k] = (c * e - sr * b - si * a) >> wp
+
+
+def fixed_rot_cols(mr, mi, p, k0, k1, c, sr, si, wp):
+    """
+    Applies the hermitian transpose of the Givens rotation (c, s) of
+    fixed_rotation from the right to the columns p and p+1 of the matrix
+    with real part mr and imaginary part mi (lists of rows), for the rows
+    k0 <= k < k1.
+    """
+
+    for k in xrange(k0, k1):
+        rr = mr[k]
+        ri = mi[k]
+        a = rr[p]
+        b = ri[p]
+        d = rr[p+1]
+        e = ri[p+1]
+        rr[p] = (c * a + sr * d - si * e) >> wp
+        ri[p] = (c * b + sr * e + si * d) >> wp
+        rr[p+1] = (c * d - sr * a - si * b) >> wp
+        ri[p+1] = (c * e - sr * b + si * a) >> wp
+
+
+def fixed_csqrt(zr, zi, wp):
+    """
+    Square root of the complex fixed point number zr + i zi.
+    """
+
+    r = isqrt(zr * zr + zi * zi)
+    w = isqrt((r + abs(zr)) << (wp - 1))
+
+    if w == 0:
+        return 0, 0
+
+    if zr >= 0:
+        return w, (zi << wp) // (2 * w)
+
+    if zi >= 0:
+        return (zi << wp) // (2 * w), w
+    else:
+        return (-zi << wp) // (2 * w), -w
+
+
+def fixed_qr_step(ar, ai, qr, qi, n0, n1, hr, hi, wp):
+    """
+    Fixed point version of qr_step. The matrices A and Q are given by their
+    real and imaginary parts ar, ai and qr, qi (lists of rows). qr may be
+    None, in which case Q is not computed. The shift is hr + i hi.
+    """
+
+    n = len(ar)
+
+    # first step
+
+    c, sr, si, rr, ri = fixed_rotation(ar[n0][n0] - hr, ai[n0][n0] - hi,
+                                       ar[n0+1][n0], ai[n0+1][n0], wp)
+
+    fixed_rot_rows(ar[n0], ai[n0], ar[n0+1], ai[n0+1], n0, n, c, sr, si, wp)
+    fixed_rot_cols(ar, ai, n0, 0, min(n1, n0 + 3), c, sr, si, wp)
+    if qr is not None:
+        fixed_rot_cols(qr, qi, n0, 0, len(qr), c, sr, si, wp)
+
+    # chase the bulge
+
+    for j in xrange(n0, n1 - 2):
+        c, sr, si, rr, ri = fixed_rotation(ar[j+1][j], ai[j+1][j],
+                                           ar[j+2][j], ai[j+2][j], wp)
 
+        ar[j+1][j] = rr
+        ai[j+1][j] = ri
+        ar[j+2][j] = ai[j+2][j] = 0
+
+        fixed_rot_rows(ar[j+1], ai[j+1], ar[j+2], ai[j+2], j + 1, n, c, sr, si, wp)
+        fixed_rot_cols(ar, ai, j + 1, 0, min(n1, j + 4), c, sr, si, wp)
+        if qr is not None:
+            fixed_rot_cols(qr, qi, j + 1, 0, len(qr), c, sr, si, wp)
+
+
+def fixed_qr(ar, ai, qr, qi, wp, m, maxits):
+    """
+    Fixed point version of the QR iteration of hessenberg_qr, see there.
+    A subdiagonal element is deflated if it is smaller than 1/m times the
+    adjacent diagonal elements.
+    """
+
+    n = len(ar)
+
+    norm = 0
+    for x in xrange(n):
+        for y in xrange(min(x + 2, n)):
+            norm += ar[y][x] ** 2 + ai[y][x] ** 2
+    norm = isqrt(norm) // n
+
+    if norm == 0:
+        return
+
+    n0 = 0
+    n1 = n
+
+    its = 0
+
+    while 1:
+        # the active submatrix is A[n0:n1,n0:n1]
+
+        k = n0
+
+        while k + 1 < n1:
+            s = abs(ar[k][k]) + abs(ai[k][k]) + abs(ar[k+1][k+1]) + abs(ai[k+1][k+1])
+            if s * m < norm:
+                s = norm
+            if (ar[k+1][k] ** 2 + ai[k+1][k] ** 2) * m * m < s * s:
+                break
+            k += 1
+
+        if k + 1 < n1:
+            # deflation found at position (k+1, k)
+
+            ar[k+1][k] = ai[k+1][k] = 0
+            n0 = k + 1
+
+            its = 0
+
+            if n0 + 1 >= n1:
+                # block of size at most two has converged
+                n0 = 0
+                n1 = k + 1
+                if n1 < 2:
+                    return
+        else:
+            cr = ar[n1-1][n1-2]
+            ci = ai[n1-1][n1-2]
+
+            if (its % 30) == 10:
+                # exceptional shift
+                hr, hi = cr, ci
+            elif (its % 30) == 20:
+                # exceptional shift
+                hr, hi = isqrt(cr * cr + ci * ci), 0
+            elif (its % 30) == 29:
+                # exceptional shift
+                hr, hi = norm, 0
+            else:
+                # the eigenvalue of the trailing 2x2 block which is closer
+                # to its last diagonal element, see hessenberg_qr.
+                xr = ar[n1-2][n1-2]
+                xi = ai[n1-2][n1-2]
+                dr = ar[n1-1][n1-1]
+                di = ai[n1-1][n1-1]
+                br = ar[n1-2][n1-1]
+                bi = ai[n1-2][n1-1]
+                ur = dr - xr
+                ui = di - xi
+
+                sr = (ur * ur - ui * ui + 4 * (br * cr - bi * ci)) >> wp
+                si = (2 * ur * ui + 4 * (br * ci + bi * cr)) >> wp
+                sr, si = fixed_csqrt(sr, si, wp)
+
+                hr = (xr + dr + sr) >> 1
+                hi = (xi + di + si) >> 1
+                gr = (xr + dr - sr) >> 1
+                gi = (xi + di - si) >> 1
+                if (dr - hr) ** 2 + (di - hi) ** 2 > (dr - gr) ** 2 + (di - gi) ** 2:
+                    hr, hi = gr, gi
+
+            its += 1
+
+            fixed_qr_step(ar, ai, qr, qi, n0, n1, hr, hi, wp)
+
+            if its > maxits:
+                raise RuntimeError("qr: failed to converge after %d steps" % its)
+
+
+def hessenberg_qr_fixed(ctx, A, Q):
+    """
+    This routine computes the Schur decomposition of an upper Hessenberg
+    matrix A like hessenberg_qr, but in fixed point arithmetic (see above).
+    It requires the mp context.
+
+    The fixed point format resolves entries down to about 2**-wp times the
+    norm of A only. If the magnitudes of the nonzero entries of A span more
+    than wp - prec bits, A is left unchanged and False is returned, so that
+    the caller can fall back to the generic iteration. Otherwise the return
+    value is True.
+    """
+
+    n = A.rows
+    prec, rnd = ctx._prec_rounding
+
+    a = A._dense_rows()
+
+    norm = 0
+    for x in xrange(n):
+        for y in xrange(min(x+2, n)):
+            norm += ctx.re(a[y][x]) ** 2 + ctx.im(a[y][x]) ** 2
+    norm = ctx.sqrt(norm) / n
+
+    if norm == 0:
+        return True
+
+    # the deflation criterion is eps = ctx.eps / (100 * n) relative to the
+    # diagonal elements, but at least eps * eps * norm. the fixed point
+    # arithmetic must resolve that.
+    wp = 2 * prec + 2 * n.bit_length() + 40
+    e = ctx.mag(norm)
+    f = wp - e
+
+    # every nonzero entry must keep its full precision
+    lowest = e - (wp - prec)
+    for i in xrange(n):
+        for j in xrange(max(i - 1, 0), n):
+            x = a[i][j]
+            if x and ctx.mag(x) < lowest:
+                return False
+
+    A._LU = None
+
+    def fixed(x, f):
+        if hasattr(x, "_mpc_"):
+            re, im = x._mpc_
+            return to_fixed(re, f), to_fixed(im, f)
+        return to_fixed(ctx.convert(x)._mpf_, f), 0
+
+    ar = [[0] * n for i in xrange(n)]
+    ai = [[0] * n for i in xrange(n)]
+    for i in xrange(n):
+        for j in xrange(max(i - 1, 0), n):
+            ar[i][j], ai[i][j] = fixed(a[i][j], f)
+
+    if isinstance(Q, bool):
+        qr = qi = None
+    else:
+        q = Q._dense_rows()
+        Q._LU = None
+        qr = [[0] * n for i in xrange(n)]
+        qi = [[0] * n for i in xrange(n)]
+        for i in xrange(n):
+            for j in xrange(n):
+                qr[i][j], qi[i][j] = fixed(q[i][j], wp)
+
+    m = (100 * n) << (prec - 1)
+    maxits = ctx.dps * 4
+
+    fixed_qr(ar, ai, qr, qi, wp, m, maxits)
+
+    # convert back
+
+    make_mpf = ctx.make_mpf
+    make_mpc = ctx.make_mpc
+
+    def unfixed(xr, xi, e):
+        re = from_man_exp(xr, e, prec, rnd)
+        if xi:
+            return make_mpc((re, from_man_exp(xi, e, prec, rnd)))
+        return make_mpf(re)
+
+    for i in xrange(n):
+        for j in xrange(max(i - 1, 0), n):
+            a[i][j] = unfixed(ar[i][j], ai[i][j], -f)
+
+    if qr is not None:
+        for i in xrange(n):
+            for j in xrange(n):
+                q[i][j] = unfixed(qr[i][j], qi[i][j], -wp)
+
+    return True
 
 
 def hessenberg_qr(ctx, A, Q):
@@ -396,8 +740,14 @@ def hessenberg_qr(ctx, A, Q):
       Q         (input/output) The parameter Q is multiplied by the unitary
                 matrix Q arising from the Schur decomposition. Q can also be
                 false, in which case the unitary matrix Q is not computated.
+
+    For the mp context the iteration is carried out in fixed point arithmetic
+    by hessenberg_qr_fixed, unless the entries of A are strongly graded.
     """
 
+    if hasattr(ctx, '_prec_rounding') and hessenberg_qr_fixed(ctx, A, Q):
+        return
+
     n = A.rows
 
     norm = 0
@@ -566,6 +916,8 @@ def eig_tr_r(ctx, A):
     n = A.rows
 
     ER = ctx.eye(n)
+    a = A._dense_rows()
+    er = ER._dense_rows()
 
     eps = ctx.eps
 
@@ -579,7 +931,7 @@ def eig_tr_r(ctx, A):
     rmax = 1
 
     for i in xrange(1, n):
-        s = A[i,i]
+        s = a[i][i]
 
         smin = max(eps * abs(s), smlnum)
 
@@ -587,24 +939,24 @@ def eig_tr_r(ctx, A):
 
             r = 0
             for k in xrange(j + 1, i + 1):
-                r += A[j,k] * ER[k,i]
+                r += a[j][k] * er[k][i]
 
-            t = A[j,j] - s
+            t = a[j][j] - s
             if abs(t) < smin:
                 t = smin
 
             r = -r / t
-            ER[j,i] = r
+            er[j][i] = r
 
             rmax = max(rmax, abs(r))
             if rmax > simin:
                 for k in xrange(j, i+1):
-                    ER[k,i] /= rmax
+                    er[k][i] /= rmax
                 rmax = 1
 
         if rmax != 1:
             for k in xrange(0, i + 1):
-                ER[k,i] /= rmax
+                er[k][i] /= rmax
 
     return ER
 
@@ -624,6 +976,8 @@ def eig_tr_l(ctx, A):
     n = A.rows
 
     EL = ctx.eye(n)
+    a = A._dense_rows()
+    el = EL._dense_rows()
 
     eps = ctx.eps
 
@@ -637,7 +991,7 @@ def eig_tr_l(ctx, A):
     rmax = 1
 
     for i in xrange(0, n - 1):
-        s = A[i,i]
+        s = a[i][i]
 
         smin = max(eps * abs(s), smlnum)
 
@@ -645,29 +999,319 @@ def eig_tr_l(ctx, A):
 
             r = 0
             for k in xrange(i, j):
-                r += EL[i,k] * A[k,j]
+                r += el[i][k] * a[k][j]
 
-            t = A[j,j] - s
+            t = a[j][j] - s
             if abs(t) < smin:
                 t = smin
 
             r = -r / t
-            EL[i,j] = r
+            el[i][j] = r
 
             rmax = max(rmax, abs(r))
             if rmax > simin:
                 for k in xrange(i, j + 1):
-                    EL[i,k] /= rmax
+                    el[i][k] /= rmax
                 rmax = 1
 
         if rmax != 1:
             for k in xrange(i, n):
-                EL[i,k] /= rmax
+                el[i][k] /= rmax
 
     return EL
 
+##################################################################################################
+#
+# Krylov subspace methods for a few eigenvalues
+#
+# instead of reducing A to Schur form, A is only applied to vectors (given as
+# lists) which span a Krylov subspace. the eigenvalues of the projection of A
+# onto this subspace (the Ritz values) approximate the extreme eigenvalues
+# of A well long before the subspace has dimension n.
+#
+##################################################################################################
+
+def krylov_operator(ctx, A, invert = False, adjoint = False):
+    """
+    Returns a function which maps a vector x (a list) to the list A x,
+    or A' x if adjoint is true, or A^(-1) x if invert is true. A may be a
+    dense matrix or a sparse matrix (spmatrix); the inverse is applied with
+    an LU decomposition of A as a dense matrix.
+    """
+
+    if invert:
+        if isinstance(A, ctx.spmatrix):
+            A = A.todense()
+        F = ctx.lu_factor(A)
+        return lambda x: list(F.solve(x))
+
+    if adjoint:
+        A = A.transpose_conj()
+
+    if isinstance(A, ctx.spmatrix):
+        return A.matvec
+
+    fdot = ctx.fdot
+    rows = A.tolist()
+    return lambda x: [fdot(row, x) for row in rows]
+
+def krylov_random(ctx, n):
+    """
+    Returns a random vector of length n.
+    """
+
+    half = ctx.mpf(0.5)
+    return [ctx.rand() - half for i in xrange(n)]
+
+def krylov_orthogonalize(ctx, V, w):
+    """
+    Orthogonalizes the vector w against the orthonormal vectors in the list V
+    by classical Gram-Schmidt. The orthogonalization is repeated once if the
+    norm of w drops by more than a factor sqrt(2) (Daniel, Gragg, Kaufman and
+    Stewart, Math. Comp. 30 (1976), p.772-795).
+
+    return value: (w, h, r) where w is the orthogonalized vector, r its norm
+                  and h the coefficients such that w_old = w + sum(h[i] * V[i])
+    """
+
+    fdot = ctx.fdot
+    h = [ctx.zero] * len(V)
+    r = ctx.norm(w)
+    if not V:
+        return w, h, r
+
+    cols = list(zip(*V))
+    for it in xrange(2):
+        c = [fdot(w, v, conjugate = True) for v in V]
+        w = [x - fdot(c, col) for x, col in zip(w, cols)]
+        h = [a + b for a, b in zip(h, c)]
+        s = r
+        r = ctx.norm(w)
+        if 2 * r ** 2 > s ** 2:
+            break
+
+    return w, h, r
+
+def krylov_extend(ctx, V, w, scale):
+    """
+    Orthogonalizes w against V and appends it, normalized, to V. If w
+    (almost) lies in the span of V, i.e. V spans an invariant subspace, a
+    random vector is used instead and the coupling r is zero. Nothing is
+    appended if V already spans the whole space.
+
+    return value: (h, r) as for krylov_orthogonalize
+    """
+
+    w, h, r = krylov_orthogonalize(ctx, V, w)
+
+    if len(V) == len(w):
+        return h, ctx.zero
+
+    if r <= ctx.eps * scale:
+        w, c, r = krylov_orthogonalize(ctx, V, krylov_random(ctx, len(w)))
+        V.append([x / r for x in w])
+        return h, ctx.zero
+
+    V.append([x / r for x in w])
+    return h, r
+
+def schur_swap(ctx, T, Q, i):
+    """
+    Swaps the adjacent diagonal elements T[i,i] and T[i+1,i+1] of the upper
+    triangular matrix T by a unitary similarity transformation G' T G. The
+    transformation is accumulated in Q, i.e. Q is replaced by Q G.
+    """
+
+    n = T.rows
+    a = T[i,i]
+    b = T[i+1,i+1]
+
+    # the first column of G is the eigenvector of b of the 2x2 block
+    x1 = T[i,i+1]
+    x2 = b - a
+    r = ctx.sqrt(abs(x1) ** 2 + abs(x2) ** 2)
+    if not r:
+        return
+    x1 /= r
+    x2 /= r
+    y1 = ctx.conj(x1)
+    y2 = ctx.conj(x2)
+
+    for j in xrange(i, n):
+        u = T[i,j]
+        v = T[i+1,j]
+        T[i,j] = y1 * u + y2 * v
+        T[i+1,j] = x1 * v - x2 * u
+
+    for j in xrange(0, i + 2):
+        u = T[j,i]
+        v = T[j,i+1]
+        T[j,i] = x1 * u + x2 * v
+        T[j,i+1] = y1 * v - y2 * u
+
+    for j in xrange(Q.rows):
+        u = Q[j,i]
+        v = Q[j,i+1]
+        Q[j,i] = x1 * u + x2 * v
+        Q[j,i+1] = y1 * v - y2 * u
+
+    T[i+1,i] = 0
+
+def krylov_schur(ctx, op, n, k, key, tol, vectors = True, maxrestarts = None):
+    """
+    This routine computes k eigenvalues of a linear operator by the
+    Krylov-Schur method (Stewart, SIAM J. Matrix Anal. Appl. 23 (2001),
+    p.601-614), a restarted Arnoldi method.
+
+    A Krylov subspace of dimension m = max(2k+1, 20) (at most n) is built by
+    the Arnoldi process with full reorthogonalization. The projected matrix
+    is reduced to Schur form, which is reordered so that the wanted Ritz
+    values, those with the smallest values of key, come first. Then the
+    subspace is truncated to the leading k + (m-k)/2 Schur vectors and
+    extended again, until the residuals of the k wanted Schur vectors are at
+    most tol times the Ritz values.
+
+    parameters:
+      op          (input) a function mapping a vector x (a list of length n)
+                  to the list A x
+      key         (input) a function mapping an eigenvalue to a real number
+      tol         (input) the relative tolerance for the residuals
+
+    return value: (E, X) where E is the list of the k eigenvalues sorted by
+                  increasing key and, if vectors is true, X is a matrix whose
+                  columns are the corresponding right eigenvectors.
+    """
+
+    m = min(n, max(2 * k + 1, 20))
+    if maxrestarts is None:
+        maxrestarts = 10 * n
+
+    v = krylov_random(ctx, n)
+    V = [[x / ctx.norm(v) for x in v]]
+    H = [[0] * m for i in xrange(m)]
+    scale = 0
+    p = 0
+
+    for it in xrange(maxrestarts):
+        # extend the Krylov decomposition A V = V H + r v' to dimension m
+        for j in xrange(p, m):
+            w = op(V[j])
+            scale = max(scale, ctx.norm(w))
+            h, r = krylov_extend(ctx, V, w, scale)
+            for i in xrange(j + 1):
+                H[i][j] = h[i]
+            if j + 1 < m:
+                H[j+1][j] = r
+
+        Q, T = ctx.schur(ctx.matrix(H))
+
+        # move the wanted Ritz values to the top
+        order = sorted(xrange(m), key = lambda i: key(T[i,i]))
+        perm = list(xrange(m))
+        q = min(k + (m - k) // 2, m - 1)
+        for s in xrange(max(q, k)):
+            for t in xrange(perm.index(order[s]), s, -1):
+                schur_swap(ctx, T, Q, t - 1)
+                perm[t - 1], perm[t] = perm[t], perm[t - 1]
+
+        tnorm = max(abs(T[i,i]) for i in xrange(k))
+        floor = ctx.cbrt(tol ** 2) * tnorm
+        if m == n or (r and all(abs(r * Q[m-1,i]) <= tol * max(abs(T[i,i]), floor) for i in xrange(k))):
+            break
+
+        # truncate to the leading q Schur vectors
+        rows = list(zip(*V[:m]))
+        W = []
+        for i in xrange(q):
+            c = [Q[l,i] for l in xrange(m)]
+            W.append([ctx.fdot(row, c) for row in rows])
+        V = W + [V[m]]
+        H = [[0] * m for i in xrange(m)]
+        for i in xrange(q):
+            for j in xrange(i, q):
+                H[i][j] = T[i,j]
+            H[q][i] = r * Q[m-1,i]
+        p = q
+    else:
+        raise ctx.NoConvergence("krylov_schur: no convergence after %d restarts" % maxrestarts)
+
+    E = [T[i,i] for i in xrange(k)]
+
+    if not vectors:
+        return E, None
+
+    # the Ritz vectors are V Q y where y are the eigenvectors of T[:k,:k]
+    Y = Q[:,:k] * eig_tr_r(ctx, T[:k,:k])
+    rows = list(zip(*V[:m]))
+    X = ctx.matrix(n, k)
+    for i in xrange(k):
+        c = [Y[l,i] for l in xrange(m)]
+        for j in xrange(n):
+            X[j,i] = ctx.fdot(rows[j], c)
+    return E, X
+
+def eig_krylov(ctx, A, k, which, left, right):
+    """
+    Implements eig for the k eigenvalues selected by which.
+    """
+
+    n = A.rows
+    if A.cols != n:
+        raise ValueError("eig: need n*n matrix")
+    if not 1 <= k <= n:
+        raise ValueError("eig: k must be between 1 and %d" % n)
+    if left:
+        raise ValueError("eig: left eigenvectors are not available for k eigenvalues")
+
+    keys = {"LM" : lambda z: -abs(z), "SM" : lambda z: abs(z),
+            "LR" : lambda z: -ctx.re(z), "SR" : lambda z: ctx.re(z),
+            "LI" : lambda z: -ctx.im(z), "SI" : lambda z: ctx.im(z)}
+    if not which in keys:
+        raise ValueError("eig: unknown value %s for which" % which)
+    key = keys[which]
+
+    if which in ("LM", "SM", "LR", "SR") and A == A.transpose_conj():
+        # the hermitian case
+        w = {"LR" : "LA", "SR" : "SA"}.get(which, which)
+        if right:
+            E, ER = ctx.eigh(A, k = k, which = w)
+        else:
+            E, ER = ctx.eigh(A, eigvals_only = True, k = k, which = w), None
+        order = sorted(xrange(k), key = lambda i: key(E[i]))
+        E = [E[i] for i in order]
+        if not right:
+            return E
+        return E, ctx.matrix([[ER[j,i] for i in order] for j in xrange(n)])
+
+    prec = ctx.prec
+    tol = ctx.eps
+    try:
+        ctx.prec += 20
+        if which == "SM":
+            op = krylov_operator(ctx, A, invert = True)
+            E, ER = krylov_schur(ctx, op, n, k, lambda z: -abs(z), tol, right)
+            E = [1 / x for x in E]
+        else:
+            op = krylov_operator(ctx, A)
+            E, ER = krylov_schur(ctx, op, n, k, key, tol, right)
+    finally:
+        ctx.prec = prec
+
+    if isinstance(A, ctx.spmatrix):
+        isreal = not any(ctx.im(x) for x in A.data)
+    else:
+        isreal = not any(ctx.im(x) for x in A)
+    if isreal:
+        # drop imaginary parts which are below the tolerance
+        E = [ctx.re(x) if abs(ctx.im(x)) <= tol * abs(x) else x for x in E]
+
+    E = [+x for x in E]
+    if not right:
+        return E
+    return E, ER.apply(lambda x: +x)
+
 @defun
-def eig(ctx, A, left = False, right = True, overwrite_a = False):
+def eig(ctx, A, left = False, right = True, overwrite_a = False, k = None, which = "LM"):
     """
     This routine computes the eigenvalues and optionally the left and right
     eigenvectors of a square matrix A. Given A, a vector E and matrices ER
@@ -686,12 +1330,28 @@ def eig(ctx, A, left = False, right = True, overwrite_a = False):
       right       : if true, the right eigenvectors are calculated.
       overwrite_a : if true, allows modification of A which may improve
                     performance. if false, A is not modified.
+      k           : if given, only k eigenvalues are calculated (see below).
+                    A may then also be a sparse matrix (spmatrix).
+      which       : selects the k eigenvalues: "LM" (largest magnitude),
+                    "SM" (smallest magnitude), "LR"/"SR" (largest/smallest
+                    real part) or "LI"/"SI" (largest/smallest imaginary part).
 
     output:
       E    : a list of length n containing the eigenvalues of A.
       ER   : a matrix whose columns contain the right eigenvectors of A.
       EL   : a matrix whose rows contain the left eigenvectors of A.
 
+    If k is given, E contains only the k selected eigenvalues, in the order
+    given by which (i.e. by decreasing magnitude for "LM"), and ER only their
+    eigenvectors; left eigenvectors are not available. Instead of the Schur
+    form of A, these are computed from a Krylov subspace of A by the
+    Krylov-Schur method (a restarted Arnoldi method), or by the Lanczos
+    method if A is hermitian, which only requires products of A with
+    vectors. For "SM" the inverse of A is used instead, which requires an LU
+    decomposition of A. This is much faster than computing all eigenvalues if
+    A is large and k is small, and works best for eigenvalues which are well
+    separated from the rest of the spectrum.
+
     return values:
        E            if left and right are both false.
       (E, ER)       if right is true and left is false.
@@ -719,6 +1379,16 @@ def eig(ctx, A, left = False, right = True, overwrite_a = False):
       >>> print(mp.chop( EL[0,:] * A - EL[0,:] * E[0]))
       [0.0  0.0  0.0]
 
+      >>> A = mp.matrix(50, 50)
+      >>> for i in range(50):
+      ...     A[i,i] = (i + 1) ** 2
+      ...     A[i,(i + 1) % 50] = 1
+      >>> E, ER = mp.eig(A, k = 2)
+      >>> mp.nprint(E, 10)
+      [2500.0, 2401.0]
+      >>> print(mp.norm(A * ER[:,0] - E[0] * ER[:,0]) < 1e-10)
+      True
+
     warning:
      - If there are multiple eigenvalues, the eigenvectors do not necessarily
        span the whole vectorspace, i.e. ER and EL may have not full rank.
@@ -732,6 +1402,9 @@ def eig(ctx, A, left = False, right = True, overwrite_a = False):
 
     n = A.rows
 
+    if k is not None:
+        return eig_krylov(ctx, A, k, which, left, right)
+
     if n == 1:
         if left and (not right):
             return ([A[0]], ctx.matrix([[1]]))
@@ -33,12 +33,20 @@
   c_he_tridiag_1 : auxiliary routine to c_he_tridiag_0
   c_he_tridiag_2 : auxiliary routine to c_he_tridiag_0
   tridiag_eigen : solves the real symmetric tridiagonal matrix eigenvalue problem
+  tridiag_eigen_dc : the same by the divide and conquer method
   svd_r_raw : raw singular value decomposition for real matrices
   svd_c_raw : raw singular value decomposition for complex matrices
+  tridiag_bisect : selected eigenvalues of a real symmetric tridiagonal matrix by bisection
+  tridiag_inverse_iteration : eigenvectors of a real symmetric tridiagonal matrix by inverse iteration
+  lanczos : a few eigenvalues of a hermitian operator by the Lanczos method
+  golub_kahan_lanczos : a few singular values by Golub-Kahan-Lanczos bidiagonalization
 """
 
 from ..libmp.backend import xrange
-from .eigen import defun
+from ..libmp.cache import new_cache, stats
+from .eigen import defun, krylov_operator, krylov_random, krylov_extend
+
+gauss_quadrature_cache = new_cache('gauss_quadrature_cache')
 
 
 def r_sy_tridiag(ctx, A, D, E, calc_ev = True):
@@ -78,12 +86,14 @@ def r_sy_tridiag(ctx, A, D, E, calc_ev = True):
     #        whereas v/<v,v> is stored in a[i,(i+1):]
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
     for i in xrange(n - 1, 0, -1):
         # scale the vector
 
         scale = 0
         for k in xrange(0, i):
-            scale += abs(A[k,i])
+            scale += abs(a[k][i])
 
         scale_inv = 0
         if scale != 0:
@@ -92,7 +102,7 @@ def r_sy_tridiag(ctx, A, D, E, calc_ev = True):
         # sadly there are floating point numbers not equal to zero whose reciprocal is infinity
 
         if i == 1 or scale == 0 or ctx.isinf(scale_inv):
-            E[i] = A[i-1,i]        # nothing to do
+            E[i] = a[i-1][i]        # nothing to do
             D[i] = 0
             continue
 
@@ -100,42 +110,42 @@ def r_sy_tridiag(ctx, A, D, E, calc_ev = True):
 
         H = 0
         for k in xrange(0, i):
-            A[k,i] *= scale_inv
-            H += A[k,i] * A[k,i]
+            a[k][i] *= scale_inv
+            H += a[k][i] * a[k][i]
 
-        F = A[i-1,i]
+        F = a[i-1][i]
         G = ctx.sqrt(H)
         if F > 0:
             G = -G
         E[i] = scale * G
         H -= F * G
-        A[i-1,i] = F - G
+        a[i-1][i] = F - G
         F = 0
 
         # apply housholder transformation
 
         for j in xrange(0, i):
             if calc_ev:
-                A[i,j] = A[j,i] / H
+                a[i][j] = a[j][i] / H
 
             G = 0                  # calculate A*U
             for k in xrange(0, j + 1):
-                G += A[k,j] * A[k,i]
+                G += a[k][j] * a[k][i]
             for k in xrange(j + 1, i):
-                G += A[j,k] * A[k,i]
+                G += a[j][k] * a[k][i]
 
             E[j] = G / H           # calculate P
-            F += E[j] * A[j,i]
+            F += E[j] * a[j][i]
 
         HH = F / (2 * H)
 
         for j in xrange(0, i):     # calculate reduced A
-            F = A[j,i]
+            F = a[j][i]
             G = E[j] - HH * F      # calculate Q
             E[j] = G
 
             for k in xrange(0, j + 1):
-                A[k,j] -= F * E[k] + G * A[k,i]
+                a[k][j] -= F * E[k] + G * a[k][i]
 
         D[i] = H
 
@@ -150,18 +160,18 @@ def r_sy_tridiag(ctx, A, D, E, calc_ev = True):
                 for j in xrange(0, i):     # accumulate transformation matrices
                     G = 0
                     for k in xrange(0, i):
-                        G += A[i,k] * A[k,j]
+                        G += a[i][k] * a[k][j]
                     for k in xrange(0, i):
-                        A[k,j] -= G * A[k,i]
+                        a[k][j] -= G * a[k][i]
 
-            D[i] = A[i,i]
-            A[i,i] = 1
+            D[i] = a[i][i]
+            a[i][i] = ctx.one
 
             for j in xrange(0, i):
-                A[j,i] = A[i,j] = 0
+                a[j][i] = a[i][j] = ctx.zero
     else:
         for i in xrange(0, n):
-            D[i] = A[i,i]
+            D[i] = a[i][i]
 
 
 
@@ -202,6 +212,8 @@ def c_he_tridiag_0(ctx, A, D, E, T):
     """
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
     T[n-1] = 1
     for i in xrange(n - 1, 0, -1):
 
@@ -209,7 +221,7 @@ def c_he_tridiag_0(ctx, A, D, E, T):
 
         scale = 0
         for k in xrange(0, i):
-            scale += abs(ctx.re(A[k,i])) + abs(ctx.im(A[k,i]))
+            scale += abs(ctx.re(a[k][i])) + abs(ctx.im(a[k][i]))
 
         scale_inv = 0
         if scale != 0:
@@ -224,7 +236,7 @@ def c_he_tridiag_0(ctx, A, D, E, T):
             continue
 
         if i == 1:
-            F = A[i-1,i]
+            F = a[i-1][i]
             f = abs(F)
             E[i] = f
             D[i] = 0
@@ -238,12 +250,12 @@ def c_he_tridiag_0(ctx, A, D, E, T):
 
         H = 0
         for k in xrange(0, i):
-            A[k,i] *= scale_inv
-            rr = ctx.re(A[k,i])
-            ii = ctx.im(A[k,i])
+            a[k][i] *= scale_inv
+            rr = ctx.re(a[k][i])
+            ii = ctx.im(a[k][i])
             H += rr * rr + ii * ii
 
-        F = A[i-1,i]
+        F = a[i-1][i]
         f = abs(F)
         G = ctx.sqrt(H)
         H += G * f
@@ -254,32 +266,32 @@ def c_he_tridiag_0(ctx, A, D, E, T):
             G *= F
         else:
             TZ = -T[i]                   # T[i-1]=-T[i]
-        A[i-1,i] += G
+        a[i-1][i] += G
         F = 0
 
         # apply housholder transformation
 
         for j in xrange(0, i):
-            A[i,j] = A[j,i] / H
+            a[i][j] = a[j][i] / H
 
             G = 0                        # calculate A*U
             for k in xrange(0, j + 1):
-                G += ctx.conj(A[k,j]) * A[k,i]
+                G += ctx.conj(a[k][j]) * a[k][i]
             for k in xrange(j + 1, i):
-                G += A[j,k] * A[k,i]
+                G += a[j][k] * a[k][i]
 
             T[j] = G / H                 # calculate P
-            F += ctx.conj(T[j]) * A[j,i]
+            F += ctx.conj(T[j]) * a[j][i]
 
         HH = F / (2 * H)
 
         for j in xrange(0, i):           # calculate reduced A
-            F = A[j,i]
+            F = a[j][i]
             G = T[j] - HH * F            # calculate Q
             T[j] = G
 
             for k in xrange(0, j + 1):
-                A[k,j] -= ctx.conj(F) * T[k] + ctx.conj(G) * A[k,i]
+                a[k][j] -= ctx.conj(F) * T[k] + ctx.conj(G) * a[k][i]
                 # as we use the lower left part for storage
                 # we have to use the transpose of the normal formula
 
@@ -293,8 +305,8 @@ def c_he_tridiag_0(ctx, A, D, E, T):
     D[0] = 0
     for i in xrange(0, n):
         zw = D[i]
-        D[i] = ctx.re(A[i,i])
-        A[i,i] = zw
+        D[i] = ctx.re(a[i][i])
+        a[i][i] = ctx.convert(zw)
 
 
 
@@ -315,24 +327,26 @@ def c_he_tridiag_1(ctx, A, T):
     """
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
 
     for i in xrange(0, n):
-        if A[i,i] != 0:
+        if a[i][i] != 0:
             for j in xrange(0, i):
                 G = 0
                 for k in xrange(0, i):
-                    G += ctx.conj(A[i,k]) * A[k,j]
+                    G += ctx.conj(a[i][k]) * a[k][j]
                 for k in xrange(0, i):
-                    A[k,j] -= G * A[k,i]
+                    a[k][j] -= G * a[k][i]
 
-        A[i,i] = 1
+        a[i][i] = ctx.one
 
         for j in xrange(0, i):
-            A[j,i] = A[i,j] = 0
+            a[j][i] = a[i][j] = ctx.zero
 
     for i in xrange(0, n):
         for k in xrange(0, n):
-            A[i,k] *= T[k]
+            a[i][k] *= T[k]
 
 
 
@@ -356,19 +370,23 @@ def c_he_tridiag_2(ctx, A, T, B):
     """
 
     n = A.rows
+    a = A._dense_rows()
+    A._LU = None
+    b = B._dense_rows()
+    B._LU = None
 
     for i in xrange(0, n):
         for k in xrange(0, n):
-            B[k,i] *= T[k]
+            b[k][i] *= T[k]
 
     for i in xrange(0, n):
-        if A[i,i] != 0:
+        if a[i][i] != 0:
             for j in xrange(0, n):
                 G = 0
                 for k in xrange(0, i):
-                    G += ctx.conj(A[i,k]) * B[k,j]
+                    G += ctx.conj(a[i][k]) * b[k][j]
                 for k in xrange(0, i):
-                    B[k,j] -= G * A[k,i]
+                    b[k][j] -= G * a[k][i]
 
 
 
@@ -395,7 +413,7 @@ def tridiag_eigen(ctx, d, e, z = False):
         complex matrix of dimension (m,n) ). On output this matrix will be
         multiplied by the matrix of the eigenvectors (i.e. the columns of this
         matrix are the eigenvectors): z --> z*EV
-        That means if z[i,j]={1 if j==j; 0 otherwise} on input, then on output
+        That means if zrows[i][j]={1 if j==j; 0 otherwise} on input, then on output
         z will contain the first m components of the eigenvectors. That means
         if m is equal to n, the i-th eigenvector will be z[:,i].
 
@@ -409,6 +427,9 @@ def tridiag_eigen(ctx, d, e, z = False):
     """
 
     n = len(d)
+    if not isinstance(z, bool):
+        zrows = z._dense_rows()
+        z._LU = None
     e[n-1] = 0
     iterlim = 2 * ctx.dps
 
@@ -470,9 +491,9 @@ def tridiag_eigen(ctx, d, e, z = False):
                 if not isinstance(z, bool):
                     # calculate eigenvectors
                     for w in xrange(z.rows):
-                        f = z[w,i+1]
-                        z[w,i+1] = s * z[w,i] + c * f
-                        z[w,i  ] = c * z[w,i] - s * f
+                        f = zrows[w][i+1]
+                        zrows[w][i+1] = s * zrows[w][i] + c * f
+                        zrows[w][i] = c * zrows[w][i] - s * f
 
             d[l] = d[l] - p
             e[l] = g
@@ -495,14 +516,292 @@ def tridiag_eigen(ctx, d, e, z = False):
 
         if not isinstance(z, bool):
             for w in xrange(z.rows):
-                p = z[w,i]
-                z[w,i] = z[w,k]
-                z[w,k] = p
+                p = zrows[w][i]
+                zrows[w][i] = zrows[w][k]
+                zrows[w][k] = p
+
+def _dc_secular(ctx, d, z, zz, iterlim):
+    """
+    Solves the secular equation 1 + sum(zz[j] / (d[j] - x)) = 0 for the
+    rank-one modified diagonal matrix diag(d) + rho * z * z' where
+    d is strictly increasing and zz[j] = rho * z[j]**2 > 0. Returns the
+    eigenvalues as pairs (k, tau) with x = d[k] + tau, i.e. relative to
+    the nearest pole, and the eigenvectors as a list of columns.
+    """
+
+    K = len(d)
+    if K == 1:
+        return [(0, zz[0])], [[ctx.one]]
+
+    eps = ctx.eps
+    roots = []
+    for i in xrange(K):
+        if i < K - 1:
+            # the root lies in (d[i], d[i+1]); take the nearer pole as origin
+            gap = d[i + 1] - d[i]
+            mid = gap / 2
+            f = 1 + ctx.fsum(zz[j] / (d[j] - d[i] - mid) for j in xrange(K))
+            if f >= 0:
+                k, lo, hi = i, 0, mid
+            else:
+                k, lo, hi = i + 1, -mid, 0
+            left = i
+        else:
+            # the last root lies in (d[K-1], d[K-1] + rho * z' * z)
+            k, lo, hi = K - 1, 0, ctx.fsum(zz)
+            left = K - 2
+
+        dd = [x - d[k] for x in d]
+        tau = (lo + hi) / 2
+        j = 0
+        while 1:
+            if j >= iterlim:
+                raise RuntimeError("tridiag_eigen_dc: no convergence of the secular equation after %d iterations" % iterlim)
+            j += 1
+
+            # split f into the sums over the poles left and right of the root
+            delta = [x - tau for x in dd]
+            t = [x / y for x, y in zip(zz, delta)]
+            dt = [x / y for x, y in zip(t, delta)]
+            psi = ctx.fsum(t[:left + 1])
+            phi = ctx.fsum(t[left + 1:])
+            dpsi = ctx.fsum(dt[:left + 1])
+            dphi = ctx.fsum(dt[left + 1:])
+            w = 1 + psi + phi
+            if abs(w) <= eps * (1 + ctx.fsum(t, absolute = True)):
+                break
+            if w < 0:
+                lo = tau
+            else:
+                hi = tau
+
+            # interpolate psi and phi by simple rational functions with poles
+            # at delta[left] and delta[left+1] and solve the resulting quadratic
+            # c * eta**2 - a * eta + b = 0 for the correction eta
+            Dl, Dr = delta[left], delta[left + 1]
+            a = (Dl + Dr) * w - Dl * Dr * (dpsi + dphi)
+            b = Dl * Dr * w
+            c = w - Dl * dpsi - Dr * dphi
+            eta = None
+            if c == 0:
+                if a != 0:
+                    eta = [b / a]
+            else:
+                disc = a * a - 4 * b * c
+                if disc >= 0:
+                    q = ctx.sqrt(disc)
+                    if a < 0:
+                        q = -q
+                    q = (a + q) / 2
+                    eta = [q / c]
+                    if q != 0:
+                        eta.append(b / q)
+            t = None
+            if eta is not None:
+                for x in eta:
+                    if lo < tau + x < hi:
+                        t = tau + x
+                        break
+            if t is None:
+                # safeguard: bisection
+                t = (lo + hi) / 2
+            eta = t - tau
+            tau = t
+            if abs(eta) <= eps * abs(tau):
+                break
+        roots.append((k, tau))
+
+    # recompute z from the computed eigenvalues (Gu and Eisenstat) so that the
+    # eigenvectors are numerically orthogonal even for close eigenvalues
+    zh = []
+    for i in xrange(K):
+        k, tau = roots[K - 1]
+        p = d[k] - d[i] + tau
+        for j in xrange(i):
+            k, tau = roots[j]
+            p *= (d[k] - d[i] + tau) / (d[j] - d[i])
+        for j in xrange(i, K - 1):
+            k, tau = roots[j]
+            p *= (d[k] - d[i] + tau) / (d[j + 1] - d[i])
+        p = ctx.sqrt(abs(p))
+        if z[i] < 0:
+            p = -p
+        zh.append(p)
+
+    U = []
+    for j in xrange(K):
+        k, tau = roots[j]
+        u = [zh[i] / (d[i] - d[k] - tau) for i in xrange(K)]
+        s = ctx.sqrt(ctx.fdot(u, u))
+        U.append([x / s for x in u])
+
+    return roots, U
+
+def _dc_tridiag(ctx, d, e, vectors, leaf, iterlim):
+    """
+    Cuppen's divide and conquer method for the symmetric tridiagonal matrix
+    with diagonal d and offdiagonal e. Returns the eigenvalues in ascending
+    order and the rows of the eigenvector matrix, or only its first and last
+    row if vectors is false.
+    """
+
+    n = len(d)
+
+    if n <= leaf:
+        dm = ctx.matrix(d)
+        em = ctx.matrix(e + [0])
+        if vectors:
+            q = ctx.eye(n)
+        else:
+            q = ctx.zeros(2, n)
+            q[0,0] = q[1,n-1] = 1
+        tridiag_eigen(ctx, dm, em, q)
+        return [dm[i] for i in xrange(n)], q._dense_rows()
+
+    # T = diag(T1, T2) + rho * u * u' with u = (0,..,0,1,s,0,..,0)
+    m = n // 2
+    beta = e[m - 1]
+    rho = abs(beta)
+    d1 = d[:m]
+    d2 = d[m:]
+    d1[m - 1] -= rho
+    d2[0] -= rho
+    l1, q1 = _dc_tridiag(ctx, d1, e[:m - 1], vectors, leaf, iterlim)
+    l2, q2 = _dc_tridiag(ctx, d2, e[m:], vectors, leaf, iterlim)
+
+    zero = ctx.zero
+    z1 = [zero] * m
+    z2 = [zero] * (n - m)
+    if vectors:
+        rows = [r + z2 for r in q1] + [z1 + r for r in q2]
+    else:
+        rows = [q1[0] + z2, z1 + q2[1]]
+    z = q1[-1] + (q2[0] if beta >= 0 else [-x for x in q2[0]])
+    D = l1 + l2
+
+    # normalize z
+    s = ctx.sqrt(ctx.fdot(z, z))
+    rho *= s * s
+    z = [x / s for x in z]
+
+    # deflation: drop components of z which are negligible and combine
+    # components belonging to (almost) equal diagonal entries by rotations
+    tol = 8 * ctx.eps * max(max(abs(x) for x in D), rho * max(abs(x) for x in z))
+    order = sorted(xrange(n), key = lambda i: D[i])
+    nd = []
+    pj = None
+    for k in order:
+        if rho * abs(z[k]) <= tol:
+            continue
+        if pj is not None:
+            r = ctx.hypot(z[pj], z[k])
+            c = z[k] / r
+            s = z[pj] / r
+            if abs(c * s * (D[k] - D[pj])) <= tol:
+                for row in rows:
+                    x, y = row[pj], row[k]
+                    row[pj] = c * x - s * y
+                    row[k] = s * x + c * y
+                D[pj], D[k] = c * c * D[pj] + s * s * D[k], s * s * D[pj] + c * c * D[k]
+                z[pj] = zero
+                z[k] = r
+            else:
+                nd.append(pj)
+        pj = k
+    if pj is not None:
+        nd.append(pj)
+
+    ndset = set(nd)
+    cols = [(D[k], None, k) for k in xrange(n) if k not in ndset]
+
+    if nd:
+        dn = [D[k] for k in nd]
+        zn = [z[k] for k in nd]
+        roots, U = _dc_secular(ctx, dn, zn, [rho * x * x for x in zn], iterlim)
+        for j in xrange(len(nd)):
+            k, tau = roots[j]
+            cols.append((dn[k] + tau, j, None))
+
+    cols.sort(key = lambda x: x[0])
+
+    newrows = []
+    for row in rows:
+        nz = [(t, row[k]) for t, k in enumerate(nd) if row[k]]
+        newrow = []
+        for x, j, k in cols:
+            if j is None:
+                newrow.append(row[k])
+            else:
+                u = U[j]
+                newrow.append(ctx.fdot([(y, u[t]) for t, y in nz]))
+        newrows.append(newrow)
+
+    return [x for x, j, k in cols], newrows
+
+def tridiag_eigen_dc(ctx, d, e, z = False):
+    """
+    This subroutine finds the eigenvalues and eigenvectors of a real
+    symmetric tridiagonal matrix using Cuppen's divide and conquer method.
+    The parameters d, e and z have the same meaning as for tridiag_eigen.
+
+    The matrix is split recursively into two halves coupled by a rank-one
+    modification. Blocks of at most 16 rows are solved by tridiag_eigen, the
+    halves are merged by solving the secular equation. Only the boundary rows
+    of the eigenvector matrices are carried along if z is False, so that the
+    eigenvalues alone take O(n^2) operations. With eigenvectors, the work
+    is dominated by a few matrix products per merge, which is much cheaper
+    than the Givens rotations of the QL method.
+
+    references:
+      - j.j.m. cuppen, "a divide and conquer method for the symmetric
+        tridiagonal eigenproblem", numer. math. 36, p. 177-195 (1981)
+      - m. gu and s.c. eisenstat, "a divide-and-conquer algorithm for the
+        symmetric tridiagonal eigenproblem", siam j. matrix anal. appl. 16,
+        p. 172-191 (1995)
+      - the lapack routines dlaed0-dlaed4 (see netlib.org)
+    """
+
+    n = len(d)
+    vectors = not isinstance(z, bool)
+    dl = [d[i] for i in xrange(n)]
+    el = [e[i] for i in xrange(n - 1)]
+    lam, q = _dc_tridiag(ctx, dl, el, vectors, 16, 3 * ctx.prec)
+
+    for i in xrange(n):
+        d[i] = lam[i]
+        e[i] = 0
+
+    if vectors:
+        # z --> z * EV
+        zrows = z._dense_rows()
+        z._LU = None
+        qcols = list(zip(*q))
+        for w in xrange(z.rows):
+            row = zrows[w]
+            nz = [(k, x) for k, x in enumerate(row) if x]
+            zrows[w] = [ctx.fdot([(x, col[k]) for k, x in nz]) for col in qcols]
+
+def tridiag_solver(ctx, method, n, vectors):
+    """
+    Returns the routine which solves the tridiagonal eigenvalue problem for
+    the given method ("ql", "dc" or None for an automatic choice).
+    """
+
+    if method is None:
+        if vectors and n >= 32:
+            method = "dc"
+        else:
+            method = "ql"
+    if method == "ql":
+        return tridiag_eigen
+    if method == "dc":
+        return tridiag_eigen_dc
+    raise ValueError("unknown method \"%s\"" % method)
 
 ########################################################################################
 
 @defun
-def eigsy(ctx, A, eigvals_only = False, overwrite_a = False):
+def eigsy(ctx, A, eigvals_only = False, overwrite_a = False, method = None):
     """
     This routine solves the (ordinary) eigenvalue problem for a real symmetric
     square matrix A. Given A, an orthogonal matrix Q is calculated which
@@ -529,6 +828,12 @@ def eigsy(ctx, A, eigvals_only = False, overwrite_a = False):
       overwrite_a: if true, allows modification of A which may improve
                    performance. if false, A is not modified.
 
+      method: the method for the tridiagonal eigenvalue problem. "ql" uses
+              the implicit QL method, "dc" the divide and conquer method which
+              is much faster for large matrices if eigenvectors are wanted.
+              By default "dc" is chosen if eigenvectors are wanted and n >= 32,
+              otherwise "ql".
+
     output:
 
       E: vector of format (n). contains the eigenvalues of A in ascending order.
@@ -564,18 +869,20 @@ def eigsy(ctx, A, eigvals_only = False, overwrite_a = False):
     d = ctx.zeros(A.rows, 1)
     e = ctx.zeros(A.rows, 1)
 
+    solver = tridiag_solver(ctx, method, A.rows, not eigvals_only)
+
     if eigvals_only:
         r_sy_tridiag(ctx, A, d, e, calc_ev = False)
-        tridiag_eigen(ctx, d, e, False)
+        solver(ctx, d, e, False)
         return d
     else:
         r_sy_tridiag(ctx, A, d, e, calc_ev = True)
-        tridiag_eigen(ctx, d, e, A)
+        solver(ctx, d, e, A)
         return (d, A)
 
 
 @defun
-def eighe(ctx, A, eigvals_only = False, overwrite_a = False):
+def eighe(ctx, A, eigvals_only = False, overwrite_a = False, method = None):
     """
     This routine solves the (ordinary) eigenvalue problem for a complex
     hermitian square matrix A. Given A, an unitary matrix Q is calculated which
@@ -603,6 +910,12 @@ def eighe(ctx, A, eigvals_only = False, overwrite_a = False):
       overwrite_a: if true, allows modification of A which may improve
                    performance. if false, A is not modified.
 
+      method: the method for the tridiagonal eigenvalue problem. "ql" uses
+              the implicit QL method, "dc" the divide and conquer method which
+              is much faster for large matrices if eigenvectors are wanted.
+              By default "dc" is chosen if eigenvectors are wanted and n >= 32,
+              otherwise "ql".
+
     output:
 
       E: vector of format (n). contains the eigenvalues of A in ascending order.
@@ -639,19 +952,21 @@ def eighe(ctx, A, eigvals_only = False, overwrite_a = False):
     e = ctx.zeros(A.rows, 1)
     t = ctx.zeros(A.rows, 1)
 
+    solver = tridiag_solver(ctx, method, A.rows, not eigvals_only)
+
     if eigvals_only:
         c_he_tridiag_0(ctx, A, d, e, t)
-        tridiag_eigen(ctx, d, e, False)
+        solver(ctx, d, e, False)
         return d
     else:
         c_he_tridiag_0(ctx, A, d, e, t)
         B = ctx.eye(A.rows)
-        tridiag_eigen(ctx, d, e, B)
+        solver(ctx, d, e, B)
         c_he_tridiag_2(ctx, A, t, B)
         return (d, B)
 
 @defun
-def eigh(ctx, A, eigvals_only = False, overwrite_a = False):
+def eigh(ctx, A, eigvals_only = False, overwrite_a = False, method = None, k = None, which = "LM"):
     """
     "eigh" is a unified interface for "eigsy" and "eighe". Depending on
     whether A is real or complex the appropriate function is called.
@@ -681,6 +996,18 @@ def eigh(ctx, A, eigvals_only = False, overwrite_a = False):
       overwrite_a: if true, allows modification of A which may improve
                    performance. if false, A is not modified.
 
+      method: the method for the tridiagonal eigenvalue problem. "ql" uses
+              the implicit QL method, "dc" the divide and conquer method which
+              is much faster for large matrices if eigenvectors are wanted.
+              By default "dc" is chosen if eigenvectors are wanted and n >= 32,
+              otherwise "ql".
+
+      k: if given, only k eigenvalues are calculated (see below). A may then
+         also be a sparse matrix (spmatrix).
+
+      which: selects the k eigenvalues: "LM" (largest magnitude), "SM"
+             (smallest magnitude), "LA" (largest) or "SA" (smallest).
+
     output:
 
       E: vector of format (n). contains the eigenvalues of A in ascending order.
@@ -688,6 +1015,13 @@ def eigh(ctx, A, eigvals_only = False, overwrite_a = False):
       Q: an orthogonal or unitary matrix of format (n,n). contains the
          eigenvectors of A as columns.
 
+    If k is given, E only contains the k selected eigenvalues (in ascending
+    order) and Q, of format (n,k), their eigenvectors. These are computed by
+    the Lanczos method, which only requires products of A with vectors, and
+    bisection on the tridiagonal Lanczos matrix. For "SM" the inverse of A is
+    used instead, which requires an LU decomposition of A. This is much faster
+    than computing all eigenvalues if A is large and k is small.
+
     return value:
 
           E         if eigvals_only is true
@@ -713,17 +1047,210 @@ def eigh(ctx, A, eigvals_only = False, overwrite_a = False):
       [0.0]
       [0.0]
 
+      >>> A = mp.matrix(100, 100)
+      >>> for i in range(100):
+      ...     A[i,i] = (i + 1) ** 2
+      ...     if i: A[i,i-1] = A[i-1,i] = 1
+      >>> E, Q = mp.eigh(A, k = 2, which = "LA")
+      >>> mp.nprint(E.T, 10)
+      [9801.000051  10000.00503]
+      >>> print(mp.norm(A * Q[:,1] - E[1] * Q[:,1]) < 1e-10)
+      True
+
     see also: eigsy, eighe, eig
     """
 
+    if k is not None:
+        return eigh_krylov(ctx, A, k, which, eigvals_only)
+
     iscomplex = any(type(x) is ctx.mpc for x in A)
 
     if iscomplex:
-        return ctx.eighe(A, eigvals_only = eigvals_only, overwrite_a = overwrite_a)
+        return ctx.eighe(A, eigvals_only = eigvals_only, overwrite_a = overwrite_a, method = method)
     else:
-        return ctx.eigsy(A, eigvals_only = eigvals_only, overwrite_a = overwrite_a)
+        return ctx.eigsy(A, eigvals_only = eigvals_only, overwrite_a = overwrite_a, method = method)
 
 
+def _gauss_nodes_float(d, e2, k0, x0 = None):
+    """
+    Returns floating-point approximations to the eigenvalues k0, k0+1, ...
+    (in ascending order) of the symmetric tridiagonal matrix with diagonal d
+    and squared offdiagonal e2, starting from the guess x0 for eigenvalue k0.
+    Newton's method for the characteristic polynomial is safeguarded by
+    bisection, using the Sturm sequence to count the eigenvalues below x.
+    """
+
+    n = len(d)
+    eps = 2.0 ** -52
+    # gershgorin bounds
+    glo = ghi = d[0]
+    for j in xrange(n):
+        r = 0.0
+        if j > 0:
+            r += abs(e2[j - 1]) ** 0.5
+        if j < n - 1:
+            r += abs(e2[j]) ** 0.5
+        glo = min(glo, d[j] - r)
+        ghi = max(ghi, d[j] + r)
+    scale = max(abs(glo), abs(ghi), 1e-300)
+    tiny = eps * scale
+    lo = glo - tiny
+    hi = ghi + tiny
+    if x0 is None:
+        x0 = lo
+
+    def sturm(x):
+        # number of eigenvalues below x, logarithmic derivative of det(T - x)
+        q = d[0] - x
+        if q == 0:
+            q = tiny
+        dq = -1.0
+        c = q < 0
+        s = dq / q
+        for j in xrange(1, n):
+            t = e2[j - 1] / q
+            dq = t * dq / q - 1
+            q = d[j] - x - t
+            if q == 0:
+                q = tiny
+            c += q < 0
+            s += dq / q
+        return c, s
+
+    X = []
+    for k in xrange(k0, n):
+        a, b = lo, hi
+        if len(X) >= 3:
+            x = 3 * (X[-1] - X[-2]) + X[-3]
+        elif len(X) == 2:
+            x = 2 * X[-1] - X[-2]
+        elif X:
+            x = 0.5 * (X[-1] + b)
+        else:
+            x = x0
+        for it in xrange(200):
+            c, s = sturm(x)
+            if c <= k:
+                a = max(a, x)
+            else:
+                b = min(b, x)
+            if s != 0 and s == s:
+                y = x - 1 / s
+                # after a small newton step y is accurate to rounding errors
+                sp = abs(y - lo)
+                if abs(y - x) <= 1e-9 * sp:
+                    # check that this is the k-th eigenvalue
+                    h = 1e-6 * sp
+                    if sturm(y + h)[0] <= k:
+                        a = y + h
+                    elif sturm(y - h)[0] > k:
+                        b = y - h
+                    else:
+                        x = y
+                        break
+                    y = None
+            else:
+                y = None
+            if y is None or not a < y < b:
+                y = 0.5 * (a + b)
+            x = y
+        X.append(x)
+        lo = x
+    return X
+
+def _gauss_newton(D, E, IE, x, tol, wp, iterlim):
+    """
+    Refines an approximate zero x of the characteristic polynomial of the
+    symmetric tridiagonal matrix with diagonal D and offdiagonal E[1:] by
+    Newton's method. The orthonormal polynomials P_j are evaluated with the
+    three-term recurrence P_(j+1) = ((x - D[j]) * P_j - E[j] * P_(j-1)) * IE[j]
+    in fixed-point arithmetic (all numbers are integers scaled by 2**wp).
+    The iteration stops when the correction is below tol or stops decreasing,
+    i.e. when the rounding errors dominate. Returns x and the sum of the
+    squares of P_0(x), ..., P_(n-1)(x) (scaled by 2**(2*wp)).
+    """
+
+    n = len(D)
+    last = None
+    for it in xrange(iterlim):
+        p0, p1 = 0, 1 << wp
+        dp0, dp1 = 0, 0
+        s = 0
+        for j in xrange(n):
+            s += p1 * p1
+            t = x - D[j]
+            q = (t * p1 - E[j] * p0) >> wp
+            dq = ((p1 << wp) + t * dp1 - E[j] * dp0) >> wp
+            if j < n - 1:
+                p0, p1 = p1, (q * IE[j]) >> wp
+                dp0, dp1 = dp1, (dq * IE[j]) >> wp
+        step = (q << wp) // dq
+        x -= step
+        step = abs(step)
+        if step <= tol or (last is not None and 2 * step > last):
+            return x, s
+        last = step
+    raise RuntimeError("gauss_quadrature: no convergence of newton iteration after %d iterations" % iterlim)
+
+def _gauss_rule(ctx, d, e, w):
+    """
+    Computes the nodes and weights of the gaussian quadrature rule for the
+    jacobi matrix with diagonal d and offdiagonal e (which must not vanish)
+    and the moment w. The weight of the node x_k is w times the square of the
+    first component of the normalized eigenvector (P_0(x_k), ..., P_(n-1)(x_k)),
+    i.e. w / (P_0(x_k)**2 + ... + P_(n-1)(x_k)**2).
+    """
+
+    n = len(d)
+    prec = ctx.prec
+    wp = prec + 30 + 2 * n.bit_length()
+    dl = [d[i] for i in xrange(n)]
+
+    # for a constant diagonal the nodes are symmetric about it
+    symmetric = all(x == dl[0] for x in dl)
+    if symmetric:
+        k0 = n // 2
+        x0 = float(dl[0])
+    else:
+        k0 = 0
+        x0 = None
+
+    X = _gauss_nodes_float([float(x) for x in dl],
+        [float(e[i]) ** 2 for i in xrange(n - 1)], k0, x0)
+
+    try:
+        ctx.prec = wp
+        D = [int(ctx.ldexp(x, wp)) for x in dl]
+        E = [0] + [int(ctx.ldexp(e[i], wp)) for i in xrange(n - 1)]
+        IE = [int(ctx.ldexp(1 / e[i], wp)) for i in xrange(n - 1)]
+    finally:
+        ctx.prec = prec
+
+    iterlim = 2 * ctx.dps
+    nodes = []
+    for i in xrange(len(X)):
+        h = 1.0
+        if i > 0:
+            h = X[i] - X[i - 1]
+        elif i < len(X) - 1:
+            h = X[i + 1] - X[i]
+        tol = max(int(ctx.ldexp(abs(X[i]) + h, wp - prec - 10)), 1)
+        x = int(ctx.ldexp(X[i], wp))
+        nodes.append(_gauss_newton(D, E, IE, x, tol, wp, iterlim))
+
+    X = [ctx.ldexp(x, -wp) for x, s in nodes]
+    W = [w / ctx.ldexp(s, -2 * wp) for x, s in nodes]
+
+    if symmetric:
+        if n % 2:
+            X[0] = dl[0]
+        c = 2 * dl[0]
+        m = n % 2
+        X = [c - x for x in reversed(X[m:])] + X
+        W = list(reversed(W[m:])) + W
+
+    return X, W
+
 @defun
 def gauss_quadrature(ctx, n, qtype = "legendre", alpha = 0, beta = 0):
     """
@@ -801,6 +1328,15 @@ def gauss_quadrature(ctx, n, qtype = "legendre", alpha = 0, beta = 0):
       >>> print(mp.chop(A, tol = 1e-10))
       0.0
 
+    The nodes are the eigenvalues of the jacobi matrix of the recurrence
+    coefficients. They are located in floating-point arithmetic with sturm
+    sequences and then refined by newton's method on the three-term recurrence
+    of the orthonormal polynomials, which also gives the weights (the squares
+    of the first components of the eigenvectors). This takes O(n^2) operations.
+    The rules for the chebyshev polynomials are given in closed form. The rules
+    for the predefined families are cached by (n, qtype, alpha, beta, prec),
+    see cache_info().
+
     references:
       - golub and welsch, "calculations of gaussian quadrature rules", mathematics of
         computation 23, p. 221-230 (1969)
@@ -811,11 +1347,19 @@ def gauss_quadrature(ctx, n, qtype = "legendre", alpha = 0, beta = 0):
     Mathematical Software algorithm 726.
     """
 
+    if isinstance(qtype, str):
+        key = (ctx, n, qtype, alpha, beta, ctx.prec)
+        if key in gauss_quadrature_cache:
+            if stats.enabled:
+                stats.hit('gauss_quadrature')
+            X, W = gauss_quadrature_cache[key]
+            return (ctx.matrix(X), ctx.matrix(W))
+    else:
+        key = None
+    t0 = stats.start()
+
     d = ctx.zeros(n, 1)
     e = ctx.zeros(n, 1)
-    z = ctx.zeros(1, n)
-
-    z[0,0] = 1
 
     if qtype == "legendre":
         # legendre on the range -1 +1 , abramowitz, table 25.4, p.916
@@ -883,13 +1427,26 @@ def gauss_quadrature(ctx, n, qtype = "legendre", alpha = 0, beta = 0):
     else:
         assert 0
 
-    tridiag_eigen(ctx, d, e, z)
-
-    for i in xrange(len(z)):
-        z[i] *= z[i]
-
-    z = z.transpose()
-    return (d, w * z)
+    if qtype == "chebyshev1":
+        X = [-ctx.cospi((2 * k + 1) / ctx.mpf(2 * n)) for k in xrange(n)]
+        W = [w / n] * n
+    elif qtype == "chebyshev2":
+        X = [-ctx.cospi((k + 1) / ctx.mpf(n + 1)) for k in xrange(n)]
+        W = [2 * w / (n + 1) * ctx.sinpi((k + 1) / ctx.mpf(n + 1)) ** 2 for k in xrange(n)]
+    elif all(e[i] for i in xrange(n - 1)):
+        X, W = _gauss_rule(ctx, d, e, w)
+    else:
+        # reducible jacobi matrix: fall back to the eigenvalue problem
+        z = ctx.zeros(1, n)
+        z[0,0] = 1
+        tridiag_eigen(ctx, d, e, z)
+        X = [d[i] for i in xrange(n)]
+        W = [w * z[i] ** 2 for i in xrange(n)]
+
+    if key is not None:
+        gauss_quadrature_cache[key] = (X, W)
+        stats.miss('gauss_quadrature', t0)
+    return (ctx.matrix(X), ctx.matrix(W))
 
 ##################################################################################################
 ##################################################################################################
@@ -942,6 +1499,11 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
     """
 
     m, n = A.rows, A.cols
+    a = A._dense_rows()
+    A._LU = None
+    if not isinstance(V, bool):
+        v = V._dense_rows()
+        V._LU = None
 
     S = ctx.zeros(n, 1)
 
@@ -956,77 +1518,77 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
         g = s = scale = 0
         if i < m:
             for k in xrange(i, m):
-                scale += ctx.fabs(A[k,i])
+                scale += ctx.fabs(a[k][i])
             if scale != 0:
                 for k in xrange(i, m):
-                    A[k,i] /= scale
-                    s += A[k,i] * A[k,i]
-                f = A[i,i]
+                    a[k][i] /= scale
+                    s += a[k][i] * a[k][i]
+                f = a[i][i]
                 g = -ctx.sqrt(s)
                 if f < 0:
                     g = -g
                 h = f * g - s
-                A[i,i] = f - g
+                a[i][i] = f - g
                 for j in xrange(i+1, n):
                     s = 0
                     for k in xrange(i, m):
-                        s += A[k,i] * A[k,j]
+                        s += a[k][i] * a[k][j]
                     f = s / h
                     for k in xrange(i, m):
-                        A[k,j] += f * A[k,i]
+                        a[k][j] += f * a[k][i]
                 for k in xrange(i,m):
-                    A[k,i] *= scale
+                    a[k][i] *= scale
 
         S[i] = scale * g
         g = s = scale = 0
 
         if i < m and i != n - 1:
             for k in xrange(i+1, n):
-                scale += ctx.fabs(A[i,k])
+                scale += ctx.fabs(a[i][k])
             if scale:
                 for k in xrange(i+1, n):
-                    A[i,k] /= scale
-                    s += A[i,k] * A[i,k]
-                f = A[i,i+1]
+                    a[i][k] /= scale
+                    s += a[i][k] * a[i][k]
+                f = a[i][i+1]
                 g = -ctx.sqrt(s)
                 if f < 0:
                     g = -g
                 h = f * g - s
-                A[i,i+1] = f - g
+                a[i][i+1] = f - g
 
                 for k in xrange(i+1, n):
-                    work[k] = A[i,k] / h
+                    work[k] = a[i][k] / h
 
                 for j in xrange(i+1, m):
                     s = 0
                     for k in xrange(i+1, n):
-                        s += A[j,k] * A[i,k]
+                        s += a[j][k] * a[i][k]
                     for k in xrange(i+1, n):
-                        A[j,k] += s * work[k]
+                        a[j][k] += s * work[k]
 
                 for k in xrange(i+1, n):
-                    A[i,k] *= scale
+                    a[i][k] *= scale
 
         anorm = max(anorm, ctx.fabs(S[i]) + ctx.fabs(work[i]))
 
     if not isinstance(V, bool):
         for i in xrange(n-2, -1, -1):     # accumulation of right hand transformations
-            V[i+1,i+1] = 1
+            v[i+1][i+1] = ctx.one
 
             if work[i+1] != 0:
                 for j in xrange(i+1, n):
-                    V[i,j] = (A[i,j] / A[i,i+1]) / work[i+1]
+                    v[i][j] = (a[i][j] / a[i][i+1]) / work[i+1]
                 for j in xrange(i+1, n):
                     s = 0
                     for k in xrange(i+1, n):
-                        s += A[i,k] * V[j,k]
+                        s += a[i][k] * v[j][k]
                     for k in xrange(i+1, n):
-                        V[j,k] += s * V[i,k]
+                        v[j][k] += s * v[i][k]
 
             for j in xrange(i+1, n):
-                V[j,i] = V[i,j] = 0
+                v[j][i] = v[i][j] = ctx.zero
 
-        V[0,0] = 1
+        v[0][0] = ctx.one
 
     if m<n : minnm = m
     else   : minnm = n
@@ -1035,22 +1597,22 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
         for i in xrange(minnm-1, -1, -1): # accumulation of left hand transformations
             g = S[i]
             for j in xrange(i+1, n):
-                A[i,j] = 0
+                a[i][j] = ctx.zero
             if g != 0:
                 g = 1 / g
                 for j in xrange(i+1, n):
                     s = 0
                     for k in xrange(i+1, m):
-                        s += A[k,i] * A[k,j]
-                    f = (s / A[i,i]) * g
+                        s += a[k][i] * a[k][j]
+                    f = (s / a[i][i]) * g
                     for k in xrange(i, m):
-                        A[k,j] += f * A[k,i]
+                        a[k][j] += f * a[k][i]
                 for j in xrange(i, m):
-                    A[j,i] *= g
+                    a[j][i] *= g
             else:
                 for j in xrange(i, m):
-                    A[j,i] = 0
-            A[i,i] += 1
+                    a[j][i] = ctx.zero
+            a[i][i] += 1
 
     for k in xrange(n - 1, -1, -1):
         # diagonalization of the bidiagonal form:
@@ -1088,10 +1650,10 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
 
                     if calc_u:
                         for j in xrange(m):
-                            y = A[j,nm]
-                            z = A[j,i]
-                            A[j,nm] = y * c + z * s
-                            A[j,i]  = z * c - y * s
+                            y = a[j][nm]
+                            z = a[j][i]
+                            a[j][nm] = y * c + z * s
+                            a[j][i]  = z * c - y * s
 
             z = S[k]
 
@@ -1100,7 +1662,7 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
                     S[k] = -z
                     if not isinstance(V, bool):
                         for j in xrange(n):
-                            V[k,j] = -V[k,j]
+                            v[k][j] = -v[k][j]
                 break
 
             if its >= maxits:
@@ -1133,10 +1695,10 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
                 y *= c
                 if not isinstance(V, bool):
                     for jj in xrange(n):
-                        x = V[j  ,jj]
-                        z = V[j+1,jj]
-                        V[j    ,jj]= x * c + z * s
-                        V[j+1  ,jj]= z * c - x * s
+                        x = v[j][jj]
+                        z = v[j+1][jj]
+                        v[j][jj]= x * c + z * s
+                        v[j+1][jj]= z * c - x * s
                 z = ctx.hypot(f, h)
                 S[j] = z
                 if z != 0:            # rotation can be arbitray if z=0
@@ -1148,10 +1710,10 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
 
                 if calc_u:
                     for jj in xrange(m):
-                        y = A[jj,j  ]
-                        z = A[jj,j+1]
-                        A[jj,j    ] = y * c + z * s
-                        A[jj,j+1  ] = z * c - y * s
+                        y = a[jj][j]
+                        z = a[jj][j+1]
+                        a[jj][j] = y * c + z * s
+                        a[jj][j+1] = z * c - y * s
 
             work[l] = 0
             work[k] = f
@@ -1180,15 +1742,15 @@ def svd_r_raw(ctx, A, V = False, calc_u = False):
 
             if calc_u:
                 for j in xrange(m):
-                    z = A[j,i]
-                    A[j,i] = A[j,imax]
-                    A[j,imax] = z
+                    z = a[j][i]
+                    a[j][i] = a[j][imax]
+                    a[j][imax] = z
 
             if not isinstance(V, bool):
                 for j in xrange(n):
-                    z = V[i,j]
-                    V[i,j] = V[imax,j]
-                    V[imax,j] = z
+                    z = v[i][j]
+                    v[i][j] = v[imax][j]
+                    v[imax][j] = z
 
     return S
 
@@ -1242,6 +1804,11 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
     """
 
     m, n = A.rows, A.cols
+    a = A._dense_rows()
+    A._LU = None
+    if not isinstance(V, bool):
+        v = V._dense_rows()
+        V._LU = None
 
     S = ctx.zeros(n, 1)
 
@@ -1259,14 +1826,14 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
         g = s = scale = 0
         if i < m:
             for k in xrange(i, m):
-                scale += ctx.fabs(ctx.re(A[k,i])) + ctx.fabs(ctx.im(A[k,i]))
+                scale += ctx.fabs(ctx.re(a[k][i])) + ctx.fabs(ctx.im(a[k][i]))
             if scale != 0:
                 for k in xrange(i, m):
-                    A[k,i] /= scale
-                    ar = ctx.re(A[k,i])
-                    ai = ctx.im(A[k,i])
+                    a[k][i] /= scale
+                    ar = ctx.re(a[k][i])
+                    ai = ctx.im(a[k][i])
                     s += ar * ar + ai * ai
-                f = A[i,i]
+                f = a[i][i]
                 g = -ctx.sqrt(s)
                 if ctx.re(f) < 0:
                     beta = -g - ctx.conj(f)
@@ -1276,32 +1843,32 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
                 beta /= ctx.conj(beta)
                 beta += 1
                 h = 2 * (ctx.re(f) * g - s)
-                A[i,i] = f - g
+                a[i][i] = f - g
                 beta /= h
                 lbeta[i] = (beta / scale) / scale
                 for j in xrange(i+1, n):
                     s = 0
                     for k in xrange(i, m):
-                        s += ctx.conj(A[k,i]) * A[k,j]
+                        s += ctx.conj(a[k][i]) * a[k][j]
                     f = beta * s
                     for k in xrange(i, m):
-                        A[k,j] += f * A[k,i]
+                        a[k][j] += f * a[k][i]
                 for k in xrange(i, m):
-                    A[k,i] *= scale
+                    a[k][i] *= scale
 
         S[i] = scale * g     # S are the diagonal elements
         g = s = scale = 0
 
         if i < m and i != n - 1:
             for k in xrange(i+1, n):
-                scale += ctx.fabs(ctx.re(A[i,k])) + ctx.fabs(ctx.im(A[i,k]))
+                scale += ctx.fabs(ctx.re(a[i][k])) + ctx.fabs(ctx.im(a[i][k]))
             if scale:
                 for k in xrange(i+1, n):
-                    A[i,k] /= scale
-                    ar = ctx.re(A[i,k])
-                    ai = ctx.im(A[i,k])
+                    a[i][k] /= scale
+                    ar = ctx.re(a[i][k])
+                    ai = ctx.im(a[i][k])
                     s += ar * ar + ai * ai
-                f = A[i,i+1]
+                f = a[i][i+1]
                 g = -ctx.sqrt(s)
                 if ctx.re(f) < 0:
                     beta = -g - ctx.conj(f)
@@ -1313,46 +1880,46 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
                 beta += 1
 
                 h = 2 * (ctx.re(f) * g - s)
-                A[i,i+1] = f - g
+                a[i][i+1] = f - g
 
                 beta /= h
                 rbeta[i] = (beta / scale) / scale
 
                 for k in xrange(i+1, n):
-                    work[k] = A[i, k]
+                    work[k] = a[i][k]
 
                 for j in xrange(i+1, m):
                     s = 0
                     for k in xrange(i+1, n):
-                        s += ctx.conj(A[i,k]) * A[j,k]
+                        s += ctx.conj(a[i][k]) * a[j][k]
                     f = s * beta
                     for k in xrange(i+1,n):
-                        A[j,k] += f * work[k]
+                        a[j][k] += f * work[k]
 
                 for k in xrange(i+1, n):
-                    A[i,k] *= scale
+                    a[i][k] *= scale
 
         anorm = max(anorm,ctx.fabs(S[i]) + ctx.fabs(dwork[i]))
 
     if not isinstance(V, bool):
         for i in xrange(n-2, -1, -1):     # accumulation of right hand transformations
-            V[i+1,i+1] = 1
+            v[i+1][i+1] = ctx.one
 
             if dwork[i+1] != 0:
                 f = ctx.conj(rbeta[i])
                 for j in xrange(i+1, n):
-                    V[i,j] = A[i,j] * f
+                    v[i][j] = a[i][j] * f
                 for j in xrange(i+1, n):
                     s = 0
                     for k in xrange(i+1, n):
-                        s += ctx.conj(A[i,k]) * V[j,k]
+                        s += ctx.conj(a[i][k]) * v[j][k]
                     for k in xrange(i+1, n):
-                        V[j,k] += s * V[i,k]
+                        v[j][k] += s * v[i][k]
 
             for j in xrange(i+1,n):
-                V[j,i] = V[i,j] = 0
+                v[j][i] = v[i][j] = ctx.zero
 
-        V[0,0] = 1
+        v[0][0] = ctx.one
 
     if m < n : minnm = m
     else     : minnm = n
@@ -1361,22 +1928,22 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
         for i in xrange(minnm-1, -1, -1): # accumulation of left hand transformations
             g = S[i]
             for j in xrange(i+1, n):
-                A[i,j] = 0
+                a[i][j] = ctx.zero
             if g != 0:
                 g = 1 / g
                 for j in xrange(i+1, n):
                     s = 0
                     for k in xrange(i+1, m):
-                        s += ctx.conj(A[k,i]) * A[k,j]
+                        s += ctx.conj(a[k][i]) * a[k][j]
                     f = s * ctx.conj(lbeta[i])
                     for k in xrange(i, m):
-                        A[k,j] += f * A[k,i]
+                        a[k][j] += f * a[k][i]
                 for j in xrange(i, m):
-                    A[j,i] *= g
+                    a[j][i] *= g
             else:
                 for j in xrange(i, m):
-                    A[j,i] = 0
-            A[i,i] += 1
+                    a[j][i] = ctx.zero
+            a[i][i] += 1
 
     for k in xrange(n-1, -1, -1):
         # diagonalization of the bidiagonal form:
@@ -1414,10 +1981,10 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
 
                     if calc_u:
                         for j in xrange(m):
-                            y = A[j,nm]
-                            z = A[j,i]
-                            A[j,nm]= y * c + z * s
-                            A[j,i] = z * c - y * s
+                            y = a[j][nm]
+                            z = a[j][i]
+                            a[j][nm]= y * c + z * s
+                            a[j][i] = z * c - y * s
 
             z = S[k]
 
@@ -1426,7 +1993,7 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
                     S[k] = -z
                     if not isinstance(V, bool):
                         for j in xrange(n):
-                            V[k,j] = -V[k,j]
+                            v[k][j] = -v[k][j]
                 break
 
             if its >= maxits:
@@ -1459,10 +2026,10 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
                 y *= c
                 if not isinstance(V, bool):
                     for jj in xrange(n):
-                        x = V[j  ,jj]
-                        z = V[j+1,jj]
-                        V[j    ,jj]= x * c + z * s
-                        V[j+1,jj  ]= z * c - x * s
+                        x = v[j][jj]
+                        z = v[j+1][jj]
+                        v[j][jj]= x * c + z * s
+                        v[j+1][jj]= z * c - x * s
                 z = ctx.hypot(f, h)
                 S[j] = z
                 if z != 0:            # rotation can be arbitray if z=0
@@ -1473,10 +2040,10 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
                 x = c * y - s * g
                 if calc_u:
                     for jj in xrange(m):
-                        y = A[jj,j  ]
-                        z = A[jj,j+1]
-                        A[jj,j    ]= y * c + z * s
-                        A[jj,j+1  ]= z * c - y * s
+                        y = a[jj][j]
+                        z = a[jj][j+1]
+                        a[jj][j]= y * c + z * s
+                        a[jj][j+1]= z * c - y * s
 
             dwork[l] = 0
             dwork[k] = f
@@ -1505,15 +2072,15 @@ def svd_c_raw(ctx, A, V = False, calc_u = False):
 
             if calc_u:
                 for j in xrange(m):
-                    z = A[j,i]
-                    A[j,i] = A[j,imax]
-                    A[j,imax] = z
+                    z = a[j][i]
+                    a[j][i] = a[j][imax]
+                    a[j][imax] = z
 
             if not isinstance(V, bool):
                 for j in xrange(n):
-                    z = V[i,j]
-                    V[i,j] = V[imax,j]
-                    V[imax,j] = z
+                    z = v[i][j]
+                    v[i][j] = v[imax][j]
+                    v[imax][j] = z
 
     return S
 
@@ -1568,6 +2135,13 @@ def svd_r(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False)
         S as matrix : min(m,n)*min(m,n)
         V           : min(m,n)*n             V  V' = 1
 
+    If k is given, S only contains the k largest singular values, U (of shape
+    (m, k)) and V (of shape (k, n)) the corresponding singular vectors, and
+    full_matrices is ignored. They are computed by Golub-Kahan-Lanczos
+    bidiagonalization, which only requires products of A and A' with
+    vectors, and bisection. This is much faster than the full decomposition
+    if A is large and k is small.
+
     examples:
 
        >>> from mpmath import mp
@@ -1727,7 +2301,7 @@ def svd_c(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False)
         return (A, S, V)
 
 @defun
-def svd(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False):
+def svd(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False, k = None):
     """
     "svd" is a unified interface for "svd_r" and "svd_c". Depending on
     whether A is real or complex the appropriate function is called.
@@ -1750,6 +2324,8 @@ def svd(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False):
       compute_uv    : if true, U and V are calculated. if false, only S is calculated.
       overwrite_a   : if true, allows modification of A which may improve
                       performance. if false, A is not modified.
+      k             : if given, only the k largest singular values are calculated
+                      (see below). A may then also be a sparse matrix (spmatrix).
 
     output:
       U : an orthogonal or unitary matrix: U' U = 1. if full_matrices is true, U is of
@@ -1780,6 +2356,13 @@ def svd(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False):
         S as matrix : min(m,n)*min(m,n)
         V           : min(m,n)*n             V  V' = 1
 
+    If k is given, S only contains the k largest singular values, U (of shape
+    (m, k)) and V (of shape (k, n)) the corresponding singular vectors, and
+    full_matrices is ignored. They are computed by Golub-Kahan-Lanczos
+    bidiagonalization, which only requires products of A and A' with
+    vectors, and bisection. This is much faster than the full decomposition
+    if A is large and k is small.
+
     examples:
 
        >>> from mpmath import mp
@@ -1796,12 +2379,416 @@ def svd(ctx, A, full_matrices = False, compute_uv = True, overwrite_a = False):
        [0.0  0.0  0.0]
        [0.0  0.0  0.0]
 
+       >>> A = mp.matrix(80, 40)
+       >>> for i in range(40):
+       ...     A[2*i,i] = i + 1
+       ...     A[2*i+1,i] = 1
+       >>> U, S, V = mp.svd(A, k = 2)
+       >>> mp.nprint(S.T, 10)
+       [40.01249805  39.01281841]
+       >>> print(mp.norm(A * V[0,:].T - S[0] * U[:,0]) < 1e-10)
+       True
+
     see also: svd_r, svd_c
     """
 
+    if k is not None:
+        return svd_krylov(ctx, A, k, compute_uv)
+
     iscomplex = any(type(x) is ctx.mpc for x in A)
 
     if iscomplex:
         return ctx.svd_c(A, full_matrices = full_matrices, compute_uv = compute_uv, overwrite_a = overwrite_a)
     else:
         return ctx.svd_r(A, full_matrices = full_matrices, compute_uv = compute_uv, overwrite_a = overwrite_a)
+
+##################################################################################################
+#
+# Krylov subspace methods for a few eigenvalues or singular values
+#
+##################################################################################################
+
+def tridiag_bisect(ctx, d, e, k0, k1):
+    """
+    This routine computes the eigenvalues k0, k0+1, ..., k1-1 (counted from
+    the smallest one) of a real symmetric tridiagonal matrix T by bisection.
+    The number of eigenvalues of T below x is the number of negative elements
+    of the Sturm sequence q_0 = d[0] - x, q_j = d[j] - x - e[j-1]^2 / q_(j-1),
+    which is evaluated in fixed point arithmetic.
+
+    parameters:
+      d         (input) real array of length n, the diagonal of T
+      e         (input) real array of length n-1 (or n), the offdiagonal of T
+
+    return value: the list of the eigenvalues in ascending order
+    """
+
+    n = len(d)
+
+    # gershgorin bounds
+    lo = hi = d[0]
+    for j in xrange(n):
+        r = 0
+        if j > 0:
+            r += abs(e[j - 1])
+        if j < n - 1:
+            r += abs(e[j])
+        lo = min(lo, d[j] - r)
+        hi = max(hi, d[j] + r)
+
+    scale = max(abs(lo), abs(hi))
+    if not scale:
+        return [ctx.zero] * (k1 - k0)
+
+    # all numbers are integers scaled by 2**(wp - mag)
+    wp = ctx.prec + 8
+    mag = ctx.mag(scale)
+    D = [int(ctx.ldexp(x, wp - mag)) for x in d]
+    E2 = [int(ctx.ldexp(e[j], wp - mag)) ** 2 >> wp for j in xrange(n - 1)]
+
+    def count(x):
+        c = 0
+        q = D[0] - x
+        for j in xrange(n):
+            if j:
+                q = D[j] - x - (E2[j - 1] << wp) // q
+            if not q:
+                q = -1
+            if q < 0:
+                c += 1
+        return c
+
+    # all points where the sturm count is known, used to bracket later eigenvalues
+    points = [(-(2 << wp), 0), (2 << wp, n)]
+
+    E = []
+    for k in xrange(k0, k1):
+        a = max(x for x, c in points if c <= k)
+        b = min(x for x, c in points if c > k)
+        while b - a > 256:
+            x = (a + b) >> 1
+            c = count(x)
+            points.append((x, c))
+            if c <= k:
+                a = x
+            else:
+                b = x
+        E.append(ctx.ldexp(a + b, mag - wp - 1))
+
+    return E
+
+def tridiag_inverse_iteration(ctx, d, e, w):
+    """
+    This routine computes the eigenvectors of a real symmetric tridiagonal
+    matrix T for given eigenvalues by inverse iteration: for each eigenvalue x,
+    a random vector is multiplied three times by (T - x)^(-1), using an
+    LU decomposition of T - x with partial pivoting. The vectors for
+    eigenvalues closer than |T|/1000 are orthogonalized against each other
+    (this follows the lapack routine dstein.f).
+
+    parameters:
+      d         (input) real array of length n, the diagonal of T
+      e         (input) real array of length n-1 (or n), the offdiagonal of T
+      w         (input) a list of eigenvalues of T in ascending order
+
+    return value: a list of the normalized eigenvectors (lists of length n)
+    """
+
+    n = len(d)
+
+    norm = 0
+    for j in xrange(n):
+        r = abs(d[j])
+        if j > 0:
+            r += abs(e[j - 1])
+        if j < n - 1:
+            r += abs(e[j])
+        norm = max(norm, r)
+    if not norm:
+        norm = ctx.one
+    tiny = ctx.eps * norm
+    gap = norm / 1000
+
+    X = []
+    for i, x in enumerate(w):
+        # LU decomposition of T - x: U has diagonal u0 and two superdiagonals u1, u2.
+        # row j+1 is eliminated with the multiplier f[j], after a row interchange if s[j].
+        u0 = [0] * n
+        u1 = [0] * n
+        u2 = [0] * n
+        f = [0] * n
+        s = [False] * n
+        p0 = d[0] - x
+        p1 = e[0] if n > 1 else 0
+        p2 = 0
+        for j in xrange(n - 1):
+            a = e[j]
+            b = d[j + 1] - x
+            c = e[j + 1] if j < n - 2 else 0
+            if abs(p0) >= abs(a):
+                if not p0:
+                    p0 = tiny
+                t = a / p0
+                u0[j], u1[j], u2[j] = p0, p1, p2
+                p0, p1, p2 = b - t * p1, c - t * p2, 0
+            else:
+                t = p0 / a
+                u0[j], u1[j], u2[j] = a, b, c
+                p0, p1, p2 = p1 - t * b, p2 - t * c, 0
+                s[j] = True
+            f[j] = t
+        if not p0:
+            p0 = tiny
+        u0[n - 1] = p0
+
+        y = krylov_random(ctx, n)
+        for it in xrange(3):
+            for j in xrange(n - 1):
+                if s[j]:
+                    y[j], y[j + 1] = y[j + 1], y[j]
+                y[j + 1] -= f[j] * y[j]
+            for j in xrange(n - 1, -1, -1):
+                r = y[j]
+                if j + 1 < n:
+                    r -= u1[j] * y[j + 1]
+                if j + 2 < n:
+                    r -= u2[j] * y[j + 2]
+                y[j] = r / u0[j]
+
+            l = i - 1
+            while l >= 0 and x - w[l] <= gap:
+                c = ctx.fdot(y, X[l])
+                y = [a - c * b for a, b in zip(y, X[l])]
+                l -= 1
+
+            r = ctx.norm(y)
+            y = [a / r for a in y]
+
+        X.append(y)
+
+    return X
+
+def lanczos(ctx, op, n, k, which, tol, vectors = True):
+    """
+    This routine computes k eigenvalues of a hermitian linear operator A by
+    the Lanczos method with full reorthogonalization. Starting from a random
+    unit vector v_1, orthonormal vectors v_j are computed such that
+
+       A V = V T + beta_m v_(m+1) e_m'
+
+    where T is a real symmetric tridiagonal matrix of dimension m. The
+    eigenvalues of T which approximate the wanted ones are computed by
+    bisection (tridiag_bisect) and the corresponding eigenvectors y by
+    inverse iteration. m is increased until the residuals beta_m |y[m-1]|
+    are at most tol times the eigenvalues (or until m = n).
+
+    parameters:
+      op        (input) a function mapping a vector x (a list of length n)
+                to the list A x
+      which     (input) "LA" for the largest, "SA" for the smallest and "LM"
+                for the eigenvalues of largest magnitude
+      tol       (input) the relative tolerance for the residuals
+
+    return value: (E, X) where E is the list of the k eigenvalues in ascending
+                  order and, if vectors is true, X is a matrix whose columns
+                  are the corresponding eigenvectors.
+    """
+
+    v = krylov_random(ctx, n)
+    r = ctx.norm(v)
+    V = [[x / r for x in v]]
+    d = []
+    e = []
+    scale = 0
+
+    while 1:
+        j = len(d)
+        w = op(V[j])
+        scale = max(scale, ctx.norm(w))
+        h, r = krylov_extend(ctx, V, w, scale)
+        d.append(ctx.re(h[j]))
+        m = j + 1
+
+        if m == n or (m >= k and (m - k) % 5 == 0 and r):
+            if which == "SA":
+                E = tridiag_bisect(ctx, d, e, 0, k)
+            elif which == "LA":
+                E = tridiag_bisect(ctx, d, e, m - k, m)
+            else:
+                E = tridiag_bisect(ctx, d, e, 0, k) + tridiag_bisect(ctx, d, e, max(k, m - k), m)
+                E = sorted(sorted(E, key = abs)[-k:])
+            Y = tridiag_inverse_iteration(ctx, d, e, E)
+            floor = ctx.cbrt(tol ** 2) * max(abs(x) for x in E)
+            if m == n or all(abs(r * y[m - 1]) <= tol * max(abs(x), floor) for x, y in zip(E, Y)):
+                break
+
+        e.append(r)
+
+    if not vectors:
+        return E, None
+
+    rows = list(zip(*V[:m]))
+    X = ctx.matrix(n, k)
+    for i in xrange(k):
+        for j in xrange(n):
+            X[j,i] = ctx.fdot(rows[j], Y[i])
+    return E, X
+
+def golub_kahan_lanczos(ctx, op, oph, rows, cols, k, tol, vectors = True):
+    """
+    This routine computes the k largest singular values of a linear operator
+    A of shape (rows, cols) with rows >= cols by Golub-Kahan-Lanczos
+    bidiagonalization with full reorthogonalization. Starting from a random
+    unit vector v_1, orthonormal vectors u_j and v_j are computed such that
+
+       A V = U B        and        A' U = V B' + beta_m v_(m+1) e_m'
+
+    where B is a real upper bidiagonal matrix of dimension m with diagonal
+    alpha and superdiagonal beta. The singular values of B are the positive
+    eigenvalues of the symmetric tridiagonal matrix of dimension 2m with zero
+    diagonal and offdiagonal (alpha_1, beta_1, alpha_2, ..., alpha_m), whose
+    eigenvectors are (v_1, u_1, v_2, u_2, ...) for the singular vectors u, v
+    of B. They are computed by bisection and inverse iteration. m is increased
+    until the residuals beta_m |u[m-1]| are at most tol times the singular
+    values (or until m = cols).
+
+    parameters:
+      op        (input) a function mapping a vector x (a list) to the list A x
+      oph       (input) a function mapping a vector x (a list) to the list A' x
+      tol       (input) the relative tolerance for the residuals
+
+    return value: (S, U, V) where S is the list of the k largest singular
+                  values in decreasing order and, if vectors is true, U and V
+                  are matrices whose columns are the corresponding left and
+                  right singular vectors: A V[:,i] = S[i] U[:,i].
+    """
+
+    v = krylov_random(ctx, cols)
+    r = ctx.norm(v)
+    V = [[x / r for x in v]]
+    U = []
+    alpha = []
+    beta = []
+    scale = 0
+
+    while 1:
+        j = len(alpha)
+        w = op(V[j])
+        scale = max(scale, ctx.norm(w))
+        h, a = krylov_extend(ctx, U, w, scale)
+        alpha.append(a)
+        w = oph(U[j])
+        scale = max(scale, ctx.norm(w))
+        h, r = krylov_extend(ctx, V, w, scale)
+        m = j + 1
+
+        if m == cols or (m >= k and (m - k) % 5 == 0 and r):
+            d = [0] * (2 * m)
+            e = []
+            for i in xrange(m):
+                e.append(alpha[i])
+                if i < m - 1:
+                    e.append(beta[i])
+            S = tridiag_bisect(ctx, d, e, 2 * m - k, 2 * m)
+            Z = tridiag_inverse_iteration(ctx, d, e, S)
+            YV = []
+            YU = []
+            for z in Z:
+                yv = z[0::2]
+                yu = z[1::2]
+                c = ctx.norm(yv)
+                YV.append([x / c for x in yv])
+                c = ctx.norm(yu)
+                YU.append([x / c for x in yu])
+            floor = ctx.cbrt(tol ** 2) * S[-1]
+            if m == cols or all(abs(r * y[m - 1]) <= tol * max(x, floor) for x, y in zip(S, YU)):
+                break
+
+        beta.append(r)
+
+    S = S[::-1]
+
+    if not vectors:
+        return S, None, None
+
+    YU = YU[::-1]
+    YV = YV[::-1]
+    Um = ctx.matrix(rows, k)
+    Vm = ctx.matrix(cols, k)
+    for M, W, Y in ((Um, U, YU), (Vm, V, YV)):
+        W = list(zip(*W[:m]))
+        for i in xrange(k):
+            for j in xrange(M.rows):
+                M[j,i] = ctx.fdot(W[j], Y[i])
+    return S, Um, Vm
+
+def eigh_krylov(ctx, A, k, which, eigvals_only):
+    """
+    Implements eigh for the k eigenvalues selected by which.
+    """
+
+    n = A.rows
+    if A.cols != n:
+        raise ValueError("eigh: need n*n matrix")
+    if not 1 <= k <= n:
+        raise ValueError("eigh: k must be between 1 and %d" % n)
+    if not which in ("LM", "SM", "LA", "SA"):
+        raise ValueError("eigh: unknown value %s for which" % which)
+
+    prec = ctx.prec
+    tol = ctx.eps
+    try:
+        ctx.prec += 20
+        if which == "SM":
+            op = krylov_operator(ctx, A, invert = True)
+            E, X = lanczos(ctx, op, n, k, "LM", tol, not eigvals_only)
+            E = [1 / x for x in E]
+        else:
+            op = krylov_operator(ctx, A)
+            E, X = lanczos(ctx, op, n, k, which, tol, not eigvals_only)
+    finally:
+        ctx.prec = prec
+
+    order = sorted(xrange(k), key = lambda i: E[i])
+    E = ctx.matrix([+E[i] for i in order])
+
+    if eigvals_only:
+        return E
+
+    Q = ctx.matrix(n, k)
+    for i in xrange(k):
+        for j in xrange(n):
+            Q[j,i] = +X[j,order[i]]
+    return E, Q
+
+def svd_krylov(ctx, A, k, compute_uv):
+    """
+    Implements svd for the k largest singular values.
+    """
+
+    rows = A.rows
+    cols = A.cols
+    if not 1 <= k <= min(rows, cols):
+        raise ValueError("svd: k must be between 1 and %d" % min(rows, cols))
+
+    prec = ctx.prec
+    tol = ctx.eps
+    try:
+        ctx.prec += 20
+        op = krylov_operator(ctx, A)
+        oph = krylov_operator(ctx, A, adjoint = True)
+        if rows >= cols:
+            S, U, V = golub_kahan_lanczos(ctx, op, oph, rows, cols, k, tol, compute_uv)
+        else:
+            S, V, U = golub_kahan_lanczos(ctx, oph, op, cols, rows, k, tol, compute_uv)
+    finally:
+        ctx.prec = prec
+
+    S = ctx.matrix([+x for x in S])
+
+    if not compute_uv:
+        return S
+
+    U = U.apply(lambda x: +x)
+    V = V.transpose_conj().apply(lambda x: +x)
+    return U, S, V
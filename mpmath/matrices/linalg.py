@@ -107,9 +107,222 @@
 from copy import copy
 
 from ..libmp.backend import xrange
+from ..libmp import (fzero, fone, mpf_abs, mpf_neg, mpf_sub, mpf_mul,
+    mpf_div, mpf_sqrt, mpf_sum, mpf_dot, mpf_lt, mpf_le, mpf_gt)
+
+def _substitute(ctx, t, x, lower, unit=False):
+    """
+    Overwrite the rows x (with one entry per right-hand side) by the
+    solution y of T*y = x, where t are the rows of a lower or upper
+    triangular matrix T. With unit=True, the diagonal of T is taken to
+    be one. Each entry is computed from one dot product.
+    """
+    n = len(t)
+    if lower:
+        order = xrange(n)
+    else:
+        order = xrange(n - 1, -1, -1)
+    fdot = ctx.fdot
+    one = ctx.one
+    for i in order:
+        ti = t[i]
+        if lower:
+            js = xrange(i)
+        else:
+            js = xrange(i + 1, n)
+        coeffs = [one] + [-ti[j] for j in js]
+        xi = x[i]
+        for c in xrange(len(xi)):
+            s = fdot(coeffs, [xi[c]] + [x[j][c] for j in js])
+            if not unit:
+                s /= ti[i]
+            xi[c] = s
+
+class _Factorization(object):
+    """
+    Base class of the factorizations returned by lu_factor, cho_factor
+    and qr_factor. A factorization only refers to its context through
+    its matrices, so it can be pickled (in the mp context) and shared.
+    """
+
+    def __init__(self, M, prec):
+        self._M = M
+        self.prec = prec
+
+    ctx = property(lambda self: self._M.ctx)
+    rows = property(lambda self: self._M.rows)
+    cols = property(lambda self: self._M.cols)
+
+    def __repr__(self):
+        return '<%s of a %ix%i matrix>' % (self._name, self.rows, self.cols)
+
+    def solve(self, b):
+        """
+        Solve the linear system for the right-hand side b, which may be
+        a vector or a matrix whose columns are right-hand sides. Returns
+        a matrix with one column per right-hand side.
+        """
+        ctx = self.ctx
+        prec = ctx.prec
+        try:
+            ctx.prec = self.prec
+            B = ctx.matrix(b)
+            if B.rows != self.rows:
+                raise ValueError('dimensions not compatible')
+            x = [row[:] for row in B._dense_rows()]
+            X = ctx.matrix._from_rows(self._solve(ctx, x), B.cols)
+        finally:
+            ctx.prec = prec
+        return X
+
+class LUFactorization(_Factorization):
+    """
+    LU decomposition of a square matrix, as returned by lu_factor.
+    LU contains L (below the diagonal) and U, and p the row
+    interchanges, as in LU_decomp.
+    """
+    _name = 'LU factorization'
+
+    def __init__(self, LU, p, prec):
+        _Factorization.__init__(self, LU, prec)
+        self.LU = LU
+        self.p = p
+
+    def _solve(self, ctx, x):
+        for k, pk in enumerate(self.p):
+            x[k], x[pk] = x[pk], x[k]
+        t = self.LU._dense_rows()
+        _substitute(ctx, t, x, True, unit=True)
+        _substitute(ctx, t, x, False)
+        return x
+
+    def det(self):
+        """
+        Return the determinant of the factorized matrix.
+        """
+        ctx = self.ctx
+        prec = ctx.prec
+        try:
+            ctx.prec = self.prec
+            z = ctx.fprod(self.LU[i,i] for i in xrange(self.rows))
+            for i, e in enumerate(self.p):
+                if i != e:
+                    z = -z
+        finally:
+            ctx.prec = prec
+        return +z
+
+class CholeskyFactorization(_Factorization):
+    """
+    Cholesky decomposition A = L*L.H of a hermitian positive-definite
+    matrix, as returned by cho_factor.
+    """
+    _name = 'Cholesky factorization'
+
+    def __init__(self, L, prec):
+        _Factorization.__init__(self, L, prec)
+        self.L = L
+
+    def _solve(self, ctx, x):
+        _substitute(ctx, self.L._dense_rows(), x, True)
+        _substitute(ctx, self.L.H._dense_rows(), x, False)
+        return x
+
+class QRFactorization(_Factorization):
+    """
+    QR decomposition of a m*n matrix with m >= n, as returned by
+    qr_factor. QR and tau hold the Householder reflectors and R in
+    the format of qr(A, mode='raw'). solve() returns the least-squares
+    solution for overdetermined systems.
+    """
+    _name = 'QR factorization'
+
+    def __init__(self, QR, tau, prec):
+        _Factorization.__init__(self, QR, prec)
+        self.QR = QR
+        self.tau = tau
+
+    def _solve(self, ctx, x):
+        m, n = self.rows, self.cols
+        a = self.QR._dense_rows()
+        conj = ctx.conj
+        fdot = ctx.fdot
+        # x = Q.H * x, applying the reflectors I - conj(tau) v v.H
+        for j in xrange(n):
+            t = conj(self.tau[j])
+            if not t:
+                continue
+            v = [ctx.one] + [a[i][j] for i in xrange(j + 1, m)]
+            vc = [conj(e) for e in v]
+            for c in xrange(len(x[0])):
+                w = t * fdot(vc, [x[i][c] for i in xrange(j, m)])
+                for i in xrange(j, m):
+                    x[i][c] -= v[i-j] * w
+        # R is the upper triangle of the first n rows
+        del x[n:]
+        _substitute(ctx, [row[:n] for row in a[:n]], x, False)
+        return x
 
 class LinearAlgebraMethods(object):
 
+    def _real_mp_rows(ctx, a):
+        """
+        Check whether the rows a only contain mpf values of an mp context,
+        so that raw mpf tuples can be used instead.
+        """
+        if not hasattr(ctx, '_prec_rounding'):
+            return False
+        mpf = ctx.mpf
+        for row in a:
+            for x in row:
+                if type(x) is not mpf:
+                    return False
+        return True
+
+    def _LU_decomp_raw(ctx, a, tol):
+        """
+        LU_decomp for the rows a of a real matrix, working on raw mpf
+        tuples. The rows are overwritten with L and U in place, and the
+        pivot indices are returned. The arithmetic, including the rounding
+        of each operation, is the same as in the generic code.
+        """
+        prec, rnd = ctx._prec_rounding
+        n = len(a)
+        r = [[x._mpf_ for x in row] for row in a]
+        p = [None]*(n - 1)
+        for j in xrange(n - 1):
+            # pivoting, choose max(abs(reciprocal row sum)*abs(pivot element))
+            biggest = fzero
+            for k in xrange(j, n):
+                rk = r[k]
+                s = mpf_sum(rk[j:], prec, rnd, absolute=True)
+                if mpf_le(s, tol):
+                    raise ZeroDivisionError('matrix is numerically singular')
+                current = mpf_mul(mpf_div(fone, s, prec, rnd),
+                    mpf_abs(rk[j]), prec, rnd)
+                if mpf_gt(current, biggest):
+                    biggest = current
+                    p[j] = k
+            if p[j] is None:
+                raise ZeroDivisionError('matrix is numerically singular')
+            # swap rows according to p
+            r[j], r[p[j]] = r[p[j]], r[j]
+            rj = r[j]
+            pivot = rj[j]
+            if mpf_le(mpf_abs(pivot), tol):
+                raise ZeroDivisionError('matrix is numerically singular')
+            # calculate elimination factors and update the trailing rows
+            for i in xrange(j + 1, n):
+                ri = r[i]
+                f = ri[j] = mpf_div(ri[j], pivot, prec, rnd)
+                for k in xrange(j + 1, n):
+                    ri[k] = mpf_sub(ri[k], mpf_mul(f, rj[k], prec, rnd),
+                        prec, rnd)
+        make_mpf = ctx.make_mpf
+        for i in xrange(n):
+            a[i][:] = [make_mpf(x) for x in r[i]]
+        return p
+
     def LU_decomp(ctx, A, overwrite=False, use_cache=True):
         """
         LU-factorization of a n*n matrix using the Gauss algorithm.
@@ -127,28 +340,35 @@ def LU_decomp(ctx, A, overwrite=False, use_cache=True):
             A = A.copy()
         tol = ctx.absmin(ctx.mnorm(A,1) * ctx.eps) # each pivot element has to be bigger
         n = A.rows
-        p = [None]*(n - 1)
-        for j in xrange(n - 1):
-            # pivoting, choose max(abs(reciprocal row sum)*abs(pivot element))
-            biggest = 0
-            for k in xrange(j, n):
-                s = ctx.fsum([ctx.absmin(A[k,l]) for l in xrange(j, n)])
-                if ctx.absmin(s) <= tol:
+        a = A._dense_rows()
+        A._LU = None
+        if ctx._real_mp_rows(a):
+            p = ctx._LU_decomp_raw(a, tol._mpf_)
+        else:
+            p = [None]*(n - 1)
+            for j in xrange(n - 1):
+                # pivoting, choose max(abs(reciprocal row sum)*abs(pivot element))
+                biggest = 0
+                for k in xrange(j, n):
+                    s = ctx.fsum([ctx.absmin(a[k][l]) for l in xrange(j, n)])
+                    if ctx.absmin(s) <= tol:
+                        raise ZeroDivisionError('matrix is numerically singular')
+                    current = 1/s * ctx.absmin(a[k][j])
+                    if current > biggest: # TODO: what if equal?
+                        biggest = current
+                        p[j] = k
+                # swap rows according to p
+                ctx.swap_row(A, j, p[j])
+                aj = a[j]
+                if ctx.absmin(aj[j]) <= tol:
                     raise ZeroDivisionError('matrix is numerically singular')
-                current = 1/s * ctx.absmin(A[k,j])
-                if current > biggest: # TODO: what if equal?
-                    biggest = current
-                    p[j] = k
-            # swap rows according to p
-            ctx.swap_row(A, j, p[j])
-            if ctx.absmin(A[j,j]) <= tol:
-                raise ZeroDivisionError('matrix is numerically singular')
-            # calculate elimination factors and add rows
-            for i in xrange(j + 1, n):
-                A[i,j] /= A[j,j]
-                for k in xrange(j + 1, n):
-                    A[i,k] -= A[i,j]*A[j,k]
-        if ctx.absmin(A[n - 1,n - 1]) <= tol:
+                # calculate elimination factors and add rows
+                for i in xrange(j + 1, n):
+                    ai = a[i]
+                    ai[j] /= aj[j]
+                    for k in xrange(j + 1, n):
+                        ai[k] -= ai[j]*aj[k]
+        if ctx.absmin(a[n - 1][n - 1]) <= tol:
             raise ZeroDivisionError('matrix is numerically singular')
         # cache decomposition
         if not overwrite and isinstance(orig, ctx.matrix):
@@ -169,9 +389,14 @@ def L_solve(ctx, L, b, p=None):
             for k in xrange(0, len(p)):
                 ctx.swap_row(b, k, p[k])
         # solve
+        l = L._dense_rows()
+        y = [b[i] for i in xrange(n)]
         for i in xrange(1, n):
+            li = l[i]
             for j in xrange(i):
-                b[i] -= L[i,j] * b[j]
+                y[i] -= li[j] * y[j]
+        for i in xrange(n):
+            b[i] = y[i]
         return b
 
     def U_solve(ctx, U, y):
@@ -184,10 +409,15 @@ def U_solve(ctx, U, y):
         if len(y) != n:
             raise ValueError("Value should be equal to n")
         x = copy(y)
+        u = U._dense_rows()
+        z = [x[i] for i in xrange(n)]
         for i in xrange(n - 1, -1, -1):
+            ui = u[i]
             for j in xrange(i + 1, n):
-                x[i] -= U[i,j] * x[j]
-            x[i] /= U[i,i]
+                z[i] -= ui[j] * z[j]
+            z[i] /= ui[i]
+        for i in xrange(n):
+            x[i] = z[i]
         return x
 
     def lu_solve(ctx, A, b, **kwargs):
@@ -202,7 +432,32 @@ def lu_solve(ctx, A, b, **kwargs):
 
         If you specify real=True, it does not check for overdeterminded complex
         systems.
+
+        With refine='mixed', a square system is solved by mixed-precision
+        iterative refinement: A is factorized in double precision, and the
+        solution is corrected using residuals computed at the working
+        precision. If the corrections stop shrinking quickly enough (for
+        ill-conditioned matrices), A is factorized again with more
+        precision. Since the refinement steps only need O(n^2)
+        operations, this is much faster than the direct solve at high
+        precision::
+
+            >>> from mpmath import *
+            >>> mp.dps = 50; mp.pretty = False
+            >>> A = matrix([[4, 1, 2], [1, 5, 3], [2, 3, 6]])
+            >>> x = lu_solve(A, [1, 2, 3], refine='mixed')
+            >>> print(x)
+            [                                                 0.0]
+            [0.14285714285714285714285714285714285714285714285714]
+            [0.42857142857142857142857142857142857142857142857143]
+            >>> mnorm(residual(A, x, [1, 2, 3]), 1) < eps
+            True
+            >>> mp.dps = 15
+
         """
+        refine = kwargs.pop('refine', None)
+        if refine not in (None, 'mixed'):
+            raise ValueError("refine must be None or 'mixed'")
         prec = ctx.prec
         try:
             ctx.prec += 10
@@ -222,6 +477,8 @@ def lu_solve(ctx, A, b, **kwargs):
                     x = ctx.cholesky_solve(A, b)
                 else:
                     x = ctx.lu_solve(A, b)
+            elif refine == 'mixed' and hasattr(ctx, '_prec_rounding'):
+                x = ctx._lu_solve_mixed(A, b)
             else:
                 # LU factorization
                 A, p = ctx.LU_decomp(A)
@@ -231,6 +488,80 @@ def lu_solve(ctx, A, b, **kwargs):
             ctx.prec = prec
         return x
 
+    def _lu_solve_mixed(ctx, A, b):
+        """
+        Solve the square system A*x = b (where b may have several
+        columns) at the working precision by iterative refinement, using
+        LU factorizations of A at lower precision: first in the fp
+        context, then in the mp context with a doubled precision each
+        time the refinement stalls. If all of them fail, the system is
+        solved directly.
+        """
+        prec = ctx.prec
+        n = A.rows
+        k = b.cols
+        nega = [[-e for e in row] for row in A._dense_rows()]
+        brows = b._dense_rows()
+        one = ctx.one
+        fdot = ctx.fdot
+        def residual(x):
+            # b - A*x, with each entry rounded once
+            cols = list(zip(*x))
+            return [[fdot([one] + nega[i], (brows[i][c],) + cols[c])
+                for c in xrange(k)] for i in xrange(n)]
+        def norm(x):
+            return max(abs(e) for row in x for e in row)
+        levels = ['fp']
+        wp = 2*53
+        while wp < prec:
+            levels.append(wp)
+            wp *= 2
+        x = [[ctx.zero]*k for i in xrange(n)]
+        xnorm = ctx.zero
+        tol = ctx.eps
+        for level in levels:
+            try:
+                if level == 'fp':
+                    fp = ctx._fp
+                    FA = fp.matrix(A)
+                    if any(fp.isinf(e) or fp.isnan(e) for e in FA):
+                        continue
+                    F = fp.lu_factor(FA)
+                else:
+                    ctx.prec = level
+                    try:
+                        F = ctx.lu_factor(A)
+                    finally:
+                        ctx.prec = prec
+            except ZeroDivisionError:
+                continue
+            last = None
+            for step in xrange(prec):
+                r = residual(x)
+                rnorm = norm(r)
+                if not rnorm:
+                    return ctx.matrix._from_rows(x, k)
+                # scale the residual to avoid underflow in low precision
+                e = ctx.mag(rnorm)
+                s = ctx.ldexp(one, -e)
+                d = F.solve([[v * s for v in row] for row in r])
+                s = ctx.ldexp(one, e)
+                d = [[ctx.convert(d[i,c]) * s for c in xrange(k)]
+                    for i in xrange(n)]
+                dnorm = norm(d)
+                if not ctx.isfinite(dnorm):
+                    break
+                if last is not None and dnorm > last / 16:
+                    # too slow (or no) convergence
+                    break
+                x = [[u + v for (u, v) in zip(xi, di)]
+                    for (xi, di) in zip(x, d)]
+                xnorm = norm(x)
+                if dnorm <= tol * xnorm:
+                    return ctx.matrix._from_rows(x, k)
+                last = dnorm
+        return ctx.lu_factor(A).solve(b)
+
     def improve_solution(ctx, A, x, b, maxsteps=1):
         """
         Improve a solution to a linear equation system iteratively.
@@ -337,26 +668,28 @@ def householder(ctx, A):
         if m < n - 1:
             raise RuntimeError("Columns should not be less than rows")
         # calculate Householder matrix
+        a = A._dense_rows()
+        A._LU = None
         p = []
         for j in xrange(0, n - 1):
-            s = ctx.fsum(abs(A[i,j])**2 for i in xrange(j, m))
+            s = ctx.fsum(abs(a[i][j])**2 for i in xrange(j, m))
             if not abs(s) > ctx.eps:
                 raise ValueError('matrix is numerically singular')
-            p.append(-ctx.sign(ctx.re(A[j,j])) * ctx.sqrt(s))
-            kappa = ctx.one / (s - p[j] * A[j,j])
-            A[j,j] -= p[j]
+            p.append(-ctx.sign(ctx.re(a[j][j])) * ctx.sqrt(s))
+            kappa = ctx.one / (s - p[j] * a[j][j])
+            a[j][j] -= p[j]
             for k in xrange(j+1, n):
-                y = ctx.fsum(ctx.conj(A[i,j]) * A[i,k] for i in xrange(j, m)) * kappa
+                y = ctx.fsum(ctx.conj(a[i][j]) * a[i][k] for i in xrange(j, m)) * kappa
                 for i in xrange(j, m):
-                    A[i,k] -= A[i,j] * y
+                    a[i][k] -= a[i][j] * y
         # solve Rx = c1
-        x = [A[i,n - 1] for i in xrange(n - 1)]
+        x = [a[i][n - 1] for i in xrange(n - 1)]
         for i in xrange(n - 2, -1, -1):
-            x[i] -= ctx.fsum(A[i,j] * x[j] for j in xrange(i + 1, n - 1))
+            x[i] -= ctx.fsum(a[i][j] * x[j] for j in xrange(i + 1, n - 1))
             x[i] /= p[i]
         # calculate residual
         if not m == n - 1:
-            r = [A[m-1-i, n-1] for i in xrange(m - n + 1)]
+            r = [a[m-1-i][n-1] for i in xrange(m - n + 1)]
         else:
             # determined system, residual should be 0
             r = [0]*m # maybe a bad idea, changing r[i] will change all elements
@@ -384,7 +717,15 @@ def residual(ctx, A, x, b, **kwargs):
         try:
             ctx.prec *= 2
             A, x, b = ctx.matrix(A, **kwargs), ctx.matrix(x, **kwargs), ctx.matrix(b, **kwargs)
-            return A*x - b
+            if A.cols != x.rows or (A.rows, x.cols) != (b.rows, b.cols):
+                raise ValueError('dimensions not compatible')
+            # Each entry of A*x - b is rounded once
+            r = ctx.matrix(A.rows, x.cols)
+            for i in xrange(A.rows):
+                for j in xrange(x.cols):
+                    r[i,j] = ctx.fdot([(A[i,k], x[k,j]) for k in xrange(A.cols)]
+                        + [(b[i,j], -1)])
+            return r
         finally:
             ctx.prec = oldprec
 
@@ -416,6 +757,31 @@ def qr_solve(ctx, A, b, norm=None, **kwargs):
         finally:
             ctx.prec = prec
 
+    def _cholesky_raw(ctx, a, l, tol):
+        """
+        Cholesky decomposition of the rows a of a real matrix into the
+        rows l, working on raw mpf tuples. Each entry of L is computed
+        from a single fused dot product, rounded only once.
+        """
+        prec, rnd = ctx._prec_rounding
+        n = len(a)
+        r = [[fzero]*n for i in xrange(n)]
+        for j in xrange(n):
+            rj = r[j]
+            # -L[j,:j], with A[i,j] multiplied by one in front
+            neg = [fone] + [mpf_neg(x) for x in rj[:j]]
+            s = mpf_dot([a[j][j]._mpf_] + rj[:j], neg, prec, rnd)
+            if mpf_lt(s, tol):
+                raise ValueError('matrix is not positive-definite')
+            d = rj[j] = mpf_sqrt(s, prec, rnd)
+            for i in xrange(j + 1, n):
+                ri = r[i]
+                t = mpf_dot([a[i][j]._mpf_] + ri[:j], neg, prec, rnd)
+                ri[j] = mpf_div(t, d, prec, rnd)
+        make_mpf = ctx.make_mpf
+        for i in xrange(n):
+            l[i][:] = [make_mpf(x) for x in r[i]]
+
     def cholesky(ctx, A, tol=None):
         r"""
         Cholesky decomposition of a symmetric positive-definite matrix `A`.
@@ -486,20 +852,25 @@ def cholesky(ctx, A, tol=None):
             tol = +ctx.eps
         n = A.rows
         L = ctx.matrix(n)
+        a = A._dense_rows()
+        l = L._dense_rows()
+        if ctx._real_mp_rows(a):
+            ctx._cholesky_raw(a, l, ctx.convert(tol)._mpf_)
+            return L
         for j in xrange(n):
-            c = ctx.re(A[j,j])
-            if abs(c-A[j,j]) > tol:
+            c = ctx.re(a[j][j])
+            if abs(c-a[j][j]) > tol:
                 raise ValueError('matrix is not Hermitian')
-            s = c - ctx.fsum((L[j,k] for k in xrange(j)),
+            s = c - ctx.fsum((l[j][k] for k in xrange(j)),
                 absolute=True, squared=True)
             if s < tol:
                 raise ValueError('matrix is not positive-definite')
-            L[j,j] = ctx.sqrt(s)
+            l[j][j] = ctx.sqrt(s)
             for i in xrange(j, n):
-                it1 = (L[i,k] for k in xrange(j))
-                it2 = (L[j,k] for k in xrange(j))
+                it1 = (l[i][k] for k in xrange(j))
+                it2 = (l[j][k] for k in xrange(j))
                 t = ctx.fdot(it1, it2, conjugate=True)
-                L[i,j] = (A[i,j] - t) / L[j,j]
+                l[i][j] = (a[i][j] - t) / l[j][j]
         return L
 
     def cholesky_solve(ctx, A, b, **kwargs):
@@ -527,9 +898,10 @@ def cholesky_solve(ctx, A, b, **kwargs):
             n = L.rows
             if len(b) != n:
                 raise ValueError("Value should be equal to n")
+            l = L._dense_rows()
             for i in xrange(n):
-                b[i] -= ctx.fsum(L[i,j] * b[j] for j in xrange(i))
-                b[i] /= L[i,i]
+                b[i] -= ctx.fsum(l[i][j] * b[j] for j in xrange(i))
+                b[i] /= l[i][i]
             x = ctx.U_solve(L.T, b)
             return x
         finally:
@@ -578,12 +950,112 @@ def cond(ctx, A, norm=None):
 
     def lu_solve_mat(ctx, a, b):
         """Solve a * x = b  where a and b are matrices."""
-        r = ctx.matrix(a.rows, b.cols)
-        for i in range(b.cols):
-            c = ctx.lu_solve(a, b.column(i))
-            for j in range(len(c)):
-                r[j, i] = c[j]
-        return r
+        return ctx.lu_factor(a).solve(b)
+
+    def lu_factor(ctx, A, **kwargs):
+        """
+        Computes the LU decomposition of a square matrix `A` (with extra
+        precision, as in ``lu_solve``) and returns it as an object whose
+        method ``solve(b)`` solves `Ax = b`. The right-hand side `b` may
+        be a matrix, whose columns are then solved for in one pass::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = False
+            >>> A = matrix([[4, 1, 2], [1, 5, 3], [2, 3, 6]])
+            >>> F = lu_factor(A)
+            >>> F
+            <LU factorization of a 3x3 matrix>
+            >>> F.solve([7, 9, 11])
+            matrix(
+            [['1.0'],
+             ['1.0'],
+             ['1.0']])
+            >>> B = matrix([[7, 1], [9, 0], [11, 0]])
+            >>> print(chop(F.solve(B)))
+            [1.0   0.3]
+            [1.0   0.0]
+            [1.0  -0.1]
+            >>> F.det()
+            mpf('70.0')
+
+        Unlike the decomposition cached by ``lu_solve``, the object is
+        not invalidated when `A` changes, and it can be pickled::
+
+            >>> import pickle
+            >>> G = pickle.loads(pickle.dumps(F))
+            >>> G.solve(B) == F.solve(B)
+            True
+
+        """
+        prec = ctx.prec
+        try:
+            ctx.prec += 10
+            A = ctx.matrix(A, **kwargs)
+            LU, p = ctx.LU_decomp(A, overwrite=True)
+            return LUFactorization(LU, p, ctx.prec)
+        finally:
+            ctx.prec = prec
+
+    def cho_factor(ctx, A, **kwargs):
+        """
+        Computes the Cholesky decomposition of a hermitian
+        positive-definite matrix `A`, and returns it as an object whose
+        method ``solve(b)`` solves `Ax = b` for one or many right-hand
+        sides, as for :func:`~mpmath.lu_factor`::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = False
+            >>> F = cho_factor([[4, 2, -2], [2, 5, -4], [-2, -4, 5.5]])
+            >>> F
+            <Cholesky factorization of a 3x3 matrix>
+            >>> print(F.L)
+            [ 2.0   0.0  0.0]
+            [ 1.0   2.0  0.0]
+            [-1.0  -1.5  1.5]
+            >>> print(F.solve([10, 16, -15.5]))
+            [ 1.0]
+            [ 2.0]
+            [-1.0]
+
+        """
+        prec = ctx.prec
+        try:
+            ctx.prec += 10
+            A = ctx.matrix(A, **kwargs)
+            if A.rows != A.cols:
+                raise ValueError('need n*n matrix')
+            return CholeskyFactorization(ctx.cholesky(A), ctx.prec)
+        finally:
+            ctx.prec = prec
+
+    def qr_factor(ctx, A, **kwargs):
+        """
+        Computes the QR decomposition of a `m \\times n` matrix `A` with
+        `m \\ge n \\ge 2`, and returns it as an object whose method
+        ``solve(b)`` gives the least-squares solution of `Ax = b` for one
+        or many right-hand sides, as for :func:`~mpmath.lu_factor`::
+
+            >>> from mpmath import *
+            >>> mp.dps = 15; mp.pretty = False
+            >>> A = matrix([[1, 1], [1, 2], [1, 3], [1, 4]])
+            >>> F = qr_factor(A)
+            >>> F
+            <QR factorization of a 4x2 matrix>
+            >>> print(chop(F.solve(matrix([[6, 1], [5, 2], [7, 3], [10, 4]]))))
+            [3.5  0.0]
+            [1.4  1.0]
+
+        """
+        prec = ctx.prec
+        try:
+            ctx.prec += 10
+            A = ctx.matrix(A, **kwargs)
+            if A.rows < A.cols:
+                raise ValueError('cannot solve underdetermined system')
+            QR, tau = ctx.qr(A, mode='raw', edps=0)
+            return QRFactorization(QR, tau, ctx.prec)
+        finally:
+            ctx.prec = prec
 
     def qr(ctx, A, mode = 'full', edps = 10):
         """
@@ -655,6 +1127,7 @@ def qr(ctx, A, mode = 'full', edps = 10):
         with ctx.extradps(edps):
             tau = ctx.matrix(n,1)
             A = A.copy()
+            a = A._dense_rows()
 
             # ---------------
             # FACTOR MATRIX A
@@ -666,12 +1139,12 @@ def qr(ctx, A, mode = 'full', edps = 10):
 
                 # main loop to factor A (complex)
                 for j in xrange(0, n):
-                    alpha = A[j,j]
+                    alpha = a[j][j]
                     alphr = ctx.re(alpha)
                     alphi = ctx.im(alpha)
 
                     if (m-j) >= 2:
-                        xnorm = ctx.fsum( A[i,j]*ctx.conj(A[i,j]) for i in xrange(j+1, m) )
+                        xnorm = ctx.fsum( a[i][j]*ctx.conj(a[i][j]) for i in xrange(j+1, m) )
                         xnorm = ctx.re( ctx.sqrt(xnorm) )
                     else:
                         xnorm = rzero
@@ -690,29 +1163,29 @@ def qr(ctx, A, mode = 'full', edps = 10):
                     za = one / (alpha - beta)
 
                     for i in xrange(j+1, m):
-                        A[i,j] *= za
+                        a[i][j] *= za
 
-                    A[j,j] = one
+                    a[j][j] = one
                     for k in xrange(j+1, n):
-                        y = ctx.fsum(A[i,j] * ctx.conj(A[i,k]) for i in xrange(j, m))
+                        y = ctx.fsum(a[i][j] * ctx.conj(a[i][k]) for i in xrange(j, m))
                         temp = t * ctx.conj(y)
                         for i in xrange(j, m):
-                            A[i,k] += A[i,j] * temp
+                            a[i][k] += a[i][j] * temp
 
-                    A[j,j] = ctx.mpc(beta, '0.0')
+                    a[j][j] = ctx.mpc(beta, '0.0')
             else:
                 one = ctx.mpf('1.0')
                 zero = ctx.mpf('0.0')
 
                 # main loop to factor A (real)
                 for j in xrange(0, n):
-                    alpha = A[j,j]
+                    alpha = a[j][j]
 
                     if (m-j) > 2:
-                        xnorm = ctx.fsum( (A[i,j])**2 for i in xrange(j+1, m) )
+                        xnorm = ctx.fsum( (a[i][j])**2 for i in xrange(j+1, m) )
                         xnorm = ctx.sqrt(xnorm)
                     elif (m-j) == 2:
-                        xnorm = abs( A[m-1,j] )
+                        xnorm = abs( a[m-1][j] )
                     else:
                         xnorm = zero
 
@@ -730,16 +1203,16 @@ def qr(ctx, A, mode = 'full', edps = 10):
                     da = one / (alpha - beta)
 
                     for i in xrange(j+1, m):
-                        A[i,j] *= da
+                        a[i][j] *= da
 
-                    A[j,j] = one
+                    a[j][j] = one
                     for k in xrange(j+1, n):
-                        y = ctx.fsum( A[i,j] * A[i,k] for i in xrange(j, m) )
+                        y = ctx.fsum( a[i][j] * a[i][k] for i in xrange(j, m) )
                         temp = t * y
                         for i in xrange(j,m):
-                            A[i,k] += A[i,j] * temp
+                            a[i][k] += a[i][j] * temp
 
-                    A[j,j] = beta
+                    a[j][j] = beta
 
             # return factorization in same internal format as LAPACK
             if (mode == 'raw') or (mode == 'RAW'):
@@ -762,29 +1235,30 @@ def qr(ctx, A, mode = 'full', edps = 10):
 
             # add columns to A if needed and initialize
             A.cols += (p-n)
+            a = A._dense_rows()
             for j in xrange(0, p):
-                A[j,j] = one
+                a[j][j] = one
                 for i in xrange(0, j):
-                    A[i,j] = zero
+                    a[i][j] = zero
 
             # main loop to form Q
             for j in xrange(n-1, -1, -1):
                 t = -tau[j]
-                A[j,j] += t
+                a[j][j] += t
 
                 for k in xrange(j+1, p):
                     if cmplx:
-                        y = ctx.fsum(A[i,j] * ctx.conj(A[i,k]) for i in xrange(j+1, m))
+                        y = ctx.fsum(a[i][j] * ctx.conj(a[i][k]) for i in xrange(j+1, m))
                         temp = t * ctx.conj(y)
                     else:
-                        y = ctx.fsum(A[i,j] * A[i,k] for i in xrange(j+1, m))
+                        y = ctx.fsum(a[i][j] * a[i][k] for i in xrange(j+1, m))
                         temp = t * y
-                    A[j,k] = temp
+                    a[j][k] = temp
                     for i in xrange(j+1, m):
-                        A[i,k] += A[i,j] * temp
+                        a[i][k] += a[i][j] * temp
 
                 for i in xrange(j+1, m):
-                    A[i, j] *= t
+                    a[i][j] *= t
 
             return A, R[0:p,0:n]
 
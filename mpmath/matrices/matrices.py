@@ -1,4 +1,5 @@
 from ..libmp.backend import xrange
+from ..ufuncs import apply_matrix_ufunc
 
 # TODO: interpret list as vectors (for multiplication)
 
@@ -20,8 +21,12 @@ class _matrix(object):
     Creating matrices
     -----------------
 
-    Matrices in mpmath are implemented using dictionaries. Only non-zero values
-    are stored, so it is cheap to represent sparse matrices.
+    Matrices in mpmath are stored either as a dictionary of the non-zero
+    values, which is cheap for sparse matrices, or as a list of rows, which is
+    faster for dense matrices. Matrices created from nested lists use the
+    dense storage, and empty matrices switch to it automatically once half of
+    their entries are non-zero. See also ``spmatrix`` for large sparse
+    matrices.
 
     The most basic way to create one is to use the ``matrix`` class directly.
     You can create an empty matrix specifying the dimensions:
@@ -284,7 +289,11 @@ class _matrix(object):
     """
 
     def __init__(self, *args, **kwargs):
-        self.__data = {}
+        # The entries are stored either in a dictionary of the non-zero
+        # values indexed by (i, j) (sparse storage), or in a list of rows
+        # (dense storage); the other attribute is None
+        self.__sparse = {}
+        self.__dense = None
         # LU decompostion cache, this is useful when solving the same system
         # multiple times, when calculating the inverse and when calculating the
         # determinant
@@ -292,22 +301,30 @@ def __init__(self, *args, **kwargs):
         convert = kwargs.get('force_type', self.ctx.convert)
         if not convert:
             convert = lambda x: x
+        # Zero entries are stored as ctx.zero, whatever their type
+        zero = self.ctx.zero
         if isinstance(args[0], (list, tuple)):
+            ctxconvert = self.ctx.convert
             if isinstance(args[0][0], (list, tuple)):
                 # interpret nested list as matrix
                 A = args[0]
                 self.__rows = len(A)
                 self.__cols = len(A[0])
-                for i, row in enumerate(A):
-                    for j, a in enumerate(row):
-                        self[i, j] = convert(a)
+                rows = []
+                for row in A:
+                    if len(row) > self.__cols:
+                        raise IndexError('matrix index out of range')
+                    row = [ctxconvert(convert(a)) or zero for a in row]
+                    if len(row) < self.__cols:
+                        row += [zero] * (self.__cols - len(row))
+                    rows.append(row)
+                self.__set_dense(rows)
             else:
                 # interpret list as row vector
                 v = args[0]
                 self.__rows = len(v)
                 self.__cols = 1
-                for i, e in enumerate(v):
-                    self[i, 0] = e
+                self.__set_dense([[ctxconvert(e) or zero] for e in v])
         elif isinstance(args[0], int):
             # create empty matrix of given dimensions
             if len(args) == 1:
@@ -318,30 +335,87 @@ def __init__(self, *args, **kwargs):
                 self.__rows = args[0]
                 self.__cols = args[1]
         elif isinstance(args[0], _matrix):
-            A = args[0].copy()
-            self.__data = A._matrix__data
-            self.__rows = A._matrix__rows
-            self.__cols = A._matrix__cols
-            for i in xrange(A.__rows):
-                for j in xrange(A.__cols):
-                    A[i,j] = convert(A[i,j])
+            A = args[0]
+            self.__rows = A.__rows
+            self.__cols = A.__cols
+            ctxconvert = self.ctx.convert
+            if A.__dense is not None:
+                self.__set_dense([[ctxconvert(convert(a)) or zero for a in row]
+                    for row in A.__dense])
+            else:
+                for key, a in A.__sparse.items():
+                    self[key] = convert(a)
         elif hasattr(args[0], 'tolist'):
             A = self.ctx.matrix(args[0].tolist())
-            self.__data = A._matrix__data
-            self.__rows = A._matrix__rows
-            self.__cols = A._matrix__cols
+            self.__rows = A.__rows
+            self.__cols = A.__cols
+            self.__set_dense(A.__dense)
         else:
             raise TypeError('could not interpret given arguments')
 
+    def __set_dense(self, rows):
+        self.__sparse = None
+        self.__dense = rows
+
+    @classmethod
+    def _from_rows(cls, rows, cols=None):
+        """
+        Create a matrix with dense storage from a list of rows, which are
+        used as they are (the entries must already be converted).
+        """
+        if cols is None:
+            cols = len(rows[0])
+        A = cls(len(rows), cols)
+        A.__set_dense(rows)
+        return A
+
+    def _dense_rows(self):
+        """
+        Return the entries as a list of rows, switching to dense storage if
+        necessary. This is meant for fast access in internal algorithms:
+        the rows may be modified in place, but entries must then be converted
+        by the caller and _LU must be reset.
+        """
+        if self.__dense is None:
+            zero = self.ctx.zero
+            rows = [[zero] * self.__cols for i in xrange(self.__rows)]
+            for (i, j), a in self.__sparse.items():
+                rows[i][j] = a
+            self.__set_dense(rows)
+        return self.__dense
+
+    def __row_lists(self):
+        # Like _dense_rows, but leaves sparse storage unchanged
+        if self.__dense is not None:
+            return self.__dense
+        zero = self.ctx.zero
+        rows = [[zero] * self.__cols for i in xrange(self.__rows)]
+        for (i, j), a in self.__sparse.items():
+            rows[i][j] = a
+        return rows
+
+    def __get_data(self):
+        # Dictionary of the non-zero entries
+        if self.__dense is None:
+            return self.__sparse
+        return dict(((i, j), a) for (i, row) in enumerate(self.__dense)
+            for (j, a) in enumerate(row) if a)
+
+    __data = property(__get_data)
+
+    def __check_density(self):
+        # Switch to dense storage once half of the entries are non-zero
+        if 2 * len(self.__sparse) > self.__rows * self.__cols:
+            self._dense_rows()
+
     def apply(self, f):
         """
         Return a copy of self with the function `f` applied elementwise.
         """
-        new = self.ctx.matrix(self.__rows, self.__cols)
-        for i in xrange(self.__rows):
-            for j in xrange(self.__cols):
-                new[i,j] = f(self[i,j])
-        return new
+        convert = self.ctx.convert
+        zero = self.ctx.zero
+        return self._from_rows([[convert(f(a)) or zero for a in row]
+            for row in self.__row_lists()], self.__cols)
 
     def __nstr__(self, n=None, **kwargs):
         # Build table of string representations of the elements
@@ -395,7 +469,7 @@ def tolist(self):
         """
         Convert the matrix to a nested list.
         """
-        return [[self[i,j] for j in range(self.__cols)] for i in range(self.__rows)]
+        return [row[:] for row in self.__row_lists()]
 
     def __repr__(self):
         if self.ctx.pretty:
@@ -411,8 +485,10 @@ def __get_element(self, key):
                 1. Does not check on the value of key it expects key to be a integer tuple (i,j)
                 2. Does not check bounds
         '''
-        if key in self.__data:
-            return self.__data[key]
+        if self.__dense is not None:
+            return self.__dense[key[0]][key[1]]
+        if key in self.__sparse:
+            return self.__sparse[key]
         else:
             return self.ctx.zero
 
@@ -424,10 +500,13 @@ def __set_element(self, key, value):
                 2. Does not check bounds
                 3. Does not check the value type
         '''
-        if value: # only store non-zeros
-            self.__data[key] = value
-        elif key in self.__data:
-            del self.__data[key]
+        if self.__dense is not None:
+            self.__dense[key[0]][key[1]] = value or self.ctx.zero
+        elif value: # only store non-zeros
+            self.__sparse[key] = value
+            self.__check_density()
+        elif key in self.__sparse:
+            del self.__sparse[key]
 
 
     def __getitem__(self, key):
@@ -437,6 +516,13 @@ def __getitem__(self, key):
             scalar to a slice of the matrix
          B = A[:,2:6]
         '''
+        # Fast path for single elements of dense matrices
+        if self.__dense is not None and type(key) is tuple:
+            i, j = key
+            if type(i) is int and type(j) is int:
+                if not (0 <= i < self.__rows and 0 <= j < self.__cols):
+                    raise IndexError('matrix index out of range')
+                return self.__dense[i][j]
         # Convert vector to matrix indexing
         if isinstance(key, int) or isinstance(key,slice):
             # only sufficent for vectors
@@ -460,6 +546,8 @@ def __getitem__(self, key):
                     raise IndexError('Row index out of bounds')
             else:
                 # Single row
+                if not 0 <= key[0] < self.__rows:
+                    raise IndexError('Row index out of bounds')
                 rows = [key[0]]
 
             # Columns
@@ -474,9 +562,16 @@ def __getitem__(self, key):
 
             else:
                 # Single column
+                if not 0 <= key[1] < self.__cols:
+                    raise IndexError('Column index out of bounds')
                 columns = [key[1]]
 
             # Create matrix slice
+            if self.__dense is not None:
+                dense = self.__dense
+                return self._from_rows([[dense[x][y] for y in columns]
+                    for x in rows], len(columns))
+
             m = self.ctx.matrix(len(rows),len(columns))
 
             # Assign elements to the output matrix
@@ -488,12 +583,9 @@ def __getitem__(self, key):
 
         else:
             # single element extraction
-            if key[0] >= self.__rows or key[1] >= self.__cols:
+            if not (0 <= key[0] < self.__rows and 0 <= key[1] < self.__cols):
                 raise IndexError('matrix index out of range')
-            if key in self.__data:
-                return self.__data[key]
-            else:
-                return self.ctx.zero
+            return self.__get_element(key)
 
     def __setitem__(self, key, value):
         # setitem function for mp matrix class with slice index enabled
@@ -502,6 +594,15 @@ def __setitem__(self, key, value):
         # A[:,2:6] = 2.5
         #  submatrix to matrix (the value matrix should be the same size as the slice size)
         # A[3,:] = B   where A is n x m  and B is n x 1
+        # Fast path for single elements of dense matrices
+        if self.__dense is not None and type(key) is tuple:
+            i, j = key
+            if type(i) is int and type(j) is int:
+                if not (0 <= i < self.__rows and 0 <= j < self.__cols):
+                    raise IndexError('matrix index out of range')
+                self.__dense[i][j] = self.ctx.convert(value) or self.ctx.zero
+                self._LU = None
+                return
         # Convert vector to matrix indexing
         if isinstance(key, int) or isinstance(key,slice):
             # only sufficent for vectors
@@ -524,6 +625,8 @@ def __setitem__(self, key, value):
                     raise IndexError('Row index out of bounds')
             else:
                 # Single row
+                if not 0 <= key[0] < self.__rows:
+                    raise IndexError('Row index out of bounds')
                 rows = [key[0]]
             # Columns
             if isinstance(key[1],slice):
@@ -536,6 +639,8 @@ def __setitem__(self, key, value):
                     raise IndexError('Column index out of bounds')
             else:
                 # Single column
+                if not 0 <= key[1] < self.__cols:
+                    raise IndexError('Column index out of bounds')
                 columns = [key[1]]
             # Assign slice with a scalar
             if isinstance(value,self.ctx.matrix):
@@ -555,42 +660,54 @@ def __setitem__(self, key, value):
         else:
             # Single element assingment
             # Check bounds
-            if key[0] >= self.__rows or key[1] >= self.__cols:
+            if not (0 <= key[0] < self.__rows and 0 <= key[1] < self.__cols):
                 raise IndexError('matrix index out of range')
             # Convert and store value
             value = self.ctx.convert(value)
-            if value: # only store non-zeros
-                self.__data[key] = value
-            elif key in self.__data:
-                del self.__data[key]
+            self.__set_element(key, value)
 
         if self._LU:
             self._LU = None
         return
 
     def __iter__(self):
-        for i in xrange(self.__rows):
-            for j in xrange(self.__cols):
-                yield self[i,j]
+        if self.__dense is not None:
+            for row in self.__dense:
+                for a in row:
+                    yield a
+        else:
+            for i in xrange(self.__rows):
+                for j in xrange(self.__cols):
+                    yield self[i,j]
+
+    def _convert_array(self, other):
+        # NumPy arrays are treated as matrices
+        if type(other).__module__ == 'numpy' and getattr(other, 'ndim', 0):
+            return self.ctx.matrix(other)
+        # Sparse matrices are treated as dense matrices
+        if isinstance(other, self.ctx.spmatrix):
+            return other.todense()
+        return other
 
     def __mul__(self, other):
+        other = self._convert_array(other)
         if isinstance(other, self.ctx.matrix):
             # dot multiplication  TODO: use Strassen's method?
             if self.__cols != other.__rows:
                 raise ValueError('dimensions not compatible for multiplication')
-            new = self.ctx.matrix(self.__rows, other.__cols)
-            for i in xrange(self.__rows):
-                for j in xrange(other.__cols):
-                    new[i, j] = self.ctx.fdot((self[i,k], other[k,j])
-                                     for k in xrange(other.__rows))
-            return new
+            fdot = self.ctx.fdot
+            zero = self.ctx.zero
+            columns = list(zip(*other.__row_lists()))
+            if not columns:
+                return self.ctx.matrix(self.__rows, other.__cols)
+            return self._from_rows([[fdot(row, col) or zero for col in columns]
+                for row in self.__row_lists()], other.__cols)
         else:
             # try scalar multiplication
-            new = self.ctx.matrix(self.__rows, self.__cols)
-            for i in xrange(self.__rows):
-                for j in xrange(self.__cols):
-                    new[i, j] = other * self[i, j]
-            return new
+            convert = self.ctx.convert
+            zero = self.ctx.zero
+            return self._from_rows([[convert(other * a) or zero for a in row]
+                for row in self.__row_lists()], self.__cols)
 
     def __rmul__(self, other):
         # assume other is scalar and thus commutative
@@ -628,35 +745,34 @@ def __pow__(self, other):
     def __div__(self, other):
         # assume other is scalar and do element-wise divison
         assert not isinstance(other, self.ctx.matrix)
-        new = self.ctx.matrix(self.__rows, self.__cols)
-        for i in xrange(self.__rows):
-            for j in xrange(self.__cols):
-                new[i,j] = self[i,j] / other
-        return new
+        convert = self.ctx.convert
+        zero = self.ctx.zero
+        return self._from_rows([[convert(a / other) or zero for a in row]
+            for row in self.__row_lists()], self.__cols)
 
     __truediv__ = __div__
 
     def __add__(self, other):
+        other = self._convert_array(other)
         if isinstance(other, self.ctx.matrix):
             if not (self.__rows == other.__rows and self.__cols == other.__cols):
                 raise ValueError('incompatible dimensions for addition')
-            new = self.ctx.matrix(self.__rows, self.__cols)
-            for i in xrange(self.__rows):
-                for j in xrange(self.__cols):
-                    new[i,j] = self[i,j] + other[i,j]
-            return new
+            zero = self.ctx.zero
+            return self._from_rows([[(a + b) or zero for (a, b) in zip(r, s)]
+                for (r, s) in zip(self.__row_lists(), other.__row_lists())],
+                self.__cols)
         else:
             # assume other is scalar and add element-wise
-            new = self.ctx.matrix(self.__rows, self.__cols)
-            for i in xrange(self.__rows):
-                for j in xrange(self.__cols):
-                    new[i,j] += self[i,j] + other
-            return new
+            convert = self.ctx.convert
+            zero = self.ctx.zero
+            return self._from_rows([[convert(a + other) or zero for a in row]
+                for row in self.__row_lists()], self.__cols)
 
     def __radd__(self, other):
         return self.__add__(other)
 
     def __sub__(self, other):
+        other = self._convert_array(other)
         if isinstance(other, self.ctx.matrix) and not (self.__rows == other.__rows
                                               and self.__cols == other.__cols):
             raise ValueError('incompatible dimensions for subtraction')
@@ -668,9 +784,15 @@ def __neg__(self):
     def __rsub__(self, other):
         return -self + other
 
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return apply_matrix_ufunc(self.ctx, ufunc, method, inputs, kwargs)
+
     def __eq__(self, other):
-        return self.__rows == other.__rows and self.__cols == other.__cols \
-               and self.__data == other.__data
+        if not (self.__rows == other.__rows and self.__cols == other.__cols):
+            return False
+        if self.__dense is None and other.__dense is None:
+            return self.__sparse == other.__sparse
+        return self.__row_lists() == other.__row_lists()
 
     def __len__(self):
         if self.rows == 1:
@@ -684,9 +806,15 @@ def __getrows(self):
         return self.__rows
 
     def __setrows(self, value):
-        for key in self.__data.copy():
-            if key[0] >= value:
-                del self.__data[key]
+        if self.__dense is not None:
+            del self.__dense[value:]
+            zero = self.ctx.zero
+            for i in xrange(self.__rows, value):
+                self.__dense.append([zero] * self.__cols)
+        else:
+            for key in self.__sparse.copy():
+                if key[0] >= value:
+                    del self.__sparse[key]
         self.__rows = value
 
     rows = property(__getrows, __setrows, doc='number of rows')
@@ -695,18 +823,25 @@ def __getcols(self):
         return self.__cols
 
     def __setcols(self, value):
-        for key in self.__data.copy():
-            if key[1] >= value:
-                del self.__data[key]
+        if self.__dense is not None:
+            zero = self.ctx.zero
+            for row in self.__dense:
+                del row[value:]
+                row += [zero] * (value - len(row))
+        else:
+            for key in self.__sparse.copy():
+                if key[1] >= value:
+                    del self.__sparse[key]
         self.__cols = value
 
     cols = property(__getcols, __setcols, doc='number of columns')
 
     def transpose(self):
+        if self.__dense is not None:
+            return self._from_rows([list(col) for col in zip(*self.__dense)],
+                self.__rows)
         new = self.ctx.matrix(self.__cols, self.__rows)
-        for i in xrange(self.__rows):
-            for j in xrange(self.__cols):
-                new[j,i] = self[i,j]
+        new.__sparse = dict(((j, i), a) for ((i, j), a) in self.__sparse.items())
         return new
 
     T = property(transpose)
@@ -720,13 +855,18 @@ def transpose_conj(self):
     H = property(transpose_conj)
 
     def copy(self):
+        if self.__dense is not None:
+            return self._from_rows([row[:] for row in self.__dense],
+                self.__cols)
         new = self.ctx.matrix(self.__rows, self.__cols)
-        new.__data = self.__data.copy()
+        new.__sparse = self.__sparse.copy()
         return new
 
     __copy__ = copy
 
     def column(self, n):
+        if self.__dense is not None:
+            return self._from_rows([[row[n]] for row in self.__dense], 1)
         m = self.ctx.matrix(self.rows, 1)
         for i in range(self.rows):
             m[i] = self[i,n]
@@ -864,8 +1004,9 @@ def swap_row(ctx, A, i, j):
         if i == j:
             return
         if isinstance(A, ctx.matrix):
-            for k in xrange(A.cols):
-                A[i,k], A[j,k] = A[j,k], A[i,k]
+            rows = A._dense_rows()
+            rows[i], rows[j] = rows[j], rows[i]
+            A._LU = None
         elif isinstance(A, list):
             A[i], A[j] = A[j], A[i]
         else:
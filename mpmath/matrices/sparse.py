@@ -0,0 +1,733 @@
+"""
+Sparse matrices
+---------------
+
+The ``spmatrix`` class stores only the nonzero entries of a matrix, in
+compressed sparse row (CSR) or compressed sparse column (CSC) format.
+Matrix-vector products cost time proportional to the number of stored
+entries, which makes it possible to work with large banded or sparse
+systems at high precision::
+
+    >>> from mpmath import *
+    >>> mp.dps = 15; mp.pretty = False
+    >>> A = spmatrix({(0,0): 4, (0,1): 1, (1,0): 1, (1,1): 3, (2,2): 2}, 3, 3)
+    >>> A
+    <3x3 spmatrix with 5 stored entries in CSR format>
+    >>> print(A)
+    (0, 0)  4.0
+    (0, 1)  1.0
+    (1, 0)  1.0
+    (1, 1)  3.0
+    (2, 2)  2.0
+    >>> A * matrix([1, 2, 3])
+    matrix(
+    [['6.0'],
+     ['7.0'],
+     ['6.0']])
+
+Linear systems with a sparse matrix are solved iteratively with
+``cg`` (for Hermitian positive definite matrices), ``bicgstab`` or
+``gmres``::
+
+    >>> print(cg(A, [1, 2, 3]))
+    [0.0909090909090909]
+    [ 0.636363636363636]
+    [               1.5]
+"""
+
+from bisect import bisect_left
+
+from ..libmp.backend import xrange
+
+def _transpose_storage(data, indices, indptr, n):
+    # Converts compressed storage along one axis to compressed
+    # storage along the other axis, which has length n
+    ptr = [0] * (n + 1)
+    for j in indices:
+        ptr[j + 1] += 1
+    for j in xrange(n):
+        ptr[j + 1] += ptr[j]
+    pos = ptr[:-1]
+    newdata = [None] * len(data)
+    newindices = [0] * len(data)
+    for i in xrange(len(indptr) - 1):
+        for k in xrange(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            p = pos[j]
+            newdata[p] = data[k]
+            newindices[p] = i
+            pos[j] = p + 1
+    return newdata, newindices, ptr
+
+class _spmatrix(object):
+    """
+    Sparse matrix in compressed sparse row (CSR) or column (CSC)
+    format.
+
+    A sparse matrix can be created from a dictionary of entries
+    ``{(i, j): value}`` with the dimensions, from a dense matrix or
+    nested list, or directly from the compressed arrays
+    ``(data, indices, indptr)`` with the dimensions, or empty with
+    ``spmatrix(m, n)``. The keyword argument ``format`` selects
+    ``'csr'`` (the default) or ``'csc'`` storage, and ``force_type``
+    works as for ``matrix``.
+
+        >>> from mpmath import *
+        >>> mp.dps = 15; mp.pretty = False
+        >>> A = spmatrix([[2, 0, 0], [0, 0, 1]])
+        >>> A.rows, A.cols, A.nnz
+        (2, 3, 2)
+        >>> A[1,2], A[0,1]
+        (mpf('1.0'), mpf('0.0'))
+        >>> A.data, A.indices, A.indptr
+        ([mpf('2.0'), mpf('1.0')], [0, 2], [0, 1, 2])
+        >>> B = A.tocsc()
+        >>> B.indices, B.indptr
+        ([0, 1], [0, 1, 1, 2])
+        >>> A.T
+        <3x2 spmatrix with 2 stored entries in CSC format>
+        >>> A.todense()
+        matrix(
+        [['2.0', '0.0', '0.0'],
+         ['0.0', '0.0', '1.0']])
+
+    Sparse matrices are not modified in place: entries cannot be
+    assigned. Products with vectors and dense matrices give dense
+    matrices; sums and products of sparse matrices, and products with
+    scalars, are sparse.
+    """
+
+    def __init__(self, *args, **kwargs):
+        ctx = self.ctx
+        convert = kwargs.get('force_type', ctx.convert)
+        if not convert:
+            convert = lambda x: x
+        format = kwargs.get('format', 'csr')
+        if format not in ('csr', 'csc'):
+            raise ValueError("format must be 'csr' or 'csc'")
+        self.format = format
+        data = args[0]
+        if isinstance(data, _spmatrix):
+            if data.format != format:
+                data = data.tocsc() if format == 'csc' else data.tocsr()
+            self.rows, self.cols = data.rows, data.cols
+            self.data = [convert(v) for v in data.data]
+            self.indices = data.indices[:]
+            self.indptr = data.indptr[:]
+            return
+        if isinstance(data, tuple) and len(data) == 3:
+            self.rows, self.cols = args[1], args[2]
+            values, indices, indptr = data
+            if len(indptr) != self._major() + 1 or indptr[-1] != len(values):
+                raise ValueError('inconsistent compressed storage')
+            self.data = [convert(v) for v in values]
+            self.indices = list(indices)
+            self.indptr = list(indptr)
+            return
+        if isinstance(data, dict):
+            self.rows, self.cols = args[1], args[2]
+            entries = data.items()
+        elif isinstance(data, ctx.matrix):
+            self.rows, self.cols = data.rows, data.cols
+            entries = data._matrix__data.items()
+        elif isinstance(data, (list, tuple)):
+            if data and isinstance(data[0], (list, tuple)):
+                self.rows, self.cols = len(data), len(data[0])
+                entries = (((i, j), v) for (i, row) in enumerate(data)
+                    for (j, v) in enumerate(row))
+            else:
+                # column vector
+                self.rows, self.cols = len(data), 1
+                entries = (((i, 0), v) for (i, v) in enumerate(data))
+        elif isinstance(data, int):
+            self.rows = data
+            self.cols = args[1] if len(args) > 1 else data
+            entries = ()
+        else:
+            raise TypeError('could not interpret given arguments')
+        self._compress(entries, convert)
+
+    def _major(self):
+        if self.format == 'csr':
+            return self.rows
+        return self.cols
+
+    def _compress(self, entries, convert):
+        csr = self.format == 'csr'
+        lines = [{} for i in xrange(self._major())]
+        for (i, j), v in entries:
+            if not (0 <= i < self.rows and 0 <= j < self.cols):
+                raise IndexError('matrix index out of range')
+            v = convert(v)
+            if v:
+                if csr:
+                    lines[i][j] = v
+                else:
+                    lines[j][i] = v
+        data = []
+        indices = []
+        indptr = [0]
+        for line in lines:
+            for k in sorted(line):
+                indices.append(k)
+                data.append(line[k])
+            indptr.append(len(data))
+        self.data, self.indices, self.indptr = data, indices, indptr
+
+    def _new(self, rows, cols, format, data, indices, indptr):
+        A = object.__new__(type(self))
+        A.rows, A.cols, A.format = rows, cols, format
+        A.data, A.indices, A.indptr = data, indices, indptr
+        return A
+
+    @property
+    def nnz(self):
+        """number of stored entries"""
+        return len(self.data)
+
+    def items(self):
+        """
+        Iterate over the stored entries as pairs ``((i, j), value)``,
+        in storage order.
+        """
+        data, indices, indptr = self.data, self.indices, self.indptr
+        csr = self.format == 'csr'
+        for i in xrange(len(indptr) - 1):
+            for k in xrange(indptr[i], indptr[i + 1]):
+                if csr:
+                    yield (i, indices[k]), data[k]
+                else:
+                    yield (indices[k], i), data[k]
+
+    def __getitem__(self, key):
+        i, j = key
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError('matrix index out of range')
+        if self.format == 'csc':
+            i, j = j, i
+        a, b = self.indptr[i], self.indptr[i + 1]
+        k = bisect_left(self.indices, j, a, b)
+        if k < b and self.indices[k] == j:
+            return self.data[k]
+        return self.ctx.zero
+
+    def __repr__(self):
+        return "<%ix%i spmatrix with %i stored entries in %s format>" % \
+            (self.rows, self.cols, self.nnz, self.format.upper())
+
+    def __nstr__(self, n=None, **kwargs):
+        lines = []
+        for (i, j), v in self.items():
+            if n:
+                v = self.ctx.nstr(v, n, **kwargs)
+            lines.append("(%i, %i)  %s" % (i, j, v))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.__nstr__()
+
+    def __len__(self):
+        return self.rows
+
+    def __eq__(self, other):
+        if not isinstance(other, _spmatrix):
+            return NotImplemented
+        A = self.tocsr()
+        B = other.tocsr()
+        return A.rows == B.rows and A.cols == B.cols and \
+            A.indptr == B.indptr and A.indices == B.indices and \
+            A.data == B.data
+
+    def __ne__(self, other):
+        t = self.__eq__(other)
+        if t is NotImplemented:
+            return t
+        return not t
+
+    __hash__ = None
+
+    def copy(self):
+        return self._new(self.rows, self.cols, self.format, self.data[:],
+            self.indices[:], self.indptr[:])
+
+    __copy__ = copy
+
+    def tocsr(self):
+        """
+        Returns the matrix in CSR format (self if already in CSR format).
+        """
+        if self.format == 'csr':
+            return self
+        data, indices, indptr = _transpose_storage(self.data, self.indices,
+            self.indptr, self.rows)
+        return self._new(self.rows, self.cols, 'csr', data, indices, indptr)
+
+    def tocsc(self):
+        """
+        Returns the matrix in CSC format (self if already in CSC format).
+        """
+        if self.format == 'csc':
+            return self
+        data, indices, indptr = _transpose_storage(self.data, self.indices,
+            self.indptr, self.cols)
+        return self._new(self.rows, self.cols, 'csc', data, indices, indptr)
+
+    def todense(self):
+        """
+        Returns the matrix as a dense ``matrix``.
+        """
+        A = self.ctx.matrix(self.rows, self.cols)
+        for key, v in self.items():
+            A[key] = v
+        return A
+
+    def tolist(self):
+        return self.todense().tolist()
+
+    def transpose(self):
+        # CSR storage of A is CSC storage of A.T and vice versa
+        if self.format == 'csr':
+            format = 'csc'
+        else:
+            format = 'csr'
+        return self._new(self.cols, self.rows, format, self.data[:],
+            self.indices[:], self.indptr[:])
+
+    T = property(transpose)
+
+    def conjugate(self):
+        conj = self.ctx.conj
+        return self._new(self.rows, self.cols, self.format,
+            [conj(v) for v in self.data], self.indices[:], self.indptr[:])
+
+    def transpose_conj(self):
+        return self.conjugate().transpose()
+
+    H = property(transpose_conj)
+
+    def diagonal(self):
+        """
+        Returns the list of diagonal entries.
+        """
+        return [self[i,i] for i in xrange(min(self.rows, self.cols))]
+
+    def matvec(self, x):
+        """
+        Returns the product of the matrix with the vector *x* (a list
+        of numbers) as a list. Each entry is computed with a single
+        :func:`~mpmath.fdot`.
+        """
+        if len(x) != self.cols:
+            raise ValueError('dimensions not compatible for multiplication')
+        fdot = self.ctx.fdot
+        data, indices, indptr = self.data, self.indices, self.indptr
+        zero = self.ctx.zero
+        if self.format == 'csr':
+            y = []
+            for i in xrange(self.rows):
+                a, b = indptr[i], indptr[i + 1]
+                if a == b:
+                    y.append(zero)
+                else:
+                    y.append(fdot(data[a:b], [x[j] for j in indices[a:b]]))
+            return y
+        terms = [[] for i in xrange(self.rows)]
+        for j in xrange(self.cols):
+            xj = x[j]
+            for k in xrange(indptr[j], indptr[j + 1]):
+                terms[indices[k]].append((data[k], xj))
+        return [fdot(t) if t else zero for t in terms]
+
+    def __mul__(self, other):
+        ctx = self.ctx
+        if isinstance(other, _spmatrix):
+            if self.cols != other.rows:
+                raise ValueError('dimensions not compatible for multiplication')
+            A = self.tocsr()
+            B = other.tocsr()
+            entries = {}
+            for i in xrange(A.rows):
+                row = {}
+                for k in xrange(A.indptr[i], A.indptr[i + 1]):
+                    a = A.data[k]
+                    l = A.indices[k]
+                    for m in xrange(B.indptr[l], B.indptr[l + 1]):
+                        row.setdefault(B.indices[m], []).append((a, B.data[m]))
+                for j, terms in row.items():
+                    entries[i, j] = ctx.fdot(terms)
+            return type(self)(entries, A.rows, B.cols)
+        if isinstance(other, (list, tuple)):
+            other = ctx.matrix(other)
+        if isinstance(other, ctx.matrix):
+            if self.cols != other.rows:
+                raise ValueError('dimensions not compatible for multiplication')
+            new = ctx.matrix(self.rows, other.cols)
+            for j in xrange(other.cols):
+                y = self.matvec([other[i,j] for i in xrange(other.rows)])
+                for i in xrange(self.rows):
+                    new[i,j] = y[i]
+            return new
+        # scalar multiplication
+        other = ctx.convert(other)
+        return self._new(self.rows, self.cols, self.format,
+            [v*other for v in self.data], self.indices[:], self.indptr[:])
+
+    __rmul__ = __mul__
+
+    def __div__(self, other):
+        return self * (1 / self.ctx.convert(other))
+
+    __truediv__ = __div__
+
+    def __neg__(self):
+        return self * (-1)
+
+    def __add__(self, other):
+        if isinstance(other, _spmatrix):
+            if not (self.rows == other.rows and self.cols == other.cols):
+                raise ValueError('incompatible dimensions for addition')
+            entries = dict(self.items())
+            for key, v in other.items():
+                if key in entries:
+                    entries[key] += v
+                else:
+                    entries[key] = v
+            return type(self)(entries, self.rows, self.cols,
+                format=self.format)
+        return self.todense() + other
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, _spmatrix):
+            return self + (-other)
+        return self.todense() - other
+
+    def __rsub__(self, other):
+        return other - self.todense()
+
+
+class SparseMethods(object):
+
+    def __init__(ctx):
+        ctx.spmatrix = type('spmatrix', (_spmatrix,), {})
+        ctx.spmatrix.ctx = ctx
+
+    def _sparse_system(ctx, A, b, x0):
+        if not isinstance(A, ctx.spmatrix):
+            A = ctx.spmatrix(A)
+        A = A.tocsr()
+        if A.rows != A.cols:
+            raise ValueError('need n*n matrix')
+        b = [ctx.convert(t) for t in b]
+        if len(b) != A.rows:
+            raise ValueError('incompatible dimensions')
+        if x0 is None:
+            x = [ctx.zero] * A.rows
+        else:
+            x = [ctx.convert(t) for t in x0]
+            if len(x) != A.rows:
+                raise ValueError('incompatible dimensions')
+        return A, b, x
+
+    def _sparse_preconditioner(ctx, A, M):
+        if M is None:
+            return lambda r: r
+        if M == 'jacobi':
+            d = A.diagonal()
+            if not all(d):
+                raise ZeroDivisionError('zero on the diagonal')
+            d = [1/t for t in d]
+            return lambda r: [u*v for (u, v) in zip(d, r)]
+        if callable(M):
+            return lambda r: [ctx.convert(t) for t in M(ctx.matrix(r))]
+        raise ValueError("M must be None, 'jacobi' or a function")
+
+    def _sparse_result(ctx, x, r, bnorm, tol, steps, name):
+        err = ctx.norm(r)
+        if bnorm:
+            err /= bnorm
+        if err > tol:
+            raise ctx.NoConvergence("%s did not converge in %i steps "
+                "(relative residual %s)" % (name, steps, ctx.nstr(err, 5)))
+        return x, err
+
+    def cg(ctx, A, b, x0=None, tol=None, maxsteps=None, M=None,
+        error=False):
+        r"""
+        Solves the linear system `Ax = b` with the conjugate gradient
+        method, for a Hermitian positive definite matrix *A* (usually an
+        :class:`spmatrix`; dense matrices are converted).
+
+        The iteration stops when the residual `\|b - Ax\|` is at most
+        *tol* (by default ``eps``) times `\|b\|`, and raises
+        ``NoConvergence`` if this does not happen within *maxsteps*
+        steps (by default `10n`). *x0* is the initial guess (by default
+        zero). *M* selects a preconditioner: ``'jacobi'`` (the inverse
+        of the diagonal) or a function returning an approximation of
+        `A^{-1} r` for a vector `r`. The computation is done with 20
+        extra bits of precision. With ``error=True``, the relative
+        residual is also returned.
+
+        **Examples**
+
+        The discrete Laplacian in one dimension::
+
+            >>> from mpmath import *
+            >>> mp.dps = 30; mp.pretty = True
+            >>> n = 50
+            >>> entries = {}
+            >>> for i in range(n):
+            ...     entries[i,i] = 2
+            ...     if i: entries[i,i-1] = entries[i-1,i] = -1
+            ...
+            >>> A = spmatrix(entries, n, n)
+            >>> x = cg(A, [1]*n)
+            >>> x[0], x[n//2]
+            (25.0, 325.0)
+            >>> norm(A*x - matrix([1]*n)) < 1e-25
+            True
+
+        """
+        prec = ctx.prec
+        if tol is None:
+            tol = +ctx.eps
+        try:
+            ctx.prec += 20
+            A, b, x = ctx._sparse_system(A, b, x0)
+            n = A.rows
+            if maxsteps is None:
+                maxsteps = 10 * n
+            Minv = ctx._sparse_preconditioner(A, M)
+            fdot = ctx.fdot
+            bnorm = ctx.norm(b)
+            bound = tol * bnorm
+            r = [u - v for (u, v) in zip(b, A.matvec(x))]
+            z = Minv(r)
+            p = z
+            rz = fdot(z, r, conjugate=True)
+            steps = 0
+            while 1:
+                if ctx.norm(r) <= bound:
+                    # Check the true residual, which can differ from the
+                    # updated one due to rounding errors
+                    r = [u - v for (u, v) in zip(b, A.matvec(x))]
+                    if ctx.norm(r) <= bound:
+                        break
+                    z = Minv(r)
+                    p = z
+                    rz = fdot(z, r, conjugate=True)
+                if steps >= maxsteps or not rz:
+                    break
+                steps += 1
+                Ap = A.matvec(p)
+                alpha = rz / fdot(Ap, p, conjugate=True)
+                x = [u + alpha*v for (u, v) in zip(x, p)]
+                r = [u - alpha*v for (u, v) in zip(r, Ap)]
+                z = Minv(r)
+                rz, rz_prev = fdot(z, r, conjugate=True), rz
+                beta = rz / rz_prev
+                p = [u + beta*v for (u, v) in zip(z, p)]
+            x, err = ctx._sparse_result(x, r, bnorm, tol, steps, 'cg')
+        finally:
+            ctx.prec = prec
+        x = ctx.matrix([+t for t in x])
+        if error:
+            return x, +err
+        return x
+
+    def bicgstab(ctx, A, b, x0=None, tol=None, maxsteps=None, M=None,
+        error=False):
+        r"""
+        Solves the linear system `Ax = b` for a square matrix *A*
+        (usually an :class:`spmatrix`) with the stabilized biconjugate
+        gradient method (BiCGSTAB). Each step requires two products
+        with *A*, and no storage beyond a few vectors. The arguments
+        are as for :func:`~mpmath.cg`; the preconditioner is applied
+        on the right.
+
+            >>> from mpmath import *
+            >>> mp.dps = 30; mp.pretty = True
+            >>> A = spmatrix({(0,0): 4, (0,1): -1, (1,0): 2, (1,1): 5,
+            ...     (1,2): 1, (2,1): -3, (2,2): 6}, 3, 3)
+            >>> x = bicgstab(A, [1, 2, 3])
+            >>> print(x)
+            [0.291666666666666666666666666667]
+            [0.166666666666666666666666666667]
+            [0.583333333333333333333333333333]
+            >>> print(lu_solve(A.todense(), [1, 2, 3]))
+            [0.291666666666666666666666666667]
+            [0.166666666666666666666666666667]
+            [0.583333333333333333333333333333]
+
+        """
+        prec = ctx.prec
+        if tol is None:
+            tol = +ctx.eps
+        try:
+            ctx.prec += 20
+            A, b, x = ctx._sparse_system(A, b, x0)
+            n = A.rows
+            if maxsteps is None:
+                maxsteps = 10 * n
+            Minv = ctx._sparse_preconditioner(A, M)
+            fdot = ctx.fdot
+            bnorm = ctx.norm(b)
+            bound = tol * bnorm
+            r = [u - v for (u, v) in zip(b, A.matvec(x))]
+            restart = True
+            steps = 0
+            while 1:
+                if ctx.norm(r) <= bound:
+                    r = [u - v for (u, v) in zip(b, A.matvec(x))]
+                    if ctx.norm(r) <= bound:
+                        break
+                    restart = True
+                if steps >= maxsteps:
+                    break
+                if restart:
+                    rhat = r
+                    rho = alpha = omega = ctx.one
+                    p = v = [ctx.zero] * n
+                    restart = False
+                steps += 1
+                rho, rho_prev = fdot(r, rhat, conjugate=True), rho
+                if not rho or not omega:
+                    # breakdown; restart with the current residual
+                    restart = True
+                    continue
+                beta = (rho / rho_prev) * (alpha / omega)
+                p = [u + beta*(w - omega*t) for (u, w, t) in zip(r, p, v)]
+                phat = Minv(p)
+                v = A.matvec(phat)
+                alpha = fdot(v, rhat, conjugate=True)
+                if not alpha:
+                    restart = True
+                    continue
+                alpha = rho / alpha
+                s = [u - alpha*t for (u, t) in zip(r, v)]
+                x = [u + alpha*t for (u, t) in zip(x, phat)]
+                if ctx.norm(s) <= bound:
+                    r = s
+                    continue
+                shat = Minv(s)
+                t = A.matvec(shat)
+                tt = fdot(t, t, conjugate=True)
+                if not tt:
+                    r = s
+                    restart = True
+                    continue
+                omega = fdot(s, t, conjugate=True) / tt
+                x = [u + omega*w for (u, w) in zip(x, shat)]
+                r = [u - omega*w for (u, w) in zip(s, t)]
+            x, err = ctx._sparse_result(x, r, bnorm, tol, steps,
+                'bicgstab')
+        finally:
+            ctx.prec = prec
+        x = ctx.matrix([+t for t in x])
+        if error:
+            return x, +err
+        return x
+
+    def gmres(ctx, A, b, x0=None, tol=None, maxsteps=None, M=None,
+        restart=30, error=False):
+        r"""
+        Solves the linear system `Ax = b` for a square matrix *A*
+        (usually an :class:`spmatrix`) with the restarted generalized
+        minimal residual method GMRES(*restart*). The residual is
+        minimized over a Krylov subspace of dimension up to *restart*,
+        built with modified Gram-Schmidt orthogonalization; larger
+        values of *restart* need more storage but fewer steps. The
+        other arguments are as for :func:`~mpmath.cg`, with each step
+        counting one product with *A*; the preconditioner is applied on
+        the right.
+
+            >>> from mpmath import *
+            >>> mp.dps = 30; mp.pretty = True
+            >>> A = spmatrix({(0,0): 1, (0,2): 2j, (1,1): 3, (2,0): -1,
+            ...     (2,1): 1, (2,2): 2}, 3, 3)
+            >>> x, err = gmres(A, [1, 1, 1], error=True)
+            >>> print(chop(x))
+            [(0.166666666666666666666666666667 - 0.833333333333333333333333333333j)]
+            [                                      0.333333333333333333333333333333]
+            [(0.416666666666666666666666666667 - 0.416666666666666666666666666667j)]
+            >>> err < eps
+            True
+
+        """
+        prec = ctx.prec
+        if tol is None:
+            tol = +ctx.eps
+        try:
+            ctx.prec += 20
+            A, b, x = ctx._sparse_system(A, b, x0)
+            n = A.rows
+            if maxsteps is None:
+                maxsteps = 10 * n
+            m = max(1, min(restart, n))
+            Minv = ctx._sparse_preconditioner(A, M)
+            fdot = ctx.fdot
+            conj = ctx.conj
+            bnorm = ctx.norm(b)
+            bound = tol * bnorm
+            steps = 0
+            while 1:
+                r = [u - v for (u, v) in zip(b, A.matvec(x))]
+                beta = ctx.norm(r)
+                if beta <= bound or steps >= maxsteps:
+                    break
+                V = [[t / beta for t in r]]
+                Z = []
+                # Columns of the Hessenberg matrix, reduced to triangular
+                # form by the Givens rotations (c, s)
+                R = []
+                cs = []
+                g = [beta]
+                for j in xrange(m):
+                    steps += 1
+                    z = Minv(V[j])
+                    Z.append(z)
+                    w = A.matvec(z)
+                    h = []
+                    for v in V:
+                        hij = fdot(w, v, conjugate=True)
+                        w = [u - hij*t for (u, t) in zip(w, v)]
+                        h.append(hij)
+                    hnext = ctx.norm(w)
+                    h.append(hnext)
+                    for i in xrange(j):
+                        c, s = cs[i]
+                        h[i], h[i+1] = conj(c)*h[i] + conj(s)*h[i+1], \
+                            c*h[i+1] - s*h[i]
+                    nu = ctx.hypot(abs(h[j]), abs(h[j+1]))
+                    if not nu:
+                        break
+                    c, s = h[j] / nu, h[j+1] / nu
+                    cs.append((c, s))
+                    h[j] = nu
+                    h.pop()
+                    R.append(h)
+                    g.append(-s*g[j])
+                    g[j] = conj(c)*g[j]
+                    if abs(g[j+1]) <= bound or not hnext or steps >= maxsteps:
+                        break
+                    V.append([t / hnext for t in w])
+                # Back substitution for the coefficients of Z
+                k = len(R)
+                y = [ctx.zero] * k
+                for i in xrange(k - 1, -1, -1):
+                    y[i] = (g[i] - fdot([R[l][i] for l in xrange(i+1, k)],
+                        y[i+1:])) / R[i][i]
+                for i in xrange(k):
+                    yi = y[i]
+                    x = [u + yi*t for (u, t) in zip(x, Z[i])]
+                if not k:
+                    break
+            x, err = ctx._sparse_result(x, r, bnorm, tol, steps,
+                'gmres')
+        finally:
+            ctx.prec = prec
+        x = ctx.matrix([+t for t in x])
+        if error:
+            return x, +err
+        return x
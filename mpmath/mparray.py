@@ -0,0 +1,282 @@
+"""
+Packed one-dimensional arrays of real multiprecision numbers.
+
+An mpf is a Python object wrapping a (sign, man, exp, bc) tuple, so a
+list of n mpfs costs roughly 3n + 1 Python objects besides the mantissas
+themselves. An mpfarray instead stores the signs, exponents and bitcounts
+in typed columns (array.array) and all mantissas in a single list, so
+that the only per-element Python objects are the mantissa integers.
+
+Elementwise arithmetic works directly on the raw columns using the
+libmp routines, and mpf instances are only created on element access.
+"""
+
+from array import array
+
+from .libmp.backend import xrange, int_types
+from .libmp import (MPZ_ZERO, mpf_pos, mpf_neg, mpf_abs, mpf_add,
+    mpf_sub, mpf_mul, mpf_div, mpf_sum, mpf_sqrt, mpf_exp, mpf_log)
+
+# Exponents and bitcounts are stored as signed machine words. Python 2
+# and old Python 3 versions lack the 'q' typecode.
+try:
+    array('q')
+    _exp_typecode = 'q'
+except ValueError:
+    _exp_typecode = 'l'
+
+def _rsub(s, t, prec, rnd):
+    return mpf_sub(t, s, prec, rnd)
+
+def _rdiv(s, t, prec, rnd):
+    return mpf_div(t, s, prec, rnd)
+
+class _mpfarray(object):
+    """
+    One-dimensional array of real multiprecision floating-point numbers
+    with compact storage.
+
+    An ``mpfarray`` can be created from a length (giving an array of
+    zeros) or from an iterable of numbers, which are converted with
+    ``mpmathify``::
+
+        >>> from mpmath import *
+        >>> mp.dps = 15; mp.pretty = False
+        >>> mpfarray(3)
+        mpfarray(['0.0', '0.0', '0.0'])
+        >>> a = mpfarray([1, 2, 3])
+        >>> a
+        mpfarray(['1.0', '2.0', '3.0'])
+        >>> len(a), a[1], a[-1]
+        (3, mpf('2.0'), mpf('3.0'))
+
+    Only real values can be stored. Elements are stored exactly as
+    given (without rounding), and exponents must fit in a machine word.
+
+    The arithmetic operators ``+``, ``-``, ``*`` and ``/`` act
+    elementwise, with either another ``mpfarray`` of the same length
+    or a scalar as the second operand. Results are rounded to the
+    working precision::
+
+        >>> a + a
+        mpfarray(['2.0', '4.0', '6.0'])
+        >>> 1 / a
+        mpfarray(['1.0', '0.5', '0.333333333333333'])
+        >>> a * a - 1
+        mpfarray(['0.0', '3.0', '8.0'])
+
+    The elementary functions :meth:`sqrt`, :meth:`exp` and :meth:`log`
+    are also applied elementwise::
+
+        >>> a.sqrt()
+        mpfarray(['1.0', '1.4142135623731', '1.73205080756888'])
+        >>> a.log().exp()
+        mpfarray(['1.0', '2.0', '3.0'])
+
+    Slicing returns a new array; :meth:`tolist` converts to a list
+    of ``mpf`` instances::
+
+        >>> a[::2].tolist()
+        [mpf('1.0'), mpf('3.0')]
+
+    """
+
+    __slots__ = ['_signs', '_mans', '_exps', '_bcs']
+
+    def __init__(self, data=0):
+        self._signs = array('b')
+        self._mans = []
+        self._exps = array(_exp_typecode)
+        self._bcs = array(_exp_typecode)
+        if isinstance(data, int_types):
+            n = int(data)
+            self._signs.extend([0]*n)
+            self._mans.extend([MPZ_ZERO]*n)
+            self._exps.extend([0]*n)
+            self._bcs.extend([0]*n)
+        elif isinstance(data, _mpfarray):
+            self._signs.extend(data._signs)
+            self._mans.extend(data._mans)
+            self._exps.extend(data._exps)
+            self._bcs.extend(data._bcs)
+        else:
+            self._extend(self._convert(x) for x in data)
+
+    @classmethod
+    def _from_values(cls, values):
+        """
+        Create an array from an iterable of raw mpf tuples.
+        """
+        new = cls.__new__(cls)
+        new._signs = array('b')
+        new._mans = []
+        new._exps = array(_exp_typecode)
+        new._bcs = array(_exp_typecode)
+        new._extend(values)
+        return new
+
+    def _extend(self, values):
+        signs_append = self._signs.append
+        mans_append = self._mans.append
+        exps_append = self._exps.append
+        bcs_append = self._bcs.append
+        for sign, man, exp, bc in values:
+            signs_append(sign)
+            mans_append(man)
+            exps_append(exp)
+            bcs_append(bc)
+
+    def _values(self):
+        """
+        Iterate over the elements as raw mpf tuples.
+        """
+        return zip(self._signs, self._mans, self._exps, self._bcs)
+
+    def _convert(self, x):
+        if hasattr(x, '_mpf_'):
+            return x._mpf_
+        x = self.ctx.convert(x)
+        if hasattr(x, '_mpf_'):
+            return x._mpf_
+        raise TypeError("mpfarray can only hold real numbers")
+
+    def __len__(self):
+        return len(self._mans)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._from_values(list(self._values())[key])
+        return self.ctx.make_mpf((self._signs[key], self._mans[key],
+            self._exps[key], self._bcs[key]))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            raise TypeError("mpfarray does not support slice assignment")
+        sign, man, exp, bc = self._convert(value)
+        # Assign the mantissa last, so that an IndexError leaves the
+        # columns consistent
+        self._signs[key] = sign
+        self._exps[key] = exp
+        self._bcs[key] = bc
+        self._mans[key] = man
+
+    def __iter__(self):
+        make_mpf = self.ctx.make_mpf
+        for v in self._values():
+            yield make_mpf(v)
+
+    def append(self, value):
+        """
+        Append a number to the end of the array.
+        """
+        self._extend([self._convert(value)])
+
+    def extend(self, values):
+        """
+        Append all numbers from an iterable to the end of the array.
+        """
+        if isinstance(values, _mpfarray):
+            self._extend(list(values._values()))
+        else:
+            self._extend([self._convert(x) for x in values])
+
+    def tolist(self):
+        """
+        Convert the array to a list of ``mpf`` instances.
+        """
+        return list(self)
+
+    def copy(self):
+        return self.__class__(self)
+
+    __copy__ = copy
+
+    def __repr__(self):
+        if self.ctx.pretty:
+            return str(self)
+        return "mpfarray([%s])" % ", ".join(["'%s'" % x for x in self])
+
+    def __str__(self):
+        return "[%s]" % ", ".join([str(x) for x in self])
+
+    def __getstate__(self):
+        return (self._signs, self._mans, self._exps, self._bcs)
+
+    def __setstate__(self, state):
+        self._signs, self._mans, self._exps, self._bcs = state
+
+    def __reduce__(self):
+        return (_rebuild_mpfarray, (self.__getstate__(),))
+
+    def _unary(self, f):
+        prec, rounding = self.ctx._prec_rounding
+        return self._from_values(f(v, prec, rounding) for v in self._values())
+
+    def _binary(self, other, f):
+        prec, rounding = self.ctx._prec_rounding
+        if isinstance(other, _mpfarray):
+            if len(other) != len(self):
+                raise ValueError("mpfarray lengths do not match")
+            return self._from_values(f(u, v, prec, rounding) for (u, v) in \
+                zip(self._values(), other._values()))
+        try:
+            t = self._convert(other)
+        except TypeError:
+            return NotImplemented
+        return self._from_values(f(u, t, prec, rounding) for u in self._values())
+
+    def __pos__(self): return self._unary(mpf_pos)
+    def __neg__(self): return self._unary(mpf_neg)
+    def __abs__(self): return self._unary(mpf_abs)
+
+    def __add__(self, other): return self._binary(other, mpf_add)
+    def __sub__(self, other): return self._binary(other, mpf_sub)
+    def __mul__(self, other): return self._binary(other, mpf_mul)
+    def __div__(self, other): return self._binary(other, mpf_div)
+    def __rsub__(self, other): return self._binary(other, _rsub)
+    def __rdiv__(self, other): return self._binary(other, _rdiv)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+    __truediv__ = __div__
+    __rtruediv__ = __rdiv__
+
+    def sqrt(self):
+        """
+        Elementwise square root. Raises ``ComplexResult`` if any
+        element is negative.
+        """
+        return self._unary(mpf_sqrt)
+
+    def exp(self):
+        """
+        Elementwise exponential function.
+        """
+        return self._unary(mpf_exp)
+
+    def log(self):
+        """
+        Elementwise natural logarithm. Raises ``ComplexResult`` if any
+        element is negative.
+        """
+        return self._unary(mpf_log)
+
+    def sum(self):
+        """
+        Sum of all elements, rounded once to the working precision.
+        """
+        prec, rounding = self.ctx._prec_rounding
+        return self.ctx.make_mpf(mpf_sum(list(self._values()), prec, rounding))
+
+def _rebuild_mpfarray(state):
+    # XXX: always uses the global context, like mpf pickling
+    from . import mp
+    a = mp.mpfarray.__new__(mp.mpfarray)
+    a.__setstate__(state)
+    return a
+
+class ArrayMethods(object):
+
+    def __init__(ctx):
+        ctx.mpfarray = type('mpfarray', (_mpfarray,), {'__slots__': []})
+        ctx.mpfarray.ctx = ctx
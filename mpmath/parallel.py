@@ -0,0 +1,184 @@
+"""
+Evaluation of a function at many independent arguments using a pool
+of worker processes.
+
+Numbers and matrices are sent between processes in a compact form
+based on to_pickable/from_pickable (mantissas as hexadecimal strings),
+which also works for the dynamically created mpf, mpc and matrix
+types of a context, which cannot be pickled directly.
+"""
+
+from io import BytesIO
+
+from .libmp import to_pickable, from_pickable
+
+class _Packed(object):
+    """
+    Picklable stand-in for an mpf, mpc or matrix.
+    """
+    __slots__ = ['kind', 'data']
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        self.data = data
+
+    def __reduce__(self):
+        return (_Packed, (self.kind, self.data))
+
+def _pack(ctx, x):
+    if hasattr(x, '_mpf_'):
+        return _Packed('f', to_pickable(x._mpf_))
+    if hasattr(x, '_mpc_'):
+        re, im = x._mpc_
+        return _Packed('c', (to_pickable(re), to_pickable(im)))
+    if isinstance(x, ctx.matrix):
+        data = [_pack(ctx, x[i,j]) for i in range(x.rows)
+            for j in range(x.cols)]
+        return _Packed('m', (x.rows, x.cols, data))
+    if type(x) is tuple:
+        return tuple([_pack(ctx, y) for y in x])
+    if type(x) is list:
+        return [_pack(ctx, y) for y in x]
+    if type(x) is dict:
+        return dict((k, _pack(ctx, v)) for (k, v) in x.items())
+    return x
+
+def _unpack(ctx, x):
+    if isinstance(x, _Packed):
+        kind, data = x.kind, x.data
+        if kind == 'f':
+            return ctx.make_mpf(from_pickable(data))
+        if kind == 'c':
+            return ctx.make_mpc((from_pickable(data[0]), from_pickable(data[1])))
+        rows, cols, data = data
+        A = ctx.matrix(rows, cols)
+        k = 0
+        for i in range(rows):
+            for j in range(cols):
+                A[i,j] = _unpack(ctx, data[k])
+                k += 1
+        return A
+    if type(x) is tuple:
+        return tuple([_unpack(ctx, y) for y in x])
+    if type(x) is list:
+        return [_unpack(ctx, y) for y in x]
+    if type(x) is dict:
+        return dict((k, _unpack(ctx, v)) for (k, v) in x.items())
+    return x
+
+def _context_name(ctx, f):
+    """
+    If f is a function or method of ctx, return its attribute name,
+    else None.
+    """
+    if getattr(f, '__self__', None) is ctx:
+        func = f.__func__
+        for cls in type(ctx).__mro__:
+            for name, value in cls.__dict__.items():
+                if value is func:
+                    return name
+    for name, value in ctx.__dict__.items():
+        if value is f:
+            return name
+    return None
+
+# State of a worker process, set by _init_worker
+_worker_function = None
+
+# Quadrature rules whose cached nodes are copied to the workers
+_node_rules = ['_tanh_sinh', '_gauss_legendre']
+
+def _export_nodes(ctx):
+    nodes = []
+    for name in _node_rules:
+        rule = getattr(ctx, name)
+        if rule.standard_cache:
+            fp = BytesIO()
+            rule.save_nodes(fp)
+            nodes.append((name, fp.getvalue()))
+    return nodes
+
+def _init_worker(settings, function, method):
+    global _worker_function
+    from . import mp
+    prec, rounding, trap_complex, nodes = settings
+    mp.prec = prec
+    mp._prec_rounding[1] = rounding
+    mp.trap_complex = trap_complex
+    for name, data in nodes:
+        getattr(mp, name).load_nodes(BytesIO(data))
+    if method:
+        function = getattr(mp, function)
+    _worker_function = function
+
+def _call_worker(arg):
+    from . import mp
+    return _pack(mp, _worker_function(_unpack(mp, arg)))
+
+class ParallelMethods(object):
+
+    def parallel_map(ctx, f, args, workers=None, chunksize=1):
+        r"""
+        Computes ``[f(x) for x in args]``, distributing the calls over
+        a pool of *workers* worker processes (by default, one per CPU).
+        The results are returned as a list, in the same order as
+        *args*.
+
+        Each worker evaluates *f* using the global context ``mp``, with
+        the working precision, rounding mode and ``trap_complex``
+        setting copied from the calling context. Arguments and results
+        may be numbers, matrices, and tuples, lists or dicts of these
+        (or of any other picklable objects).
+
+        The function *f* must be picklable, i.e. it must be a function
+        defined at the top level of a module, or a function of the
+        context such as ``mp.zeta``. Each element of *args* is passed
+        as a single argument; to map a function of several variables,
+        pass tuples and unpack them inside *f*::
+
+            from mpmath import mp
+
+            def integrate(a):
+                return mp.quad(lambda t: mp.exp(-a*t**2), [0, mp.inf])
+
+            mp.dps = 30
+            values = mp.parallel_map(integrate, range(1, 1001), workers=8)
+
+        Exceptions raised by *f* are propagated to the caller. With
+        ``workers=1``, the calls are made directly in the calling process,
+        which can be useful for debugging.
+
+        Passing *chunksize* > 1 sends the arguments to the workers in
+        chunks of that size, reducing the communication overhead when
+        *f* is cheap to evaluate.
+
+        Quadrature nodes already computed by the calling context (see
+        :func:`~mpmath.quad`) are copied to each worker when it starts,
+        so the workers do not have to compute them again. Computing the
+        nodes once before calling :func:`~mpmath.parallel_map` (e.g. by
+        evaluating one of the integrals) therefore saves time when the
+        precision is high.
+        """
+        args = list(args)
+        if workers == 1:
+            return [f(x) for x in args]
+        name = _context_name(ctx, f)
+        if name:
+            function, method = name, True
+        else:
+            function, method = f, False
+        prec, rounding = ctx._prec_rounding
+        settings = (prec, rounding, ctx.trap_complex, _export_nodes(ctx))
+        import multiprocessing
+        pool = multiprocessing.Pool(workers, _init_worker,
+            (settings, function, method))
+        try:
+            results = pool.map(_call_worker, [_pack(ctx, x) for x in args],
+                chunksize)
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        return [_unpack(ctx, y) for y in results]
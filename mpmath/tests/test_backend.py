@@ -0,0 +1,73 @@
+from mpmath import *
+from mpmath import libmp
+from mpmath.libmp import Backend, backends, register_backend
+from mpmath.libmp import libmpf, libintmath
+
+def compute():
+    return [pi, sqrt(2), exp(mpf(1)/3), gamma(mpf(1)/3), besselj(1, 2),
+        mpf('1.25e-300'), nstr(exp(1), 40), factorial(30), cbrt(10)]
+
+def test_backend_errors():
+    try:
+        Backend('bad', int, square=lambda n: n*n)
+    except ValueError:
+        pass
+    else:
+        assert False
+    try:
+        set_backend('notabackend')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+def test_custom_backend():
+    original = libmp.BACKEND
+    MPZ = backends[original].MPZ
+    calls = {'bitcount': 0, 'isqrt': 0}
+    bitcount = backends[original].kernel('bitcount')
+    isqrt = backends[original].kernel('isqrt')
+    def counting_bitcount(n):
+        calls['bitcount'] += 1
+        return bitcount(n)
+    def counting_isqrt(n):
+        calls['isqrt'] += 1
+        return isqrt(n)
+    register_backend(Backend('counting', MPZ, bitcount=counting_bitcount,
+        isqrt=counting_isqrt))
+    mp.dps = 100
+    try:
+        values = compute()
+        mp.set_backend('counting')
+        assert libmp.BACKEND == 'counting'
+        assert libmpf.bitcount is counting_bitcount
+        assert libintmath.isqrt_fast is counting_isqrt
+        # Kernels not given are the default ones
+        assert libmpf.mpf_mul is libmp.backend.python_kernels['mpf_mul']
+        assert compute() == values
+        assert calls['bitcount'] and calls['isqrt']
+    finally:
+        mp.set_backend(original)
+        mp.dps = 15
+        del backends['counting']
+    assert libmp.BACKEND == original
+    assert libmpf.bitcount is bitcount
+    assert libintmath.isqrt_fast is backends[original].kernel('isqrt_fast')
+
+def test_gmpy_backend():
+    if 'gmpy' not in backends or libmp.BACKEND not in ('python', 'gmpy'):
+        return
+    original = libmp.BACKEND
+    mp.dps = 50
+    try:
+        mp.set_backend('gmpy')
+        a = compute()
+        mp.set_backend('python')
+        b = compute()
+        assert a == b
+        assert type(b[0].man) is int
+        assert type(libmpf.fone[1]) is int
+        assert (b[1] * a[1]).ae(2)
+    finally:
+        mp.set_backend(original)
+        mp.dps = 15
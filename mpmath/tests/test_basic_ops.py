@@ -443,3 +443,77 @@ def test_isnan_etc():
     assert mp.isnpint(-1.1+0j) == False
     assert mp.isnpint(-1+0.1j) == False
     assert mp.isnpint(0+0.1j) == False
+
+def test_threadlocal_precision():
+    import threading
+    mp.dps = 15
+    mp.threadlocal = True
+    try:
+        assert mp.threadlocal
+        errors = []
+        barrier = threading.Barrier(4)
+        def run(dps):
+            try:
+                with workdps(dps):
+                    barrier.wait()
+                    for i in range(50):
+                        assert mp.dps == dps
+                        assert len(str(mpf(1)/3)) == dps + 2
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run, args=(d,)) for d in [10, 20, 30, 40]]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        assert not errors
+        assert mp.dps == 15
+        mp.dps = 25
+        assert str(mpf(1)/3) == '0.3333333333333333333333333'
+    finally:
+        mp.threadlocal = False
+    assert not mp.threadlocal
+    assert mp.dps == 25
+    mp.dps = 15
+    assert mp.prec == 53
+    assert str(mpf(1)/3) == '0.333333333333333'
+
+def test_fixed():
+    F = mp.fixed(80)
+    assert F.prec == 80
+    assert F(1) == 1 and F(0.5) == mpf(0.5) and F('0.25') == 0.25
+    assert F.eps.man == 1 and F.one.man == 2**80
+    assert (F(3)/F(4)) == 0.75 and 1/F(4) == 0.25 and F(3)/4 == 0.75
+    assert F(0.5) + 0.25 == 0.75 and 1 - F(0.5) == 0.5 and -F(2) < 0
+    assert (F(3)*2).man == 6*2**80 and F(1) << 3 == 8
+    assert int(F(-2.5)) == -2 and int(F(2.5)) == 2
+    assert float(F(0.1)) == 0.1
+    assert hash(F(2)) == hash(2)
+    assert type(F.mpf(F(1)/3)) is mpf
+    # Truncated products
+    x = F(1)/3
+    assert 0 <= mpf(1)/3 - mpf(x) <= mpf(2)**-80
+    s = F.zero
+    for c in [1, -2, 3, 4]:
+        s = s*x + c
+    assert F.mpf(s) == polyval([1, -2, 3, 4], mpf(1)/3)
+    assert sin(F(1)) == sin(1)
+    assert mp.fixed().prec == mp.prec + 20
+    try:
+        F(1j)
+    except TypeError:
+        pass
+    else:
+        assert False
+    # Comparisons with other numbers are exact
+    tiny = mpf('1e-100')
+    assert F(0) != tiny and F(0) < tiny and not F(0) >= tiny
+    assert F(1) < inf and F(1) > -inf and F(1) != nan and not F(1) == nan
+    assert F(1)/3 != mp.fixed(40)(1)/3
+    # Infinities and nan cannot be represented
+    for f in [lambda: F(inf), lambda: F(-inf), lambda: F(nan),
+              lambda: F(1) + inf, lambda: F(1) * nan]:
+        try:
+            f()
+        except ValueError:
+            pass
+        else:
+            assert False
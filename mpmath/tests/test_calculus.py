@@ -23,6 +23,14 @@ def test_polyval():
     p = [4, 0, -2, 5]
     assert polyval(p,4) == 253
     assert polyval(p,4,derivative=True) == (253, 190)
+    # Each Horner step is rounded once
+    x = 1 + eps
+    assert polyval([x, -(x*x)], x) == eps**2
+    assert polyval([1, 0, 1], 1j) == 0
+    # Other types of x are evaluated with + and *
+    A = matrix([[1, 2], [3, 4]])
+    assert polyval([1, 2], A) == matrix([[3, 4], [5, 6]])
+    assert polyval([1, 0, 0], A) == A**2
 
 def test_polyroots():
     p = polyroots([1,-4])
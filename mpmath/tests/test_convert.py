@@ -221,3 +221,28 @@ def test_compatibility():
     assert sqrt(Fraction(2, 3)).ae(sqrt(mpf('2/3')))
     assert sqrt(Decimal(2)/Decimal(3)).ae(sqrt(mpf('2/3')))
     mp.prec = oldprec
+
+def test_radix_conversion_large():
+    n = MPZ(3)**40000
+    s = numeral(n, 10, 19085)
+    assert len(s) == 19085 and s.startswith("7082535931") and s.endswith("08800001")
+    assert from_numeral(s) == n
+    assert from_numeral("-" + s) == -n
+    assert from_numeral(numeral(n, 7, 22583), 7) == n
+    assert from_numeral(numeral(n, 16, 15850), 16) == n
+    mp.dps = 20000
+    try:
+        x = +pi
+        s = nstr(x, 20000)
+        # Independent digits (converted in small pieces)
+        d = "".join(digits_stream(pi, chunk=200, limit=20001))
+        assert d[19999:20001] == "78"
+        assert s == "3." + d[1:19999] + "8"
+        assert abs(mpf(s) - x) < mpf(10)**-19999
+        r = nstr(x, 20010)
+        assert mpf(r) == x
+        assert mpmathify("-" + r) == -x
+        assert abs(mpf(s + "e-3000") - x*mpf(10)**-3000) < mpf(10)**-22995
+        assert str(mpf(10)**15000 + 1) == "1" + "0"*14999 + "1.0"
+    finally:
+        mp.dps = 15
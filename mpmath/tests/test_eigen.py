@@ -177,3 +177,77 @@ def test_eig():
         run_hessenberg(A, verbose = v)
         run_schur(A, verbose = v)
         run_eig(A, verbose = v)
+
+def test_eig_fixed():
+    # for the mp context the QR algorithm works in fixed point arithmetic
+    A = (2 * mp.randmatrix(20, 20) - 1) + 1j * (2 * mp.randmatrix(20, 20) - 1)
+    run_schur(A)
+    run_eig(A)
+
+    eps = mp.exp(0.8 * mp.log(mp.eps))
+    E = mp.eig(A, left = False, right = False)
+    for s in [mp.mpf(10) ** 100, mp.mpf(10) ** -100]:
+        F = mp.eig(s * A, left = False, right = False)
+        for x in F:
+            assert min(abs(x - s * y) for y in E) < eps * abs(s)
+
+    # graded and triangular matrices must not lose their small entries
+    E = mp.eig(mp.matrix([[1, 1], [0, mp.mpf("1e-50")]]), left = False, right = False)
+    assert E == [1, mp.mpf("1e-50")]
+    T = mp.schur(mp.diag([1, mp.mpf("1e-60")]))[1]
+    assert T[0,0] == 1 and T[1,1] == mp.mpf("1e-60")
+    G = mp.matrix([[1, 1, 1], [mp.mpf("1e-70"), mp.mpf("1e-20"), 1],
+                   [0, mp.mpf("1e-80"), mp.mpf("1e-40")]])
+    E = sorted(mp.eig(G, left = False, right = False), key = abs)
+    for x, y in zip(E, [mp.mpf("1e-40"), mp.mpf("1e-20"), 1]):
+        assert abs(x - y) < eps * abs(y)
+
+def test_eig_krylov():
+    n = 24
+    A = mp.randmatrix(n, n) / 10
+    for i in range(n):
+        A[i,i] += (i + 1) * mp.expj(2 * i)
+    E = mp.eig(A, left = False, right = False)
+
+    keys = {"LM" : lambda z: -abs(z), "SM" : abs,
+            "LR" : lambda z: -mp.re(z), "SI" : mp.im}
+    eps = mp.exp(0.8 * mp.log(mp.eps))
+    for which in keys:
+        F, ER = mp.eig(A, k = 3, which = which)
+        G = sorted(E, key = keys[which])[:3]
+        for i in range(3):
+            assert abs(F[i] - G[i]) < eps * abs(G[i])
+            x = ER[:,i]
+            assert mp.norm(A * x - F[i] * x) < eps * abs(F[i]) * mp.norm(x)
+
+    F = mp.eig(A, right = False, k = 2, which = "SR")
+    G = sorted(E, key = mp.re)
+    assert len(F) == 2 and abs(F[0] - G[0]) < eps * abs(G[0])
+
+    # sparse input; for a real matrix real eigenvalues are real
+    entries = {}
+    for i in range(n):
+        entries[i,i] = i + 1
+        entries[i,(i + 3) % n] = 1
+    A = mp.spmatrix(entries, n, n)
+    F, ER = mp.eig(A, k = 2)
+    G = sorted(mp.eig(A.todense(), right = False), key = lambda z: -abs(z))
+    assert all(type(x) is mp.mpf for x in F)
+    assert abs(F[0] - G[0]) < eps * n and abs(F[1] - G[1]) < eps * n
+    assert mp.norm(A * ER[:,0] - F[0] * ER[:,0]) < eps * n * mp.norm(ER[:,0])
+
+    # the hermitian case is solved by the lanczos method
+    A = A + A.T
+    F = mp.eig(A, right = False, k = 3, which = "SR")
+    G = mp.eigh(A.todense(), eigvals_only = True)
+    for i in range(3):
+        assert abs(F[i] - G[i]) < eps * n
+
+    for args in [dict(k = 0), dict(k = n + 1), dict(k = 2, which = "XY"),
+                 dict(k = 2, left = True)]:
+        try:
+            mp.eig(A, **args)
+        except ValueError:
+            pass
+        else:
+            assert False
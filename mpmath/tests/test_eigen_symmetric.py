@@ -6,11 +6,11 @@
 
 xrange = libmp.backend.xrange
 
-def run_eigsy(A, verbose = False):
+def run_eigsy(A, verbose = False, method = None):
     if verbose:
         print("original matrix:\n", str(A))
 
-    D, Q = mp.eigsy(A)
+    D, Q = mp.eigsy(A, method = method)
     B = Q * mp.diag(D) * Q.transpose()
     C = A - B
     E = Q * Q.transpose() - mp.eye(A.rows)
@@ -33,11 +33,11 @@ def run_eigsy(A, verbose = False):
 
     return NC
 
-def run_eighe(A, verbose = False):
+def run_eighe(A, verbose = False, method = None):
     if verbose:
         print("original matrix:\n", str(A))
 
-    D, Q = mp.eighe(A)
+    D, Q = mp.eighe(A, method = method)
     B = Q * mp.diag(D) * Q.transpose_conj()
     C = A - B
     E = Q * Q.transpose_conj() - mp.eye(A.rows)
@@ -240,6 +240,56 @@ def test_eighe_irandmatrix():
 
         run_eighe(A)
 
+def test_eigsy_dc():
+    N = 40
+
+    A = 2 * mp.randmatrix(N, N) - 1
+    for i in xrange(0, N):
+        for j in xrange(i + 1, N):
+            A[j,i] = A[i,j]
+
+    run_eigsy(A, method = "dc")
+
+    E1 = mp.eigsy(A, eigvals_only = True, method = "ql")
+    E2 = mp.eigsy(A, eigvals_only = True, method = "dc")
+    assert mp.mnorm(E1 - E2) < mp.exp( 0.8 * mp.log(mp.eps))
+
+    # deflation: multiple and tightly clustered eigenvalues
+    A = mp.eye(N)
+    run_eigsy(A, method = "dc")
+
+    A = mp.zeros(N, N)
+    for i in xrange(N):
+        A[i,i] = i % 3
+        if i + 1 < N:
+            A[i,i+1] = A[i+1,i] = (i % 2) * mp.mpf(10) ** -20
+    run_eigsy(A, method = "dc")
+
+    # wilkinson matrix with pairs of almost equal eigenvalues
+    A = mp.zeros(N + 1, N + 1)
+    for i in xrange(N + 1):
+        A[i,i] = abs(N // 2 - i)
+        if i < N:
+            A[i,i+1] = A[i+1,i] = 1
+    run_eigsy(A, method = "dc")
+
+def test_eighe_dc():
+    N = 20
+
+    A = (2 * mp.randmatrix(N, N) - 1) + 1j * (2 * mp.randmatrix(N, N) - 1)
+    for i in xrange(0, N):
+        A[i,i] = mp.re(A[i,i])
+        for j in xrange(i + 1, N):
+            A[j,i] = mp.conj(A[i,j])
+
+    run_eighe(A, method = "dc")
+
+    try:
+        mp.eigh(A, method = "foo")
+        assert False
+    except ValueError:
+        pass
+
 def test_svd_r_rand():
     for i in xrange(5):
         full = mp.rand() > 0.5
@@ -355,3 +405,98 @@ def run(qtype, FW, R, alpha = 0, beta = 0):
     run("chebyshev1", lambda x: 1/mp.sqrt(1-x*x), [-1, 1])
     run("chebyshev2", lambda x: mp.sqrt(1-x*x), [-1, 1])
     run("jacobi", lambda x: (1-x)**(1/mp.mpf(3)) * (1+x)**(1/mp.mpf(5)), [-1, 1], alpha = 1 / mp.mpf(3), beta = 1 / mp.mpf(5) )
+
+def test_gauss_quadrature_moments():
+    n = 41
+
+    with mp.workdps(30):
+        X, W = mp.gauss_quadrature(n, "legendre")
+        assert X[n // 2] == 0
+        for k in xrange(0, 2 * n, 5):
+            m = mp.fdot(W, [x ** k for x in X])
+            assert abs(m - (1 + (-1) ** k) / mp.mpf(k + 1)) < 1e-27
+
+        X, W = mp.gauss_quadrature(n, "laguerre")
+        for k in xrange(0, 2 * n, 5):
+            m = mp.fdot(W, [x ** k for x in X])
+            assert abs(m / mp.factorial(k) - 1) < 1e-27
+
+        a, b = mp.mpf(1) / 3, -mp.mpf(2) / 5
+        X, W = mp.gauss_quadrature(n, "jacobi", alpha = a, beta = b)
+        w = 2 ** (a + b + 1) * mp.beta(a + 1, b + 1)
+        assert abs(mp.fsum(W) - w) < 1e-27
+        assert abs(mp.fdot(W, X) - w * (b - a) / (a + b + 2)) < 1e-27
+
+def test_gauss_quadrature_cache():
+    X1, W1 = mp.gauss_quadrature(12, "hermite")
+    X1[0] = 0
+    X2, W2 = mp.gauss_quadrature(12, "hermite")
+    assert X2[0] < -3 and X2[0] == -X2[11]
+    assert mp.cache_info()["gauss_quadrature_cache"]["entries"] > 0
+
+def test_eigh_krylov():
+    n = 40
+    eps = mp.exp(0.8 * mp.log(mp.eps))
+    A = mp.randmatrix(n, n)
+    A = A + A.T
+    for i in range(n):
+        A[i,i] += i - n // 2
+    B = mp.randmatrix(n, n)
+    B = A + 1j * (B - B.T) / 4
+    for A in [A, B]:
+        E = mp.eigh(A, eigvals_only = True)
+        F = sorted(E, key = abs)
+        for which, G in [("LA", E[n-3:]), ("SA", E[:3]), ("LM", F[n-3:]), ("SM", F[:3])]:
+            X, Q = mp.eigh(A, k = 3, which = which)
+            G = sorted(G)
+            for i in range(3):
+                assert abs(X[i] - G[i]) < eps * n
+                assert mp.norm(A * Q[:,i] - X[i] * Q[:,i]) < eps * n
+            assert mp.mnorm(Q.H * Q - mp.eye(3), 1) < eps
+
+    # the laplacian of a path
+    n = 60
+    entries = {}
+    for i in range(n):
+        entries[i,i] = 2
+        if i:
+            entries[i,i-1] = entries[i-1,i] = -1
+    A = mp.spmatrix(entries, n, n)
+    X = mp.eigh(A, eigvals_only = True, k = 2, which = "LA")
+    for i, x in enumerate(X):
+        assert abs(x - 4 * mp.sin(mp.pi * (n - 1 + i) / (2 * (n + 1))) ** 2) < eps
+
+def test_tridiag_bisect():
+    from mpmath.matrices.eigen_symmetric import tridiag_bisect, tridiag_inverse_iteration
+    n = 20
+    d = [mp.mpf(i % 3) for i in range(n)]
+    e = [mp.mpf(1) / (i + 1) for i in range(n - 1)]
+    E = mp.eigh(mp.matrix([[d[i] if i == j else (e[min(i, j)] if abs(i - j) == 1 else 0)
+        for j in range(n)] for i in range(n)]), eigvals_only = True)
+    X = tridiag_bisect(mp, d, e, 5, 12)
+    for i in range(7):
+        assert abs(X[i] - E[i + 5]) < 10 * mp.eps
+    Y = tridiag_inverse_iteration(mp, d, e, X)
+    for x, y in zip(X, Y):
+        r = [d[j] * y[j] - x * y[j] + (e[j - 1] * y[j - 1] if j else 0) + (e[j] * y[j + 1] if j < n - 1 else 0)
+             for j in range(n)]
+        assert mp.norm(r) < 100 * mp.eps
+
+def test_svd_krylov():
+    eps = mp.exp(0.8 * mp.log(mp.eps))
+    for A in [mp.randmatrix(40, 25), mp.randmatrix(20, 35) + 1j * mp.randmatrix(20, 35)]:
+        S = mp.svd(A, compute_uv = False)
+        U, T, V = mp.svd(A, k = 4)
+        assert U.rows == A.rows and U.cols == 4 and V.rows == 4 and V.cols == A.cols
+        for i in range(4):
+            assert abs(T[i] - S[i]) < eps * S[0]
+        assert mp.mnorm(U.H * U - mp.eye(4), 1) < eps
+        assert mp.mnorm(V * V.H - mp.eye(4), 1) < eps
+        assert mp.mnorm(A * V.H - U * mp.diag(T), 1) < eps * S[0]
+        T = mp.svd(A, compute_uv = False, k = 2)
+        assert T.rows == 2 and abs(T[1] - S[1]) < eps * S[0]
+
+    entries = dict(((2 * i, i), i + 1) for i in range(30))
+    A = mp.spmatrix(entries, 60, 30)
+    S = mp.svd(A, compute_uv = False, k = 3)
+    assert mp.norm(S - mp.matrix([30, 29, 28])) < eps
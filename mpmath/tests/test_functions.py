@@ -64,6 +64,149 @@ def test_constants():
     assert pi > 3
     assert pi < 4
 
+def test_constant_cache():
+    import os, shutil, tempfile
+    from mpmath.libmp import libelefun
+    calls = []
+    def sqrt2_fixed(prec):
+        calls.append(prec)
+        return isqrt(2 << (2*prec))
+    directory = tempfile.mkdtemp()
+    orig = libelefun.CONSTANT_CACHE_DIR, libelefun.CONSTANT_CACHE_MIN_PREC
+    try:
+        libelefun.CONSTANT_CACHE_DIR = directory
+        libelefun.CONSTANT_CACHE_MIN_PREC = 100
+        f = libelefun.constant_memo(sqrt2_fixed)
+        assert f(50) == isqrt(2 << 100)
+        assert f(300) == isqrt(2 << 600)
+        assert len(calls) == 2
+        # Only the large value is stored
+        assert os.listdir(directory) == ['sqrt2_fixed-325.bin']
+        # A fresh memo (as in a new process) is served from the cache,
+        # truncating to lower precision
+        for prec in [317, 316, 300, 150, 100, 325]:
+            g = libelefun.constant_memo(sqrt2_fixed)
+            assert g(prec) == isqrt(2 << (2*prec))
+        assert len(calls) == 2
+        assert g(400) == isqrt(2 << 800)
+        assert len(calls) == 3
+        assert len(os.listdir(directory)) == 2
+    finally:
+        libelefun.CONSTANT_CACHE_DIR, libelefun.CONSTANT_CACHE_MIN_PREC = orig
+        shutil.rmtree(directory)
+
+def test_digits_stream():
+    from mpmath.libmp import numeral, numeral_chunks
+    mp.prec = 4100
+    try:
+        for c, arg in [(pi, pi), (e, 'e'), (ln2, ln2), (sqrt(2), 'sqrt2')]:
+            for base in [2, 10, 16]:
+                ref = numeral(int(c), base) + \
+                    numeral(int(frac(c) * mpf(base)**1000), base).rjust(1000, '0')
+                # Small chunks force many precision steps
+                for chunk in [9, 100, 1000]:
+                    s = list(digits_stream(arg, base, chunk, 1000))
+                    assert "".join(s) == ref
+                    assert [len(t) for t in s[1:-1]] == [chunk]*(len(s)-2)
+        g = digits_stream('e', chunk=300)
+        s = "".join([next(g) for i in range(4)])
+        assert s == nstr(e, 1100)[:902].replace('.', '')
+    finally:
+        mp.dps = 15
+    assert list(digits_stream('log2', chunk=5, limit=12)) == \
+        ['0', '69314', '71805', '59']
+    assert list(digits_stream(pi, limit=0)) == ['3']
+    try:
+        digits_stream(euler)
+    except ValueError:
+        pass
+    else:
+        assert False
+    assert list(numeral_chunks(12345, 10, 8, 3)) == ['000', '123', '45']
+
+def test_cache_limits():
+    from mpmath.libmp.cache import LRUCache
+    c = LRUCache('test', 100, sizeof=lambda v: v)
+    c[1] = 40
+    c[2] = 40
+    c[1]
+    c[3] = 40
+    assert sorted(c) == [1, 3]
+    assert c.size == 80 and c.evictions == 1
+    c[4] = 200
+    assert list(c) == [4] and c.size == 200
+    c.clear()
+    for k in range(5):
+        c[k] = 20
+    c.get(0)
+    c[1] = 20
+    c.shrink(40)
+    assert sorted(c) == [0, 1] and c.size == 40
+    c.clear()
+    # Unbounded caches do not track reads
+    c.maxsize = None
+    assert type(c).__getitem__ is dict.__getitem__
+    c[1] = 40
+    c.maxsize = 100
+    c[2] = 40
+    c[1]
+    c[3] = 40
+    assert sorted(c) == [1, 3]
+    c.clear()
+    assert c.size == 0 and c.info()['entries'] == 0
+    mp.dps = 15
+    args = [mpf(n)/7 for n in range(1, 40)]
+    def values():
+        mp.dps = 15
+        v = [log(x) for x in args] + [atan(x) for x in args] + \
+            [gamma(x) for x in args] + [zeta(n) for n in range(2, 40)] + \
+            [bernoulli(n) for n in range(0, 100, 2)] + \
+            [hyp2f1(1, 2, 3, x/40) for x in args]
+        mp.prec = 300
+        v += [log(x) for x in args] + [gamma(x) for x in args]
+        mp.dps = 15
+        return v
+    try:
+        clear_caches()
+        assert all(c['entries'] == 0 for c in cache_info().values())
+        v1 = values()
+        assert cache_info()['log_taylor_cache']['entries'] > 0
+        set_cache_limit(2000)
+        info = cache_info()
+        assert all(c['maxsize'] == 2000 for c in info.values())
+        assert info['log_taylor_cache']['size'] <= 2000
+        v2 = values()
+        assert cache_info()['log_taylor_cache']['evictions'] > 0
+        clear_caches()
+        v3 = values()
+        assert v1 == v2 == v3
+    finally:
+        set_cache_limit(None)
+        mp.dps = 15
+
+def test_stats():
+    mp.dps = 15
+    stats(reset=True)
+    bernoulli(10)
+    assert stats() == {}
+    try:
+        stats(enable=True)
+        clear_caches()
+        bernoulli(10)
+        bernoulli(10)
+        hyp2f1(1, 2, 3, 0.25)
+        hyp2f1(1, 2, 3, 0.5)
+        s = stats()
+        assert s['mpf_bernoulli']['hits'] == 1
+        assert s['mpf_bernoulli']['misses'] == 1
+        assert s['mpf_bernoulli']['time'] >= 0
+        assert s['make_hyp_summator']['hits'] == 1
+        assert s['make_hyp_summator']['misses'] == 1
+        s = stats(reset=True)
+        assert stats() == {}
+    finally:
+        stats(enable=False, reset=True)
+
 def test_exact_sqrts():
     for i in range(20000):
         assert sqrt(mpf(i*i)) == i
@@ -198,6 +341,25 @@ def test_log():
     assert isnan(log(mpc(1,nan)).real)
     assert isnan(log(mpc(1,nan)).imag)
 
+def test_elementary_many():
+    random.seed(1)
+    xs = [0, 1, -1, 0.5, 1.0000001, 0.9999999, 1e-30, -1e-30, 3e5, -700.25,
+        ldexp(1.5, 2000), ldexp(1.5, -2000), inf, -inf, nan]
+    xs += [random.uniform(-10, 10) for i in range(50)]
+    zs = xs + [2+3j, -1j]
+    # Compare representations since nan != nan
+    same = lambda a, b: list(map(repr, a)) == list(map(repr, b))
+    for dps in [15, 30, 100, 300]:
+        mp.dps = dps
+        assert same(exp_many(zs), [exp(z) for z in zs])
+        assert same(log_many(zs), [log(z) for z in zs])
+        assert same(cos_many(zs), [cos(z) for z in zs])
+        assert same(sin_many(zs), [sin(z) for z in zs])
+        assert same(cos_sin_many(xs), [cos_sin(x) for x in xs])
+    mp.dps = 15
+    assert exp_many([1, 2], dps=30) == [exp(1, dps=30), exp(2, dps=30)]
+    assert exp_many([]) == []
+
 def test_trig_hyperb_basic():
     for x in (list(range(100)) + list(range(-100,0))):
         t = x / 4.1
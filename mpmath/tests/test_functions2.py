@@ -589,6 +589,31 @@ def test_hyper_3f2_etc():
     # slow -- covered by doctests
     #assert hyper([1,1,1],[2,3],0.9999).ae(1.2897972005319693905)
 
+def test_hyper_binary_splitting():
+    # Rational series above libmp.HYP_BS_PREC are summed by binary
+    # splitting; compare with fixed-point summation at a lower precision
+    from mpmath import libmp
+    def f():
+        return erf(0.75), besselj(3, 0.25), hyp2f1((1,3),(1,2),(5,4),0.25), \
+            hyp1f1((1,3),2,-0.625), hyp2f1(-5,(1,2),(5,4),0.25), \
+            hyp0f1(3,-1.125)
+    try:
+        mp.dps = 800
+        assert mp.prec < libmp.HYP_BS_PREC
+        a = f()
+        mp.dps = 1000
+        assert mp.prec >= libmp.HYP_BS_PREC
+        b = f()
+        for x, y in zip(a, b):
+            assert x.ae(y, mpf(10)**-795)
+    finally:
+        mp.dps = 15
+    assert libmp.hyp_bs_terms([(1,1)], [(2,1)], libmp.from_int(-1), 1000, 1000) < 300
+    assert libmp.hyp_bs_terms([(-3,1)], [(2,1)], libmp.from_int(5), 1000, 1000) == 4
+    assert libmp.hyp_bs_terms([(1,1),(1,1)], [], libmp.from_int(1), 1000, 1000) is None
+    T, Q = libmp.hyp_bs([(-3,1)], [(2,1)], libmp.from_int(5), 4)
+    assert mpf(T)/Q == hyp1f1(-3,2,5)
+
 def test_hyper_u():
     mp.dps = 15
     assert hyperu(2,-3,0).ae(0.05)
@@ -0,0 +1,57 @@
+import sys
+import subprocess
+
+import mpmath
+from mpmath import mp, fp, iv
+from mpmath.functions import _lazy_modules
+from mpmath.functions.functions import SpecialFunctions
+
+def test_lazy_functions_table():
+    # Every function defined in a lazily imported module is listed
+    for name in _lazy_modules:
+        mpmath.functions.functions.load_functions(name)
+    for module, names in _lazy_modules.items():
+        module = 'mpmath.functions.' + module
+        defined = [name for (name, (f, wrap)) in
+            SpecialFunctions.defined_functions.items() if f.__module__ == module]
+        defined += [name for (name, f) in SpecialFunctions.__dict__.items()
+            if getattr(f, '__module__', None) == module]
+        assert sorted(defined) == sorted(names)
+
+def test_lazy_functions_access():
+    assert mpmath.besselj == mp.besselj
+    assert 'besselj' in mpmath.__all__
+    assert 'besselj' in dir(mpmath)
+    assert mpmath.hurwitz(2, 3) == mp.zeta(2, 3)
+    assert fp.hyp0f1(2, 0.5) == fp.hyper([], [2], 0.5)
+    assert iv.qp(0.5) in iv.mpf([0.28878809508660, 0.28878809508661])
+    try:
+        mpmath.notafunction
+    except AttributeError:
+        pass
+    else:
+        assert False
+    try:
+        mp.notafunction
+    except AttributeError:
+        pass
+    else:
+        assert False
+
+def test_lazy_import():
+    code = ("import sys, mpmath\n"
+            "assert 'mpmath.functions.bessel' not in sys.modules\n"
+            "assert mpmath.besselj(0, 0) == 1\n"
+            "assert 'mpmath.functions.bessel' in sys.modules\n"
+            "assert 'mpmath.functions.zeta' not in sys.modules\n")
+    assert subprocess.call([sys.executable, "-c", code]) == 0
+
+def test_star_import():
+    ns = {}
+    exec("from mpmath import *", ns)
+    assert ns['besselj'] == mp.besselj and ns['hurwitz'] == mp.hurwitz
+    assert 'runtests' in ns and 'doctests' in ns
+    for name in ['loggamma_old', 'oldzetazero', 'square_exp_arg']:
+        assert name not in ns
+        assert not hasattr(mpmath, name)
+        assert hasattr(mp, name)
@@ -219,6 +219,78 @@ def test_interval_matrix():
     assert -13.155049396267837541163 in c[1]
     assert 7.42069154774972557628979 in c[2]
 
+def test_raw_factorizations():
+    mp.dps = 30
+    try:
+        # real matrices use raw mpf kernels, complex ones the generic code
+        A = randmatrix(12)
+        for B in [A, A + 1e-40j*eye(12)]:
+            P, L, U = lu(B)
+            assert mnorm(P*B - L*U, 1) < 1e-28
+        H = hilbert(10)
+        L = cholesky(H)
+        assert type(L[3,2]) is mpf
+        assert mnorm(L*L.T - H, 1) < 1e-30
+        assert mnorm(cholesky(H + 0j*eye(10)) - L, 1) < 1e-22
+        assert mnorm(lu_solve(H, H*ones(10,1)) - ones(10,1), 1) < 1e-16
+        pytest.raises(ValueError, lambda: cholesky(-H))
+    finally:
+        mp.dps = 15
+
+def test_factorization_objects():
+    import pickle
+    mp.dps = 15
+    A = A4.copy()
+    B = randmatrix(5, 7)
+    F = lu_factor(A)
+    X = F.solve(B)
+    assert X.rows == 5 and X.cols == 7
+    assert mnorm(A*X - B, 1) < 1e-12
+    for i in range(B.cols):
+        assert norm(X.column(i) - lu_solve(A, B.column(i))) < 1e-12
+    assert F.det().ae(det(A))
+    # the factorization does not depend on A any more
+    A[0,0] = 1
+    assert pickle.loads(pickle.dumps(F)).solve(B) == X
+    assert F.solve(b4).rows == 5
+    pytest.raises(ValueError, lambda: F.solve([1, 2]))
+    # complex and fp matrices
+    F = lu_factor(A10)
+    assert norm(A10*F.solve(b10) - matrix(b10)) < 1e-14
+    fA, fB = fp.matrix(A4), fp.matrix(B)
+    F = fp.lu_factor(fA)
+    assert fp.mnorm(fA*F.solve(fB) - fB, 1) < 1e-10
+    # Cholesky
+    F = cho_factor(A9)
+    assert F.L == cholesky(A9)
+    assert mnorm(A9*F.solve(B[:3,:]) - B[:3,:], 1) < 1e-14
+    H = matrix([[2, 1j], [-1j, 2]])
+    assert norm(H*cho_factor(H).solve([1, 1]) - matrix([1, 1])) < 1e-15
+    # QR, with least-squares solutions of overdetermined systems
+    F = qr_factor(A8)
+    X = F.solve(matrix([b8, [1, 1, 1, 1]]).T)
+    assert norm(X.column(0) - qr_solve(A8, b8)[0]) < 1e-14
+    assert norm(A8.T*(A8*X.column(1) - matrix([1, 1, 1, 1]))) < 1e-14
+    F = qr_factor(A10)
+    assert norm(A10*F.solve(b10) - matrix(b10)) < 1e-14
+    assert pickle.loads(pickle.dumps(F)).solve(b10) == F.solve(b10)
+
+def test_lu_solve_mixed():
+    mp.dps = 60
+    try:
+        for A, b in [(A4, b4), (A6, b6), (A10, b10), (hilbert(12), ones(12, 1)),
+                     (randmatrix(6) * mpf('1e-500'), randmatrix(6, 1))]:
+            x = lu_solve(A, b, refine='mixed')
+            assert norm(x - lu_solve(A, b)) <= 1e-40 * norm(x)
+        B = randmatrix(3, 4)
+        X = lu_solve(A1.copy(), B, refine='mixed')
+        assert (X.rows, X.cols) == (3, 4) and mnorm(A1*X - B, 1) < 1e-58
+        pytest.raises(ZeroDivisionError, lambda: lu_solve(zeros(3), b1,
+            refine='mixed'))
+        pytest.raises(ValueError, lambda: lu_solve(A1, b1, refine='full'))
+    finally:
+        mp.dps = 15
+
 def test_LU_cache():
     A = randmatrix(3)
     LU = LU_decomp(A)
@@ -178,3 +178,52 @@ def test_matrix_numpy():
     l = [[1, 2], [3, 4], [5, 6]]
     a = numpy.array(l)
     assert matrix(l) == matrix(a)
+
+def test_matrix_storage():
+    # Dictionary and list-of-rows storage behave the same
+    A = matrix(3, 4)
+    B = matrix([[0]*4]*3)
+    assert A == B
+    A[0,1] = 2
+    A[2,3] = mpf(1)/3
+    B[0,1] = 2
+    B[2,3] = mpf(1)/3
+    assert A == B
+    assert A.tolist() == B.tolist()
+    assert A.T == B.T
+    assert A[:,1:] == B[:,1:]
+    assert A*B.T == B*A.T
+    assert A + B == 2*A
+    rows = B._dense_rows()
+    assert rows[2][3] == mpf(1)/3
+    assert type(rows[1][1]) is mpf
+    A.rows = 4
+    B.rows = 4
+    A.cols = 2
+    B.cols = 2
+    assert A == B == matrix([[0, 2], [0, 0], [0, 0], [0, 0]])
+    # Filling an empty matrix switches to dense storage
+    C = matrix(2)
+    C[0,0] = C[1,1] = 1
+    C[0,1] = 3
+    assert C == matrix([[1, 3], [0, 1]])
+    assert C._dense_rows() == [[1, 3], [0, 1]]
+    C[1,0] = 0
+    assert C._matrix__data == {(0,0): 1, (0,1): 3, (1,1): 1}
+    # Negative indices are rejected by both storages
+    for M in [matrix(2), matrix([[1, 2], [3, 4]])]:
+        for key in [(-1,-1), (-1,0), (0,-1), (2,0), (-1,slice(None)),
+                (slice(None),-1)]:
+            try:
+                M[key]
+            except IndexError:
+                pass
+            else:
+                assert False
+            try:
+                M[key] = 9
+            except IndexError:
+                pass
+            else:
+                assert False
+    assert M == matrix([[1, 2], [3, 4]])
@@ -0,0 +1,58 @@
+import pickle
+
+from mpmath import *
+
+def test_mpfarray_basic():
+    mp.dps = 15
+    a = mpfarray([1, 2.5, '3', mpf(-4)])
+    assert len(a) == 4
+    assert a.tolist() == [1, 2.5, 3, -4]
+    assert a[-1] == -4
+    a[0] = 7
+    assert a[0] == 7
+    a.append(inf)
+    a.extend([nan, 0])
+    assert len(a) == 7
+    assert a[4] == inf
+    assert isnan(a[5])
+    assert a[6] == 0
+    assert mpfarray(3).tolist() == [0, 0, 0]
+    assert a[1:3].tolist() == [2.5, 3]
+    b = a.copy()
+    b[0] = 1
+    assert a[0] == 7
+    try:
+        mpfarray([1j])
+        assert 0
+    except TypeError:
+        pass
+    assert pickle.loads(pickle.dumps(a))[:5].tolist() == a[:5].tolist()
+
+def test_mpfarray_arithmetic():
+    mp.dps = 15
+    xs = [mpf(1)/3, mpf(2), mpf(-7.5), mpf('1e100')]
+    ys = [mpf(5), mpf(-1)/7, mpf(2), mpf(3)]
+    a = mpfarray(xs)
+    b = mpfarray(ys)
+    assert (a + b).tolist() == [x+y for x, y in zip(xs, ys)]
+    assert (a - b).tolist() == [x-y for x, y in zip(xs, ys)]
+    assert (a * b).tolist() == [x*y for x, y in zip(xs, ys)]
+    assert (a / b).tolist() == [x/y for x, y in zip(xs, ys)]
+    assert (a + 1).tolist() == [x+1 for x in xs]
+    assert (1 - a).tolist() == [1-x for x in xs]
+    assert (3 / a).tolist() == [3/x for x in xs]
+    assert (-a).tolist() == [-x for x in xs]
+    assert abs(a).tolist() == [abs(x) for x in xs]
+    assert a.sum() == fsum(xs)
+    c = abs(a)
+    assert c.sqrt().tolist() == [sqrt(x) for x in c]
+    assert c.log().tolist() == [log(x) for x in c]
+    assert b.exp().tolist() == [exp(y) for y in ys]
+    mp.dps = 50
+    assert (a / b).tolist() == [x/y for x, y in zip(xs, ys)]
+    mp.dps = 15
+    try:
+        a + mpfarray([1])
+        assert 0
+    except ValueError:
+        pass
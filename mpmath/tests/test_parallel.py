@@ -0,0 +1,40 @@
+from mpmath import *
+
+def integrate(a):
+    return quad(lambda t: exp(-a*t**2), [0, inf]), mp.prec
+
+def pair(x):
+    return [x, matrix([[x, 1j], [2, x*x]]), {'z': mpc(x, 1)}, (x, 'x')]
+
+def cached_nodes(x):
+    return sorted(mp._gauss_legendre.standard_cache)
+
+def test_parallel_map():
+    mp.dps = 30
+    try:
+        args = [1, mpf(2), mpf('2.5'), 7]
+        values = parallel_map(integrate, args, workers=2)
+        assert values == [integrate(a) for a in args]
+        assert values[0][1] == mp.prec
+        assert parallel_map(mp.zeta, [2, 3.5], workers=2) == [zeta(2), zeta(3.5)]
+        assert parallel_map(exp, [mpc(1, 2)], workers=2) == [exp(mpc(1, 2))]
+        v = parallel_map(pair, [mpf(1)/3], workers=2)[0]
+        w = pair(mpf(1)/3)
+        assert v[0] == w[0] and v[1] == w[1] and v[2] == w[2] and v[3] == w[3]
+        assert parallel_map(integrate, [3], workers=1) == [integrate(3)]
+        assert parallel_map(integrate, [], workers=2) == []
+    finally:
+        mp.dps = 15
+
+def test_parallel_map_nodes():
+    mp.dps = 30
+    try:
+        mp._gauss_legendre.clear()
+        assert parallel_map(cached_nodes, [0], workers=2) == [[]]
+        quadgl(exp, [0, 1])
+        nodes = cached_nodes(0)
+        assert nodes
+        assert parallel_map(cached_nodes, [0, 1], workers=2) == [nodes, nodes]
+    finally:
+        mp._gauss_legendre.clear()
+        mp.dps = 15
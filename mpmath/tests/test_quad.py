@@ -31,6 +31,38 @@ def test_quad_infinite_mirror():
 def test_quadgl_linear():
     assert quadgl(lambda x: x, [0, 1], maxdegree=1).ae(0.5)
 
+def test_save_load_nodes():
+    import io, os, tempfile
+    mp.dps = 30
+    try:
+        for rule in [mp._tanh_sinh, mp._gauss_legendre]:
+            rule.clear()
+            rule.get_nodes(-1, 1, 2, mp.prec)
+            rule.get_nodes(-1, 1, 3, mp.prec)
+            cache = rule.standard_cache
+            fp = io.BytesIO()
+            rule.save_nodes(fp)
+            rule.clear()
+            fp.seek(0)
+            rule.load_nodes(fp)
+            assert rule.standard_cache == cache
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            save_nodes(path)
+            mp._tanh_sinh.clear()
+            load_nodes(path, method='tanh-sinh')
+            assert sorted(mp._tanh_sinh.standard_cache) == [(2, mp.prec), (3, mp.prec)]
+            pytest.raises(ValueError, lambda: load_nodes(path, method='gauss-legendre'))
+            pytest.raises(ValueError, lambda: save_nodes(path, method='simpson'))
+        finally:
+            os.remove(path)
+        pytest.raises(ValueError, lambda: load_nodes(io.BytesIO(b"x")))
+    finally:
+        mp._tanh_sinh.clear()
+        mp._gauss_legendre.clear()
+        mp.dps = 15
+
 def test_complex_integration():
     assert quadts(lambda x: x, [0, 1+j]).ae(j)
 
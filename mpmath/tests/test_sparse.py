@@ -0,0 +1,113 @@
+from mpmath import *
+
+def tridiagonal(n, a=-1, b=2, c=-1):
+    entries = {}
+    for i in range(n):
+        entries[i,i] = b
+        if i:
+            entries[i,i-1] = a
+            entries[i-1,i] = c
+    return spmatrix(entries, n, n)
+
+def test_spmatrix():
+    mp.dps = 15
+    D = matrix([[1, 0, 2], [0, 0, 3], [4, 5, 0]])
+    A = spmatrix(D)
+    assert A.nnz == 5
+    assert A.format == 'csr'
+    assert A.indptr == [0, 2, 3, 5]
+    assert A.indices == [0, 2, 2, 0, 1]
+    assert A.todense() == D
+    assert spmatrix(D.tolist()) == A
+    assert spmatrix(dict(A.items()), 3, 3) == A
+    B = spmatrix(D, format='csc')
+    assert B.indptr == [0, 2, 3, 5]
+    assert B.indices == [0, 2, 2, 0, 1]
+    assert B == A and B.tocsr() == A and A.tocsc() == B
+    for i in range(3):
+        for j in range(3):
+            assert A[i,j] == B[i,j] == D[i,j]
+    assert A.T.todense() == D.T
+    assert A.T.T == A
+    assert A.diagonal() == [1, 0, 0]
+    assert spmatrix(2, 3).nnz == 0
+    assert spmatrix([1, 0, 2]).indptr == [0, 1, 1, 2]
+    # Arithmetic
+    x = matrix([1, 2, 3])
+    assert A*x == D*x
+    assert B*x == D*x
+    assert A*[1, 2, 3] == D*x
+    assert A.matvec([1, 2, 3]) == [7, 9, 14]
+    assert (A*A).todense() == D*D
+    assert (A*B.T).todense() == D*D.T
+    assert (A + B).todense() == 2*D
+    assert (A - B).nnz == 0
+    assert (2*A).todense() == 2*D
+    assert (A/2).todense() == D/2
+    assert (-A).todense() == -D
+    assert A + D == 2*D
+    assert D*A == D*D
+    C = spmatrix({(0,1): 1j}, 2, 2)
+    assert C.H[1,0] == -1j
+    assert nstr(C, 3) == '(0, 1)  (0.0 + 1.0j)'
+    try:
+        A[3,0]
+    except IndexError:
+        pass
+    else:
+        assert False
+    try:
+        spmatrix({(2,0): 1}, 2, 2)
+    except IndexError:
+        pass
+    else:
+        assert False
+
+def test_sparse_solvers():
+    mp.dps = 30
+    try:
+        n = 60
+        A = tridiagonal(n, b=3)
+        b = [mpf(i % 7) - 3 for i in range(n)]
+        x0 = lu_solve(A.todense(), b)
+        for solve in [cg, bicgstab, gmres]:
+            x, err = solve(A, b, error=True)
+            assert err < eps
+            assert norm(x - x0) < 1e-25 * norm(x0)
+            x = solve(A, b, M='jacobi')
+            assert norm(x - x0) < 1e-25 * norm(x0)
+        x = gmres(A, b, restart=5)
+        assert norm(x - x0) < 1e-25 * norm(x0)
+        x = cg(A, b, M=lambda r: r/3)
+        assert norm(x - x0) < 1e-25 * norm(x0)
+        # Ill-conditioned (discrete Laplacian) and nonsymmetric systems
+        A = tridiagonal(n)
+        x0 = lu_solve(A.todense(), b)
+        assert norm(cg(A, b) - x0) < 1e-25 * norm(x0)
+        A = tridiagonal(n, a=-2, b=4)
+        x0 = lu_solve(A.todense(), b)
+        assert norm(bicgstab(A, b) - x0) < 1e-25 * norm(x0)
+        assert norm(gmres(A, b) - x0) < 1e-25 * norm(x0)
+        # Nonsymmetric complex system
+        A = spmatrix({(0,0): 3, (0,1): 1j, (1,0): -1, (1,1): 4, (1,2): 2,
+            (2,0): 1, (2,2): 5-1j}, 3, 3)
+        b = [1, 2j, 3]
+        x0 = lu_solve(A.todense(), b)
+        for solve in [bicgstab, gmres]:
+            assert norm(solve(A, b) - x0) < 1e-28
+        # Dense input, initial guess, zero right-hand side
+        assert norm(gmres(A.todense(), b, x0=x0) - x0) < 1e-28
+        assert norm(cg(tridiagonal(5), [0]*5)) == 0
+        try:
+            cg(tridiagonal(100), [1]*100, maxsteps=3)
+        except mp.NoConvergence:
+            pass
+        else:
+            assert False
+    finally:
+        mp.dps = 15
+
+def test_sparse_fp():
+    A = fp.spmatrix({(0,0): 2, (0,1): 1, (1,0): 1, (1,1): 3}, 2, 2)
+    x = fp.cg(A, [1, 2], tol=1e-14)
+    assert fp.norm(A*x - fp.matrix([1, 2])) < 1e-14
@@ -45,6 +45,41 @@ def test_fsum():
     assert fsum([inf,-inf], absolute=1, squared=1) == inf
     assert iv.fsum([1,mpi(2,3)]) == mpi(3,4)
 
+def test_fdot_fma():
+    mp.dps = 15
+    assert fdot([], []) == 0
+    assert fdot([2,3], [4,5]) == 23
+    assert fdot([2**40,1,-2**40], [1,2**-40,1]) == 2**-40
+    assert fdot([1+2j,3], [1j,2]) == 4+1j
+    assert fdot([1+2j,3], [1j,2], conjugate=True) == 8-1j
+    assert fdot([inf,2], [1,3]) == inf
+    assert isnan(fdot([inf,1], [0,1]))
+    x = 1 + eps
+    # The product is not rounded
+    assert fma(x, x, -1) == 2*eps + eps**2
+    assert fma(x, x, -(x*x)) == eps**2
+    assert fma(2, 3j, 1) == 1+6j
+    assert fma(1+2j, 3-1j, 0.5j) == 5+5.5j
+    assert fp.fma(2, 3, 1) == 7
+    assert iv.fma(2, 3, 1) == 7
+    assert fdot([x, x, -1], [x, -x, 1]) == -1
+    assert fdot([x, 1], [x, -(x*x)]) == eps**2
+
+def test_mpf_sum_dot_exact():
+    from mpmath.libmp import mpf_sum, mpf_dot, from_man_exp, fone
+    big = from_man_exp(1, 2000000)
+    tiny = from_man_exp(1, -2000000)
+    # With prec=0 no term is dropped, however large the exponent gap
+    assert mpf_sum([big, tiny], 0) == from_man_exp(2**4000000+1, -2000000)
+    assert mpf_sum([tiny, big], 0) == from_man_exp(2**4000000+1, -2000000)
+    assert mpf_dot([big, fone], [fone, tiny], 0) == \
+        from_man_exp(2**4000000+1, -2000000)
+    assert mpf_dot([tiny, fone], [fone, big], 0) == \
+        from_man_exp(2**4000000+1, -2000000)
+    # With a precision, the tiny term is absorbed by the rounding
+    assert mpf_sum([big, tiny], 53) == big
+    assert mpf_dot([tiny, fone], [fone, big], 53) == big
+
 def test_fprod():
     mp.dps = 15
     assert fprod([]) == 1
@@ -0,0 +1,71 @@
+from mpmath import *
+
+def test_ufunc_real():
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    mp.dps = 15
+    xs = [mpf(1)/3, mpf(2), mpf(-7.5), mpf('1e100')]
+    a = np.array(xs, dtype=object)
+    b = a + mpf(2)
+    assert isinstance(b, np.ndarray)
+    assert list(b) == [x+2 for x in xs]
+    assert list(mpf(2) - a) == [2-x for x in xs]
+    assert list(a * mpf(3)) == [x*3 for x in xs]
+    assert list(mpf(3) / a) == [3/x for x in xs]
+    assert list(a ** mpf(2)) == [x**2 for x in xs]
+    assert list(ufunc(np.add, a, a)) == [x+x for x in xs]
+    assert list(ufunc('multiply', a, xs)) == [x*x for x in xs]
+    assert list(ufunc('negative', a)) == [-x for x in xs]
+    assert list(ufunc('exp', a[:3])) == [exp(x) for x in xs[:3]]
+    assert list(ufunc('cos', a)) == [cos(x) for x in xs]
+    # Complex results
+    assert list(ufunc('sqrt', a)) == [sqrt(x) for x in xs]
+    assert list(ufunc('log', a)) == [log(x) for x in xs]
+    assert list(a ** mpf(0.5)) == [x**0.5 for x in xs]
+    # Precision
+    mp.dps = 50
+    assert list(a / mpf(7)) == [x/7 for x in xs]
+    mp.dps = 15
+    # Broadcasting and scalars
+    m = np.array([[mpf(1), mpf(2)], [mpf(3), mpf(4)]], dtype=object)
+    r = m + np.array([mpf(10), mpf(20)], dtype=object) * mpf(1)
+    assert r.shape == (2, 2)
+    assert r.tolist() == [[11, 22], [13, 24]]
+    assert np.add(mpf(1), mpf(2)) == 3
+    # Other types fall back to the usual arithmetic
+    assert list(a + 1.5) == [x+1.5 for x in xs]
+    assert list(np.array([1.5, 2.5]) + mpf(1)) == [2.5, 3.5]
+    assert list(np.array([mpf(1), 2], dtype=object) + mpf(1)) == [2, 3]
+    assert list(np.maximum(a, mpf(1))) == [1, 2, 1, mpf('1e100')]
+
+def test_ufunc_complex():
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    mp.dps = 15
+    zs = [mpc(1, 2), mpf(3), mpc(0, -1)]
+    a = np.array(zs, dtype=object)
+    assert list(a * mpc(2, 1)) == [z*mpc(2, 1) for z in zs]
+    assert list(a + mpf(1)) == [z+1 for z in zs]
+    assert list(mpc(0, 1) + np.array([mpf(1), mpf(2)], dtype=object)) == \
+        [mpc(1, 1), mpc(2, 1)]
+    r = ufunc('absolute', a)
+    assert list(r) == [abs(z) for z in zs]
+    assert all(type(x) is mpf for x in r)
+    assert list(ufunc('exp', a)) == [exp(z) for z in zs]
+
+def test_ufunc_matrix():
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    mp.dps = 15
+    A = matrix([[1, 2], [3, 4]])
+    b = np.array([[mpf(1), mpf(2)], [mpf(3), mpf(4)]], dtype=object)
+    assert b + A == A + b == 2*A
+    assert b - A == A - b == zeros(2)
+    assert b * A == A * b == A**2
+    assert b @ A == A**2
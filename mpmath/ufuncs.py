@@ -0,0 +1,264 @@
+"""
+Support for NumPy universal functions (ufuncs) on object arrays of
+mpf and mpc numbers.
+
+NumPy evaluates a ufunc on an object array by calling a Python method
+for each element (e.g. mpf.__add__), which checks the type of the
+other operand and looks up the precision every time, and it cannot
+evaluate functions such as exp at all. When all elements of the
+operands are mpf (or mpf and mpc) instances, the functions here instead
+loop directly over the raw _mpf_ and _mpc_ values using the libmp
+routines, at the working precision of the context.
+
+This is used by the __array_ufunc__ methods of mpf, mpc and matrix,
+and by the ufunc() context method. NumPy is only imported when a ufunc
+is actually applied.
+"""
+
+from .libmp import (ComplexResult, fzero,
+    mpf_pos, mpf_neg, mpf_abs, mpf_add, mpf_sub, mpf_mul, mpf_div, mpf_pow,
+    mpf_sqrt, mpf_exp, mpf_log, mpf_cos, mpf_sin,
+    mpc_pos, mpc_neg, mpc_abs, mpc_add, mpc_sub, mpc_mul, mpc_div, mpc_pow,
+    mpc_sqrt, mpc_exp, mpc_log, mpc_cos, mpc_sin)
+
+# name -> (real function, complex function, complex result is real)
+_unary = {
+    'positive' : (mpf_pos, mpc_pos, False),
+    'negative' : (mpf_neg, mpc_neg, False),
+    'absolute' : (mpf_abs, mpc_abs, True),
+    'sqrt' : (mpf_sqrt, mpc_sqrt, False),
+    'exp' : (mpf_exp, mpc_exp, False),
+    'log' : (mpf_log, mpc_log, False),
+    'cos' : (mpf_cos, mpc_cos, False),
+    'sin' : (mpf_sin, mpc_sin, False),
+}
+
+_binary = {
+    'add' : (mpf_add, mpc_add),
+    'subtract' : (mpf_sub, mpc_sub),
+    'multiply' : (mpf_mul, mpc_mul),
+    'divide' : (mpf_div, mpc_div),
+    'true_divide' : (mpf_div, mpc_div),
+    'power' : (mpf_pow, mpc_pow),
+}
+
+# Context functions used for unary ufuncs that NumPy cannot evaluate
+# on object arrays by itself, or when the result is complex
+_functions = {
+    'absolute' : 'fabs',
+    'sqrt' : 'sqrt',
+    'exp' : 'exp',
+    'log' : 'ln',
+    'cos' : 'cos',
+    'sin' : 'sin',
+}
+
+def _values(ctx, x, shape):
+    """
+    Returns the raw value of an mpf or mpc x, or a list of the raw
+    values of the elements of an object array x broadcast to the given
+    shape, together with 'f' if all values are real and 'c' if some
+    are complex. Returns None, None if x is not of this form.
+    """
+    mpf = ctx.mpf
+    mpc = ctx.mpc
+    t = type(x)
+    if t is mpf:
+        return x._mpf_, 'f'
+    if t is mpc:
+        return x._mpc_, 'c'
+    if getattr(x, 'dtype', None) != object:
+        return None, None
+    if x.shape != shape:
+        import numpy as np
+        x = np.broadcast_to(x, shape)
+    elems = x.ravel().tolist()
+    if all(type(y) is mpf for y in elems):
+        return [y._mpf_ for y in elems], 'f'
+    values = []
+    for y in elems:
+        t = type(y)
+        if t is mpf:
+            values.append((y._mpf_, fzero))
+        elif t is mpc:
+            values.append(y._mpc_)
+        else:
+            return None, None
+    return values, 'c'
+
+def _fast(ctx, name, inputs):
+    """
+    Evaluates the ufunc with the given name using the raw libmp
+    functions, or returns None if the inputs are not suitable.
+    """
+    import numpy as np
+    if len(inputs) == 1:
+        if name not in _unary:
+            return None
+    elif len(inputs) == 2:
+        if name not in _binary:
+            return None
+    else:
+        return None
+    arrays = [x for x in inputs if isinstance(x, np.ndarray)]
+    shape = np.broadcast(*arrays).shape if arrays else ()
+    args = []
+    kinds = []
+    for x in inputs:
+        v, kind = _values(ctx, x, shape)
+        if v is None:
+            return None
+        args.append(v)
+        kinds.append(kind)
+    if 'c' in kinds:
+        # Promote real values
+        for i, kind in enumerate(kinds):
+            if kind == 'f':
+                v = args[i]
+                if type(v) is list:
+                    args[i] = [(u, fzero) for u in v]
+                else:
+                    args[i] = (v, fzero)
+        if len(inputs) == 1:
+            f = _unary[name][1]
+            cls = ctx.mpf if _unary[name][2] else ctx.mpc
+        else:
+            f = _binary[name][1]
+            cls = ctx.mpc
+    else:
+        if len(inputs) == 1:
+            f = _unary[name][0]
+        else:
+            f = _binary[name][0]
+        cls = ctx.mpf
+    prec, rounding = ctx._prec_rounding
+    try:
+        if len(inputs) == 1:
+            values = [f(u, prec, rounding) for u in args[0]]
+        else:
+            s, t = args
+            if type(s) is list and type(t) is list:
+                values = [f(u, v, prec, rounding) for (u, v) in zip(s, t)]
+            elif type(s) is list:
+                values = [f(u, t, prec, rounding) for u in s]
+            elif type(t) is list:
+                values = [f(s, v, prec, rounding) for v in t]
+            else:
+                values = [f(s, t, prec, rounding)]
+    except ComplexResult:
+        # E.g. the square root of a negative number
+        return None
+    # Create the numbers without going through make_mpf/make_mpc
+    new = object.__new__
+    numbers = []
+    append = numbers.append
+    if cls is ctx.mpf:
+        for v in values:
+            x = new(cls)
+            x._mpf_ = v
+            append(x)
+    else:
+        for v in values:
+            x = new(cls)
+            x._mpc_ = v
+            append(x)
+    if not shape:
+        return numbers[0]
+    result = np.empty(len(numbers), dtype=object)
+    result[:] = numbers
+    return result.reshape(shape)
+
+def apply_ufunc(ctx, ufunc, method, inputs, kwargs):
+    """
+    Implementation of __array_ufunc__ for mpf and mpc instances.
+    """
+    import numpy as np
+    # Leave other types implementing __array_ufunc__ (such as matrices)
+    # to handle the operation
+    for x in inputs:
+        if hasattr(x, '__array_ufunc__') and not \
+            isinstance(x, (np.ndarray, ctx.mpf, ctx.mpc)):
+            return NotImplemented
+    name = ufunc.__name__
+    if method == '__call__' and not kwargs:
+        result = _fast(ctx, name, inputs)
+        if result is not None:
+            return result
+        if len(inputs) == 1 and name in _functions:
+            f = getattr(ctx, _functions[name])
+            return np.frompyfunc(f, 1, 1)(inputs[0])
+    # Let NumPy evaluate the ufunc elementwise, with numbers wrapped
+    # as zero-dimensional object arrays (so that this method is not
+    # called again)
+    wrapped = []
+    for x in inputs:
+        if isinstance(x, (ctx.mpf, ctx.mpc)):
+            y = np.empty((), dtype=object)
+            y[()] = x
+            x = y
+        wrapped.append(x)
+    return getattr(ufunc, method)(*wrapped, **kwargs)
+
+def apply_matrix_ufunc(ctx, ufunc, method, inputs, kwargs):
+    """
+    Implementation of __array_ufunc__ for matrices. Arithmetic with a
+    NumPy array converts the array to a matrix, and the result is
+    the same as for the corresponding matrix operation. In particular,
+    multiplication is matrix multiplication.
+    """
+    import numpy as np
+    name = ufunc.__name__
+    if method != '__call__' or kwargs or len(inputs) != 2 or \
+        name not in ('add', 'subtract', 'multiply', 'matmul', 'divide',
+            'true_divide'):
+        return NotImplemented
+    a, b = [ctx.matrix(x) if isinstance(x, np.ndarray) else x
+        for x in inputs]
+    if name == 'add':
+        return a + b
+    if name == 'subtract':
+        return a - b
+    if name in ('multiply', 'matmul'):
+        return a * b
+    return a / b
+
+class UfuncMethods(object):
+
+    def ufunc(ctx, f, *args):
+        r"""
+        Applies the NumPy ufunc *f* (e.g. ``numpy.add`` or
+        ``numpy.sqrt``) to the given arguments, which may be NumPy
+        object arrays of ``mpf`` and ``mpc`` instances or numbers.
+        The ufunc may also be given by name. The result is an object
+        array::
+
+            >>> import numpy # doctest: +SKIP
+            >>> from mpmath import * # doctest: +SKIP
+            >>> mp.dps = 15; mp.pretty = True # doctest: +SKIP
+            >>> a = numpy.array([mpf(2), mpf(3)]) # doctest: +SKIP
+            >>> ufunc('sqrt', a) # doctest: +SKIP
+            array([1.4142135623731, 1.73205080756888], dtype=object)
+
+        When the arrays contain only ``mpf`` (or only ``mpf`` and
+        ``mpc``) instances, the ufuncs ``add``, ``subtract``,
+        ``multiply``, ``divide``, ``power``, ``positive``, ``negative``,
+        ``absolute``, ``sqrt``, ``exp``, ``log``, ``cos`` and ``sin``
+        are evaluated in a single loop over the raw values at the
+        working precision, avoiding the conversion and dispatch done by
+        NumPy's generic evaluation of ufuncs on object arrays. Real
+        functions with complex results, such as the square root of a
+        negative number, give ``mpc`` values. Other ufuncs and arrays
+        are evaluated elementwise with the usual mpmath arithmetic.
+
+        The same evaluation is used automatically when an ``mpf`` or
+        ``mpc`` instance is an operand of a ufunc, for example in
+        ``a + mpf(1)``. Since NumPy does not consult the elements of an
+        array, ``a + a`` or ``numpy.sqrt(a)`` use NumPy's generic
+        evaluation; ``ufunc`` can be used in that case.
+        """
+        import numpy as np
+        if not isinstance(f, np.ufunc):
+            f = getattr(np, f)
+        args = [np.asarray(x, dtype=object) if isinstance(x, (list, tuple))
+            else x for x in args]
+        return apply_ufunc(ctx, f, '__call__', args, {})